@@ -1,6 +1,7 @@
 import os
 from pathlib import Path
-import google.generativeai as genai
+
+from llm_gateway import gateway
 
 SUBMISSIONS_DIR = Path("submissions")
 CODE_FILE = SUBMISSIONS_DIR / "user_code.txt"
@@ -110,8 +111,6 @@ def analyze_code_with_gemini(code: str) -> str:
     if not api_key:
         raise ValueError("Missing GEMINI_API_KEY environment variable.")
 
-    client = genai.Client(api_key=api_key)
-
     try:
         compiled = compile(code, "<candidate_code>", "exec")
         syntax_result = "No syntax errors detected."
@@ -180,9 +179,4 @@ def analyze_code_with_gemini(code: str) -> str:
             {code}
             """
 
-    response = client.models.generate_content(
-        model="gemini-2.5-flash",
-        contents=prompt,
-    )
-
-    return response.text
\ No newline at end of file
+    return gateway.generate(prompt)
@@ -1,69 +1,138 @@
-from flask import Flask, request, jsonify, send_file, Response, render_template_string
+from flask import Flask, request, jsonify, send_file, Response, render_template_string, g
 from flask_cors import CORS
 from dotenv import load_dotenv
 from analyzer import analyze_code_with_gemini
 from interview_analyzer import analyze_interview
+from conversation_journal import JournalManager
+from session_store import SessionRegistry, resolve_session_id
+from audio_pipeline import transcode_to_wav, trim_silence
+from providers import ProviderClient
+from tts_cache import TTSCache, cache_key
+from llm_gateway import gateway, LLMError
+from hint_cache import HintCache, hint_key
+from frame_ring import FrameRing
+from emotion_batcher import EmotionBatcher
+from face_tracker import FaceTracker
+from change_gate import ChangeGate
+from frame_broadcaster import FrameBroadcaster, encode_jpeg, placeholder_jpeg
+from single_flight import SingleFlight, flight_key
+from voice_turn import TurnTimeline, log_executor, get_executor_stats
+from metrics import EMOTION_FRAMES_REUSED, REGISTRY
+from turn_scheduler import TurnScheduler, TurnRejected, admission_key
+from log_pipeline import setup_logging, new_request_id, get_request_id
+import profiling
+from profiling import track_thread
+from lazy_imports import FAST_START, lazy_module, get_load_times
 import os
+import io
 import re
 import time
 import json
 import requests
 import traceback
 import mimetypes
-import cv2
-import numpy as np
-from pydub import AudioSegment
-from pydub.silence import split_on_silence
-from pydub.playback import play
-import google.generativeai as genai
 from datetime import datetime
 import threading
+import queue
+import logging
+import contextvars
+import atexit
 from typing import Dict, Optional
 
+# Vision libraries are only needed once a candidate starts a problem or opens the video feed;
+# FAST_START defers them (and the Gemini SDK and pydub) to first use
+cv2 = lazy_module('cv2')
+np = lazy_module('numpy')
+
+STARTED_AT = time.time()
+
 # Load environment variables
 load_dotenv(dotenv_path='app.env')
 
+# Records are queued and written by a background listener (LOG_LEVEL, LOG_FORMAT, LOG_FILE)
+setup_logging()
+logger = logging.getLogger(__name__)
+
 # API Keys and Config
 ELEVENLABS_API_KEY = os.getenv("ELEVENLABS_API_KEY")
 GEMINI_API_KEY = os.getenv("GEMINI_API_KEY")
 VOICE_ID = os.getenv("VOICE_ID")
+ELEVENLABS_BASE_URL = os.getenv("ELEVENLABS_BASE_URL", "https://api.elevenlabs.io")
 
-# Ensure logs directory exists
-os.makedirs('conversation_logs', exist_ok=True)
+# Voice parameters for ElevenLabs TTS (all part of the TTS cache key)
+TTS_MODEL_ID = "eleven_turbo_v2"
+TTS_VOICE_SETTINGS = {
+    "stability": 0.5,
+    "similarity_boost": 0.75,
+    "style": 0.5,
+    "use_speaker_boost": True
+}
 
-# Track if this is a new session
-session_started = False
+# Synthesized lines are cached in memory and on disk, keyed by text + voice parameters
+tts_cache = TTSCache(
+    cache_dir=os.getenv("TTS_CACHE_DIR", "tts_cache"),
+    max_memory_bytes=int(os.getenv("TTS_CACHE_MEMORY_MB", 32)) * 1024 * 1024,
+    max_disk_bytes=int(os.getenv("TTS_CACHE_DISK_MB", 512)) * 1024 * 1024
+)
 
-# Track if user is currently solving a problem
-is_solving_problem = False
+# Interviewer replies keyed on normalized code + question + transcript
+hint_cache = HintCache(
+    max_entries=int(os.getenv("HINT_CACHE_SIZE", 512)),
+    ttl=float(os.getenv("HINT_CACHE_TTL", 600))
+)
 
-def log_conversation(speaker, text):
-    """Log conversation to a single file with timestamp"""
-    global session_started
-    
+# Identical requests already in flight (frontend re-renders and retries) share one execution
+flights = {name: SingleFlight(name) for name in ('tts', 'hint', 'analysis')}
+
+# Voice-activity trimming applied to uploads before speech-to-text
+VAD_ENABLED = os.getenv("VAD_ENABLED", "1") == "1"
+VAD_SETTINGS = {
+    'silence_thresh': float(os.getenv("VAD_SILENCE_DB", -45)),
+    'min_silence_len': int(os.getenv("VAD_MIN_SILENCE_MS", 400)),
+    'keep_silence': int(os.getenv("VAD_KEEP_SILENCE_MS", 150))
+}
+
+# Shared keep-alive client for ElevenLabs speech-to-text and text-to-speech
+elevenlabs = ProviderClient(
+    ELEVENLABS_BASE_URL,
+    headers={"xi-api-key": ELEVENLABS_API_KEY or ""},
+    name='elevenlabs',
+    limits={
+        'stt': int(os.getenv("ELEVENLABS_STT_CONCURRENCY", 8)),
+        'tts': int(os.getenv("ELEVENLABS_TTS_CONCURRENCY", 8))
+    }
+)
+
+# One buffered, append-only conversation journal per session, flushed in the background
+journals = JournalManager(
+    directory=os.getenv("JOURNAL_DIR", "conversation_logs"),
+    flush_interval=float(os.getenv("JOURNAL_FLUSH_INTERVAL", 1.0))
+)
+atexit.register(journals.flush_all)
+
+def log_conversation(speaker, text, session_id='default'):
+    """Record a conversation entry in the session's journal"""
     try:
-        # Ensure logs directory exists
-        os.makedirs('conversation_logs', exist_ok=True)
-        
-        log_file = 'conversation_logs/conversation_log.txt'
-        
-        # If this is the first message from the user in a new session, clear the file
-        if speaker == "User" and not session_started:
-            mode = 'w'  # Overwrite existing file
-            session_started = True
-        else:
-            mode = 'a'  # Append to existing file
-        
-        with open(log_file, mode, encoding='utf-8') as f:
-            f.write(f"[{datetime.now().strftime('%Y-%m-%d %H:%M:%S')}] {speaker}: {text}\n\n")
-            
-        return log_file
+        journal = journals.get(session_id)
+        journal.append(speaker, text)
+        return journal.path
     except Exception as e:
-        print(f"Error logging conversation: {str(e)}")
+        logger.error("Error logging conversation: %s", e)
         return None
 
-# Configure Gemini
-genai.configure(api_key=GEMINI_API_KEY)
+def log_conversation_async(speaker, text, session_id='default'):
+    """Queue a conversation log entry off the request thread, in order with earlier ones"""
+    return log_executor.submit(log_conversation, speaker, text, session_id)
+
+# Create the Gemini model handles up front so the first turn doesn't pay for it;
+# with FAST_START that happens in the background instead of delaying startup
+if FAST_START:
+    threading.Thread(target=gateway.warm, name='gateway-warm', daemon=True).start()
+else:
+    gateway.warm()
+
+# Spoken when Gemini fails; never cached
+ERROR_REPLY = "I'm sorry, I encountered an error processing your request."
 
 def run_gemini(prompt: str) -> str:
     """Send a prompt to the Gemini model and return the response.
@@ -75,23 +144,93 @@ def run_gemini(prompt: str) -> str:
         The model's response as a string
     """
     try:
-        # Use the Gemini 2.5 Flash model (exact name from available models list)
-        model_name = 'models/gemini-2.5-flash'  # This is the exact name from the available models list
-        print(f"Using model: {model_name}")
-        
-        # Initialize the model
-        model = genai.GenerativeModel(model_name)
-        response = model.generate_content(prompt)
-        return response.text
+        return gateway.generate(prompt)
     except Exception as e:
-        print(f"Error in run_gemini: {str(e)}")
-        return "I'm sorry, I encountered an error processing your request."
+        logger.error("Error in run_gemini: %s", e)
+        return ERROR_REPLY
+
+def run_gemini_stream(prompt: str):
+    """Stream a Gemini response, yielding text chunks as they are generated.
+
+    Args:
+        prompt: The prompt to send to the model
+
+    Yields:
+        Pieces of the model's response text
+    """
+    produced = False
+    try:
+        for text in gateway.stream(prompt):
+            produced = True
+            yield text
+    except Exception as e:
+        logger.error("Error in run_gemini_stream: %s", e)
+        # Once part of the answer has been spoken, stop rather than append an apology to it
+        if not produced:
+            yield ERROR_REPLY
+
+# Sentence boundary used to cut streamed text into TTS-sized pieces: . ! or ? followed by
+# whitespace and a capital letter, so abbreviations and decimals ("e.g. 3.5") stay in one
+# piece (the last sentence is flushed when the stream ends)
+SENTENCE_END = re.compile(r'(?<=[.!?])\s+(?=[A-Z])')
+
+def iter_sentences(chunks):
+    """Regroup streamed text chunks into complete sentences."""
+    buffer = ''
+    for chunk in chunks:
+        buffer += chunk
+        parts = SENTENCE_END.split(buffer)
+        buffer = parts.pop()
+        for sentence in parts:
+            if sentence.strip():
+                yield sentence.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+def iter_in_background(iterable):
+    """Drain an iterable on a worker thread so its producer keeps running
+    while the consumer is busy (e.g. Gemini keeps generating during TTS)."""
+    items = queue.Queue()
+    done = object()
+
+    def pump():
+        try:
+            with track_thread():
+                for item in iterable:
+                    items.put(item)
+        finally:
+            items.put(done)
+
+    threading.Thread(target=contextvars.copy_context().run, args=(pump,), daemon=True).start()
+    while True:
+        item = items.get()
+        if item is done:
+            return
+        yield item
 
 class HealthTracker:
-    def __init__(self, camera_index: int = 0, update_interval: float = 2.0):
+    """Camera emotion tracking in two stages.
+
+    A capture thread reads frames at camera rate into a small FrameRing,
+    and an inference thread classifies only the newest frame once every
+    update_interval seconds. Viewers get fresh frames (overlaid with the
+    latest result) without triggering inference, so its CPU cost stays
+    fixed however fast the camera or however many viewers there are.
+    """
+
+    def __init__(self, camera_index: int = 0, update_interval: float = 2.0, ring_size: int = 4,
+                 change_threshold: float = 0.02, max_reuse_seconds: float = 10.0):
+        """
+        Args:
+            camera_index: OpenCV camera to open
+            update_interval: Seconds between emotion inferences
+            ring_size: Captured frames kept for readers
+            change_threshold: Frame difference (0..1) below which the last result is reused; 0 always infers
+            max_reuse_seconds: Longest a result is reused before inferring again anyway
+        """
         self.camera_index = camera_index
         self.update_interval = update_interval
-        self.detector = None
+        self.batcher = None
         self.cap = None
         self.emotion_detection_available = False
         self.last_update = 0
@@ -100,53 +239,57 @@ class HealthTracker:
         self.session_start = datetime.now()
         self.latest_data = {}
         self.running = False
+        self.capture_thread = None
         self.thread = None
         self.initialized = False
+        self.frames = FrameRing(ring_size)
+        self.faces = FaceTracker()
+        self.gate = ChangeGate(threshold=change_threshold, max_age=max_reuse_seconds)
+        self._stop = threading.Event()
+        self._stats = {'captured': 0, 'inferred': 0, 'read_failures': 0, 'inference_seconds': 0.0}
+
+        # Engagement weights
+        self.engagement_weights = {
+            'happy': 0.9,
+            'neutral': 0.7,
+            'surprise': 0.8,
+            'sad': 0.3,
+            'angry': 0.2,
+            'fear': 0.1,
+            'disgust': 0.1
+        }
     
     def initialize(self):
         """Initialize the detector and camera only when needed"""
         if self.initialized:
             return True
             
-        try:
-            from emotiefflib import HSEmotionDetector
-            self.detector = HSEmotionDetector()
-            self.emotion_detection_available = True
-            print("Emotion detection initialized")
-        except ImportError:
-            print("EmotiEffLib not found. Using mock emotion detection.")
-            self.emotion_detection_available = False
+        self.batcher = get_emotion_batcher()
+        self.emotion_detection_available = self.batcher is not None
         
         # Initialize video capture
         self.cap = cv2.VideoCapture(self.camera_index)
         if not self.cap.isOpened():
-            print("Warning: Could not open camera. Health tracking will be limited.")
+            logger.warning("Could not open camera. Health tracking will be limited.")
             return False
             
         self.initialized = True
         return True
-        
-        # Engagement weights
-        self.engagement_weights = {
-            'happy': 0.9,
-            'neutral': 0.7,
-            'surprise': 0.8,
-            'sad': 0.3,
-            'angry': 0.2,
-            'fear': 0.1,
-            'disgust': 0.1
-        }
     
-    def get_emotion(self, frame: np.ndarray) -> Dict:
+    def get_emotion(self, frame: 'np.ndarray') -> Dict:
         if not self.emotion_detection_available:
             return {'happy': 0.5, 'neutral': 0.3, 'sad': 0.2}
             
         try:
-            rgb_frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
-            results = self.detector.predict_emotions([rgb_frame])
-            return results[0] if results else {}
+            # Only the tracked face goes to the model; no face means nothing to classify
+            face = self.faces.crop(frame)
+            if face is None:
+                return {}
+            rgb_frame = cv2.cvtColor(face, cv2.COLOR_BGR2RGB)
+            # Classified inline, or batched with other trackers' frames when the model is busy
+            return self.batcher.submit(rgb_frame, timeout=10.0) or {}
         except Exception as e:
-            print(f"Error detecting emotions: {e}")
+            logger.error("Error detecting emotions: %s", e)
             return {}
     
     def calculate_engagement(self, emotions: Dict) -> float:
@@ -163,21 +306,36 @@ class HealthTracker:
             
         return min(max(engagement / max(total_weight, 0.001), 0.0), 1.0)
     
-    def get_annotated_frame(self):
-        if not self.cap or not self.cap.isOpened():
-            return False, None
-            
-        ret, frame = self.cap.read()
-        if not ret:
-            return False, None
-            
-        emotions = self.get_emotion(frame)
+    def _record(self, emotions: Dict):
+        """Publish one inference result and add it to the bounded history"""
+        engagement = self.calculate_engagement(emotions)
+        self.latest_data = {
+            'timestamp': datetime.now().isoformat(),
+            'emotions': emotions,
+            'engagement': engagement,
+            'dominant_emotion': max(emotions.items(), key=lambda x: x[1])[0] if emotions else 'unknown',
+            'face_box': list(self.faces.box) if self.faces.box is not None else None
+        }
         
+        # Keep history limited
+        self.emotion_history.append(self.latest_data)
+        if len(self.emotion_history) > 100:
+            self.emotion_history.pop(0)
+            
+        self.engagement_scores.append(engagement)
+        if len(self.engagement_scores) > 100:
+            self.engagement_scores.pop(0)
+    
+    def annotate(self, frame: 'np.ndarray', data: Optional[Dict] = None) -> 'np.ndarray':
+        """Copy of frame with the emotion overlay for data (the latest result by default)"""
+        data = self.latest_data if data is None else data
+        emotions = data.get('emotions')
+        frame = frame.copy()
+        if data.get('face_box'):
+            x, y, w, h = data['face_box']
+            cv2.rectangle(frame, (x, y), (x + w, y + h), (0, 255, 0), 2)
         if not emotions:
-            return True, frame
-        
-        # Draw emotion information on the frame
-        height, width = frame.shape[:2]
+            return frame
         
         # Draw a semi-transparent background for the text
         overlay = frame.copy()
@@ -195,30 +353,28 @@ class HealthTracker:
             cv2.putText(frame, text, (20, y), 
                        cv2.FONT_HERSHEY_SIMPLEX, 0.6, (0, 255, 0), 1)
         
-        # Calculate and draw engagement score
-        engagement = self.calculate_engagement(emotions)
-        engagement_text = f"Engagement: {engagement:.2f}"
+        # Draw engagement score
+        engagement_text = f"Engagement: {data['engagement']:.2f}"
         cv2.putText(frame, engagement_text, (20, y + 40),
                    cv2.FONT_HERSHEY_SIMPLEX, 0.7, (0, 255, 0), 2)
-        
-        # Update latest data
-        self.latest_data = {
-            'timestamp': datetime.now().isoformat(),
-            'emotions': emotions,
-            'engagement': engagement,
-            'dominant_emotion': max(emotions.items(), key=lambda x: x[1])[0] if emotions else 'unknown'
-        }
-        
-        # Keep history limited
-        self.emotion_history.append(self.latest_data)
-        if len(self.emotion_history) > 100:
-            self.emotion_history.pop(0)
-            
-        self.engagement_scores.append(engagement)
-        if len(self.engagement_scores) > 100:
-            self.engagement_scores.pop(0)
-        
-        return True, frame
+        return frame
+    
+    def get_annotated_frame(self):
+        """(success, newest captured frame with the latest emotion overlay); never reads the camera"""
+        seq, frame = self.frames.latest()
+        if frame is None:
+            return False, None
+        return True, self.annotate(frame)
+    
+    def next_annotated_frame(self, last_seq: int = 0, timeout: float = 1.0):
+        """(seq, annotated frame) for the first frame captured after last_seq, waiting up to timeout.
+
+        Returns (last_seq, None) when no newer frame arrived in time.
+        """
+        seq, frame = self.frames.wait_newer(last_seq, timeout)
+        if frame is None or seq <= last_seq:
+            return last_seq, None
+        return seq, self.annotate(frame)
     
     def get_summary(self) -> Dict:
         if not self.emotion_history:
@@ -234,89 +390,270 @@ class HealthTracker:
         }
     
     def start(self):
-        """Start the background update thread."""
+        """Start the capture and inference threads."""
         if not self.initialize():
-            print("Failed to initialize health tracker")
+            logger.error("Failed to initialize health tracker")
             return False
             
         if not self.running:
             self.running = True
-            self.thread = threading.Thread(target=self._update_loop)
-            self.thread.daemon = True
+            self._stop.clear()
+            self.capture_thread = threading.Thread(target=self._capture_loop, name='health-tracker-capture',
+                                                   daemon=True)
+            self.thread = threading.Thread(target=self._update_loop, name='health-tracker-inference', daemon=True)
+            self.capture_thread.start()
             self.thread.start()
-            print("Health tracking started")
+            logger.info("Health tracking started", extra={'update_interval': self.update_interval})
         return True
     
     def stop(self):
-        """Stop the background update thread."""
+        """Stop the capture and inference threads."""
         self.running = False
-        if self.thread is not None:
-            self.thread.join(timeout=1.0)
-        print("Health tracking stopped")
+        self._stop.set()
+        for thread in (self.capture_thread, self.thread):
+            if thread is not None:
+                thread.join(timeout=1.0)
+        logger.info("Health tracking stopped")
+        self.capture_thread = None
         self.thread = None
     
+    def _capture_loop(self):
+        """Read frames as fast as the camera delivers them; cap.read() paces the loop"""
+        while self.running:
+            try:
+                ret, frame = self.cap.read()
+                if not ret:
+                    self._stats['read_failures'] += 1
+                    self._stop.wait(0.05)
+                    continue
+                self.frames.put(frame)
+                self._stats['captured'] += 1
+            except Exception as e:
+                logger.error("Error in capture loop: %s", e)
+                self._stop.wait(1)
+    
     def _update_loop(self):
+        """Classify the newest frame once per update_interval, skipping frames already seen"""
+        last_seq = 0
         while self.running:
+            started = time.monotonic()
             try:
-                self.get_annotated_frame()
-                time.sleep(0.1)
+                seq, frame = self.frames.wait_newer(last_seq, timeout=1.0)
+                if frame is not None and seq > last_seq and not self.gate.changed(frame):
+                    # Nothing moved since the last inference: keep its result
+                    last_seq = seq
+                    self._record(self.latest_data.get('emotions', {}))
+                    EMOTION_FRAMES_REUSED.inc()
+                elif frame is not None and seq > last_seq:
+                    last_seq = seq
+                    self._record(self.get_emotion(frame))
+                    self.last_update = time.time()
+                    self._stats['inferred'] += 1
+                    self._stats['inference_seconds'] += time.monotonic() - started
             except Exception as e:
-                print(f"Error in update loop: {e}")
-                time.sleep(1)
+                logger.error("Error in update loop: %s", e)
+            self._stop.wait(max(0.0, self.update_interval - (time.monotonic() - started)))
     
+    def get_status(self) -> Dict:
+        """What the tracker has loaded and opened, for /statusz."""
+        inferred = self._stats['inferred']
+        return {
+            'running': self.running,
+            'detector_loaded': self.batcher is not None,
+            'camera_open': self.cap is not None and self.cap.isOpened(),
+            'last_update': self.latest_data.get('timestamp'),
+            'update_interval': self.update_interval,
+            'frames_captured': self._stats['captured'],
+            'frames_inferred': inferred,
+            'camera_read_failures': self._stats['read_failures'],
+            'avg_inference_ms': round(self._stats['inference_seconds'] / inferred * 1000, 1) if inferred else None,
+            'face': self.faces.get_stats(),
+            'change_gate': self.gate.get_stats()
+        }
+
     def release(self):
         self.stop()
-        if hasattr(self, 'cap') and self.cap.isOpened():
+        if self.cap is not None and self.cap.isOpened():
             self.cap.release()
 
 # Initialize Flask app
 app = Flask(__name__)
 CORS(app)
 
-# Initialize health tracker (but don't start it yet)
-health_tracker = HealthTracker()
+@app.before_request
+def assign_request_id():
+    """Tag everything logged for this request with the caller's X-Request-Id (or a new one)"""
+    new_request_id(request.headers.get('X-Request-Id'))
+
+@app.after_request
+def echo_request_id(response):
+    response.headers['X-Request-Id'] = get_request_id()
+    return response
+
+# Bounds concurrent /process_audio work (ffmpeg, provider calls); extra turns wait briefly
+# for a slot or are refused at once with Retry-After
+turn_scheduler = TurnScheduler(
+    max_active=int(os.getenv("TURN_MAX_ACTIVE", 8)),
+    max_queued=int(os.getenv("TURN_MAX_QUEUED", 16)),
+    queue_timeout=float(os.getenv("TURN_QUEUE_TIMEOUT", 10))
+)
+
+REJECTION_MESSAGES = {
+    'session_busy': "A turn is already in progress for this session",
+    'queue_full': "Server is busy, please retry shortly",
+    'queue_timeout': "Server is busy, please retry shortly"
+}
+
+def rejection_response(rejection):
+    """429/503 JSON answer for a turn the scheduler refused"""
+    response = jsonify({'error': REJECTION_MESSAGES.get(rejection.reason, str(rejection)),
+                        'reason': rejection.reason})
+    response.status_code = rejection.status
+    response.headers['Retry-After'] = str(rejection.retry_after)
+    return response
+
+@app.before_request
+def admit_turn():
+    """Hold a scheduler slot for each voice turn, or answer 429/503 without doing any work"""
+    # CORS preflights are not turns; a refused preflight would hide the real 429/503 from the browser
+    if request.endpoint != 'process_audio' or request.method == 'OPTIONS':
+        return None
+    session_id = admission_key(current_session().session_id, request.remote_addr)
+    try:
+        turn_scheduler.acquire(session_id)
+    except TurnRejected as e:
+        logger.warning("Voice turn rejected", extra={'reason': e.reason, 'session_id': session_id})
+        return rejection_response(e)
+    g.turn_session = session_id
+
+@app.after_request
+def release_turn(response):
+    # Streamed turns keep their slot until the body has been sent
+    session_id = g.pop('turn_session', None)
+    if session_id is not None:
+        response.call_on_close(lambda: turn_scheduler.release(session_id))
+    return response
+
+# X-Profile / ?profile= runs a request under a profiler (PROFILE_REQUESTS, PROFILE_DIR);
+# PROFILE_BACKGROUND or SIGUSR2 samples the tracker threads
+profiling.init_app(app)
+
+# One emotion model shared by every tracker. A lone producer (today's single tracker) is classified
+# inline on its own thread; frames arriving while the model is busy are classified together in one
+# call of up to EMOTION_BATCH_SIZE frames, waiting EMOTION_BATCH_WAIT_MS (default 0) for more
+emotion_batcher = None
+_emotion_batcher_lock = threading.Lock()
+
+def get_emotion_batcher() -> Optional[EmotionBatcher]:
+    """The shared batched emotion model, loaded on first use; None if EmotiEffLib is not installed"""
+    global emotion_batcher
+    if emotion_batcher is None:
+        with _emotion_batcher_lock:
+            if emotion_batcher is None:
+                try:
+                    from emotiefflib import HSEmotionDetector
+                except ImportError:
+                    logger.warning("EmotiEffLib not found. Using mock emotion detection.")
+                    emotion_batcher = False
+                else:
+                    emotion_batcher = EmotionBatcher(
+                        HSEmotionDetector().predict_emotions,
+                        max_batch=int(os.getenv("EMOTION_BATCH_SIZE", 8)),
+                        max_wait=float(os.getenv("EMOTION_BATCH_WAIT_MS", 0)) / 1000
+                    )
+                    logger.info("Emotion detection initialized")
+    return emotion_batcher or None
+
+# Created by the first /start_problem or video feed, so voice-only instances never build it
+health_tracker = None
+_health_tracker_lock = threading.Lock()
+
+def get_health_tracker() -> HealthTracker:
+    """The shared camera/emotion tracker, created (but not started) on first use"""
+    global health_tracker
+    if health_tracker is None:
+        with _health_tracker_lock:
+            if health_tracker is None:
+                health_tracker = HealthTracker(
+                    update_interval=float(os.getenv("HEALTH_UPDATE_INTERVAL", 1.0)),
+                    change_threshold=float(os.getenv("HEALTH_CHANGE_THRESHOLD", 0.02)),
+                    max_reuse_seconds=float(os.getenv("HEALTH_MAX_REUSE_SECONDS", 10))
+                )
+    return health_tracker
+
+def release_session(session):
+    """Stop the camera when an evicted session was the last one solving a problem"""
+    session.solving = False
+    if health_tracker is not None and health_tracker.running and not sessions.any_solving():
+        health_tracker.stop()
+
+# Per-candidate state (code, journal, tracker handle, analysis), keyed by the frontend's session id
+sessions = SessionRegistry(
+    journals=journals,
+    max_sessions=int(os.getenv("SESSION_MAX", 256)),
+    idle_ttl=float(os.getenv("SESSION_IDLE_TTL", 3600)),
+    spill_path=os.getenv("SESSION_SPILL_DB") or None,
+    on_evict=release_session
+)
+
+def current_session():
+    """Session named by the X-Session-Id header or a session_id query/form/JSON field"""
+    body = request.get_json(silent=True) if request.is_json else None
+    return sessions.get(resolve_session_id(
+        request.headers.get('X-Session-Id'),
+        request.args.get('session_id'),
+        request.form.get('session_id'),
+        body.get('session_id') if isinstance(body, dict) else None
+    ))
 
 @app.route('/start_problem', methods=['POST'])
 def start_problem():
     """Start health tracking when user starts a problem"""
-    global is_solving_problem
-    if not is_solving_problem:
-        is_solving_problem = True
-        if not health_tracker.running:
-            health_tracker.start()
-    return jsonify({"status": "started" if is_solving_problem else "error"})
+    session = current_session()
+    if not session.solving:
+        session.solving = True
+        session.tracker = session.tracker or get_health_tracker()
+        if not session.tracker.running:
+            session.tracker.start()
+    return jsonify({"status": "started" if session.solving else "error"})
 
 @app.route('/end_problem', methods=['POST'])
 def end_problem():
     """Stop health tracking when user finishes a problem"""
-    global is_solving_problem
-    if is_solving_problem:
-        is_solving_problem = False
-        if health_tracker.running:
-            health_tracker.stop()
-    return jsonify({"status": "stopped" if not is_solving_problem else "error"})
-
-def speech_to_text(audio_path):
-    """Convert speech to text using ElevenLabs API"""
+    session = current_session()
+    if session.solving:
+        session.solving = False
+        # The camera is shared: keep it running while another candidate is mid-problem
+        if session.tracker is not None and session.tracker.running and not sessions.any_solving():
+            session.tracker.stop()
+    return jsonify({"status": "stopped" if not session.solving else "error"})
+
+def speech_to_text(audio):
+    """Convert speech to text using ElevenLabs API
+    
+    Args:
+        audio: WAV bytes already in memory, or a path to an audio file
+    """
     try:
-        if not os.path.exists(audio_path):
-            print(f"Audio file not found: {audio_path}")
-            return None
+        if isinstance(audio, (bytes, bytearray)):
+            audio_data = bytes(audio)
+        else:
+            if not os.path.exists(audio):
+                logger.error("Audio file not found: %s", audio)
+                return None
+                
+            # Read the audio file
+            with open(audio, 'rb') as f:
+                audio_data = f.read()
             
-        # Verify file is not empty
-        file_size = os.path.getsize(audio_path)
-        if file_size == 0:
-            print(f"Error: Audio file is empty: {audio_path}")
+        # Verify audio is not empty
+        if not audio_data:
+            logger.error("Audio is empty")
             return None
             
-        print(f"Reading audio file: {audio_path} (size: {file_size} bytes)")
-            
-        # Read the audio file
-        with open(audio_path, 'rb') as f:
-            audio_data = f.read()
+        logger.debug("Transcribing audio", extra={'bytes': len(audio_data)})
             
         # Prepare the request
-        url = "https://api.elevenlabs.io/v1/speech-to-text"
         
         # Set the model ID for speech-to-text
         model_id = "scribe_v2"  # Using the latest available model
@@ -327,81 +664,101 @@ def speech_to_text(audio_path):
             'file': ('audio.wav', audio_data, 'audio/wav')
         }
         
-        headers = {
-            "Accept": "application/json",
-            "xi-api-key": ELEVENLABS_API_KEY
-        }
-        
-        print(f"Sending request to ElevenLabs API...")
-        response = requests.post(url, headers=headers, files=files, timeout=30)
+        headers = {"Accept": "application/json"}
         
-        print(f"API Response Status: {response.status_code}")
+        response = elevenlabs.post('stt', '/v1/speech-to-text', headers=headers, files=files)
         
         if response.status_code == 200:
             result = response.json()
             text = result.get('text', '').strip()
-            print(f"Successfully transcribed text: {text}")
+            logger.debug("Transcribed audio", extra={'chars': len(text)})
             return text
         else:
-            error_msg = f"Error in speech-to-text API: {response.status_code} - {response.text}"
-            print(error_msg)
+            logger.error("Error in speech-to-text API: %s - %s", response.status_code, response.text)
             return None
             
     except requests.exceptions.RequestException as e:
-        error_msg = f"Request error in speech_to_text: {str(e)}"
-        print(error_msg)
+        logger.error("Request error in speech_to_text: %s", e)
         return None
     except json.JSONDecodeError as e:
-        error_msg = f"Failed to parse API response: {str(e)}"
-        print(error_msg)
-        return None
-    except Exception as e:
-        error_msg = f"Unexpected error in speech_to_text: {str(e)}"
-        print(error_msg)
-        import traceback
-        traceback.print_exc()
+        logger.error("Failed to parse API response: %s", e)
         return None
+    except Exception:
+        logger.exception("Unexpected error in speech_to_text")
         return None
 
 @app.route('/save-code', methods=['POST'])
 def save_code():
-    """Save code from the frontend to test.txt"""
+    """Save code from the frontend in the candidate's session"""
     try:
         data = request.get_json()
         code = data.get('code', '')
         
-        # Get the absolute path to test.txt in the project root
-        test_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test.txt')
-        
-        # Write the code to test.txt
-        with open(test_file_path, 'w') as f:
-            f.write(code)
-        
-        print(f"Code saved to {test_file_path} (size: {len(code)} bytes)")
+        session = current_session()
+        session.code = code
+        logger.info("Code saved", extra={'session_id': session.session_id, 'bytes': len(code)})
         return jsonify({"status": "success", "message": "Code saved successfully"})
         
     except Exception as e:
-        print(f"Error saving code: {str(e)}")
+        logger.error("Error saving code: %s", e)
         return jsonify({"status": "error", "message": str(e)}), 500
 
+def apply_vad(wav_data):
+    """Run voice-activity trimming when enabled.
+
+    Returns:
+        (wav bytes to transcribe or None if there is no speech, stats dict)
+    """
+    if not VAD_ENABLED:
+        return wav_data, {}
+    try:
+        trimmed, stats = trim_silence(wav_data, **VAD_SETTINGS)
+    except Exception as e:
+        logger.warning("Silence trimming failed, sending untrimmed audio: %s", e)
+        return wav_data, {}
+    if trimmed is None:
+        logger.info("No speech detected, skipping speech-to-text", extra={'vad': stats})
+    else:
+        logger.debug("Trimmed silence", extra={'vad': stats})
+    return trimmed, stats
+
+def vad_headers(vad_stats):
+    """Report what silence trimming saved on the response"""
+    if not vad_stats:
+        return {}
+    return {
+        'X-VAD-Seconds-Saved': f"{vad_stats['seconds_saved']:.3f}",
+        'X-VAD-Bytes-Saved': str(vad_stats['bytes_saved'])
+    }
+
+def build_interviewer_prompt(text, question_title, test_code):
+    """Wrap the candidate's question with their current code"""
+    if test_code is None:
+        return text
+
+    # Add the code context to the user's question with an interviewer-style prompt
+    return f"""You are a technical interviewer. The candidate has shared this code for {question_title}:
+```python
+{test_code}
+```
+
+Candidate's question: {text}
+
+Respond concisely (1-2 sentences max) in an interview-appropriate way. Be helpful but don't give away the solution. Ask guiding questions if needed."""
+
 @app.route('/process_audio', methods=['POST'])
 def process_audio():
     """Process audio input and return a response"""
-    print("\n=== New Audio Processing Request ===")
-    
     try:
-        # Log request details for debugging
-        print(f"1. Request Headers: {dict(request.headers)}")
-        print(f"2. Request Content-Type: {request.content_type}")
-        print(f"3. Request Content-Length: {request.content_length} bytes")
-        print(f"4. Request Method: {request.method}")
-        print(f"5. Request URL: {request.url}")
-        print(f"6. Request Form: {request.form}")
-        print(f"7. Request Files: {request.files}")
+        logger.debug("Audio processing request", extra={
+            'content_type': request.content_type,
+            'content_length': request.content_length,
+            'args': request.args.to_dict()
+        })
         
         # Check if the post request has the file part
         if 'audio' not in request.files:
-            print("8. No audio file part in the request")
+            logger.info("No audio file part in the request")
             return jsonify({"error": "No audio file provided"}), 400
             
         audio_file = request.files['audio']
@@ -409,202 +766,258 @@ def process_audio():
         # If user does not select file, browser also
         # submit an empty part without filename
         if audio_file.filename == '':
-            print("8. No selected file")
+            logger.info("No selected file")
             return jsonify({"error": "No selected file"}), 400
             
         if audio_file:
-            print(f"8. Received audio file: {audio_file.filename} (content type: {audio_file.content_type}, content length: {audio_file.content_length} bytes)")
-            
-            # Save the uploaded file with its original extension
-            file_ext = os.path.splitext(audio_file.filename)[1] or '.webm'
-            audio_path = os.path.join('uploads', f'input{file_ext}')
-            audio_file.save(audio_path)
-            print(f"9. File saved to {audio_path} (size: {os.path.getsize(audio_path)} bytes)")
-            
-            # Convert speech to text
-            print("10. Converting speech to text...")
-            
-            # If the file is not WAV, we need to convert it first
-            if not audio_path.lower().endswith('.wav'):
-                import subprocess
-                wav_path = os.path.splitext(audio_path)[0] + '.wav'
-                print(f"10.1. Converting {audio_path} to WAV format: {wav_path}")
-                
-                try:
-                    # Verify input file exists and has content
-                    if not os.path.exists(audio_path) or os.path.getsize(audio_path) == 0:
-                        error_msg = f"Input audio file is missing or empty: {audio_path}"
-                        print(error_msg)
-                        return jsonify({"error": error_msg}), 400
-                    
-                    # Use ffmpeg to convert the audio to WAV format (16kHz, 16-bit, mono)
-                    result = subprocess.run([
-                        'ffmpeg', '-y',
-                        '-i', audio_path,
-                        '-ar', '16000',
-                        '-ac', '1',
-                        '-c:a', 'pcm_s16le',
-                        wav_path
-                    ], check=True, capture_output=True, text=True)
-                    
-                    # Verify the output file was created and has content
-                    if not os.path.exists(wav_path) or os.path.getsize(wav_path) == 0:
-                        error_msg = f"Failed to convert audio file. FFmpeg output: {result.stderr}"
-                        print(error_msg)
-                        return jsonify({"error": "Failed to convert audio format"}), 400
-                        
-                    print(f"10.2. Successfully converted to WAV: {wav_path} (size: {os.path.getsize(wav_path)} bytes)")
-                    
-                    # Process the converted file
-                    text = speech_to_text(wav_path)
-                    
-                    # Clean up the converted file
-                    try:
-                        if os.path.exists(wav_path):
-                            os.remove(wav_path)
-                            print(f"10.3. Cleaned up temporary WAV file")
-                    except Exception as cleanup_error:
-                        print(f"Warning: Failed to clean up temporary WAV file: {str(cleanup_error)}")
-                        
-                except subprocess.CalledProcessError as e:
-                    error_msg = f"Error converting audio to WAV: {str(e)}\nFFmpeg stderr: {e.stderr}"
-                    print(error_msg)
-                    return jsonify({"error": "Failed to process audio format"}), 400
-                except Exception as e:
-                    error_msg = f"Unexpected error during audio conversion: {str(e)}"
-                    print(error_msg)
-                    import traceback
-                    traceback.print_exc()
-                    return jsonify({"error": "Failed to process audio"}), 500
-            else:
-                text = speech_to_text(audio_path)
+            session = current_session()
+            timeline = TurnTimeline()
+            
+            # Keep the upload in memory; it is decoded straight from this buffer
+            with timeline.stage('upload'):
+                audio_data = audio_file.read()
+            
+            if not audio_data:
+                return jsonify({"error": "Uploaded audio is empty"}), 400
+            
+            # Decode to 16kHz mono WAV in memory (WAV uploads pass straight through)
+            with timeline.stage('transcode'):
+                wav_data = transcode_to_wav(audio_data)
+            if wav_data is None:
+                return jsonify({"error": "Failed to process audio format"}), 400
+            
+            # Trim silence before upload; clips with no speech never reach the provider
+            with timeline.stage('vad'):
+                wav_data, vad_stats = apply_vad(wav_data)
+            if wav_data is None:
+                return jsonify({"error": "No speech detected", "vad": vad_stats}), 400
+            
+            with timeline.stage('stt'):
+                text = speech_to_text(wav_data)
             
             if not text:
                 return jsonify({"error": "Failed to transcribe audio"}), 500
                 
-            print(f"11. Speech-to-Text Result: {text}")
             
-            # Log user's input
-            log_conversation("User", text)
+            # Log user's input (off the critical path, in order with later entries)
+            log_conversation_async("User", text, session.session_id)
             
-            # Process with Gemini
-            print("12. Processing with Gemini...")
+            # Get the current question title from the frontend or use a default
+            question_title = request.args.get('question_title', 'the coding problem')
+            test_code = session.code
+            with timeline.stage('prompt'):
+                prompt = build_interviewer_prompt(text, question_title, test_code)
             
-            # Read the current content of test.txt
-            test_file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'test.txt')
-            try:
-                with open(test_file_path, 'r') as f:
-                    test_code = f.read()
-                print(f"Current code in test.txt ({len(test_code)} chars):\n{test_code[:200]}{'...' if len(test_code) > 200 else ''}")
-                
-                # Get the current question title from the frontend or use a default
-                question_title = request.args.get('question_title', 'the coding problem')
-                
-                # Add the code context to the user's question with an interviewer-style prompt
-                context = f"""You are a technical interviewer. The candidate has shared this code for {question_title}:
-```python
-{test_code}
-```
-
-Candidate's question: {text}
-
-Respond concisely (1-2 sentences max) in an interview-appropriate way. Be helpful but don't give away the solution. Ask guiding questions if needed."""
-                gemini_output = run_gemini(context)
-            except FileNotFoundError:
-                print("test.txt not found, processing without code context")
-                gemini_output = run_gemini(text)
+            # Repeated questions about unchanged code are answered from the hint cache
+            # unless the client opts out with ?no_cache=1 or Cache-Control: no-cache
+            use_cache = (request.args.get('no_cache') != '1'
+                         and 'no-cache' not in request.headers.get('Cache-Control', ''))
+            key = hint_key(test_code or '', question_title, text)
+            cached_reply = hint_cache.get(key) if use_cache else None
+            if cached_reply is not None:
+                logger.debug("Hint cache hit, skipping Gemini")
+            
+            # Streaming mode: relay audio sentence-by-sentence as Gemini generates it
+            if request.args.get('stream') == '1':
+                return Response(
+                    stream_voice_response(prompt, cached_reply, key if use_cache else None, timeline,
+                                          session.session_id),
+                    mimetype='audio/mpeg',
+                    headers={
+                        'Cache-Control': 'no-cache',
+                        'X-Accel-Buffering': 'no',
+                        **vad_headers(vad_stats)
+                    }
+                )
+            
+            if cached_reply is not None:
+                gemini_output = cached_reply
+            else:
+                # Make sure a live TTS connection is waiting once Gemini is done
+                timeline.run('tts_warmup', elevenlabs.warm)
+                with timeline.stage('gemini'):
+                    if use_cache:
+                        # The same question about the same code, already being answered
+                        gemini_output = flights['hint'].do(key, run_gemini, prompt)
+                    else:
+                        gemini_output = run_gemini(prompt)
+                if use_cache and gemini_output != ERROR_REPLY:
+                    hint_cache.put(key, gemini_output)
                 
-            print(f"13. Gemini Response: {gemini_output[:200]}...")  # Print first 200 chars
             
             # Log AI's response
-            log_conversation("AI", gemini_output)
+            log_conversation_async("AI", gemini_output, session.session_id)
             
             # 3. Text-to-speech
-            print("14. Converting response to speech...")
-            audio_path = text_to_speech(gemini_output)
+            with timeline.stage('tts'):
+                audio = synthesize_speech(gemini_output)
             
-            if not audio_path or not os.path.exists(audio_path):
-                error_msg = f"Failed to generate speech. Audio path: {audio_path}"
-                print(f"ERROR: {error_msg}")
-                log_conversation("Error", error_msg)
+            if not audio:
+                error_msg = "Failed to generate speech"
+                logger.error(error_msg)
+                log_conversation_async("Error", error_msg, session.session_id)
                 return jsonify({"error": "Failed to generate speech"}), 500
                 
-            print(f"15. Audio generated successfully at {audio_path} (size: {os.path.getsize(audio_path)} bytes)")
-            
-            # 4. Send the audio file back
-            response = send_file(
-                audio_path,
-                mimetype='audio/mpeg',
-                as_attachment=True,
-                download_name='response.mp3'
-            )
-            
-            # Clean up the audio file after sending
-            response.call_on_close(lambda: os.remove(audio_path) if audio_path and os.path.exists(audio_path) else None)
+            
+            # 4. Send the audio back from memory
+            response = audio_response(audio, 'response.mp3', as_attachment=True)
+            response.headers.update(vad_headers(vad_stats))
+            response.headers['X-Turn-Timing'] = timeline.header()
+            # send_file's passthrough skips close callbacks, so let werkzeug iterate the body
+            response.direct_passthrough = False
+            response.call_on_close(timeline.on_sent('buffered'))
+            logger.info("Turn complete", extra={'mode': 'buffered', 'timing': timeline.breakdown()})
             return response
             
     except Exception as e:
-        import traceback
         error_trace = traceback.format_exc()
-        print(f"\n=== ERROR in process_audio ===")
-        print(error_trace)
-        print(f"Error details: {str(e)}")
-        print("==========================\n")
+        logger.exception("Error in process_audio")
         return jsonify({
             "error": "Audio processing failed",
             "details": str(e),
             "trace": error_trace
         }), 500
 
-def text_to_speech(text, output_file='output.mp3'):
-    """Convert text to speech using ElevenLabs API"""
+def _tts_request(text):
+    """Headers and JSON body shared by the ElevenLabs TTS endpoints"""
+    headers = {
+        "Accept": "audio/mpeg",
+        "Content-Type": "application/json"
+    }
+    
+    data = {
+        "text": text,
+        "model_id": TTS_MODEL_ID,
+        "voice_settings": TTS_VOICE_SETTINGS
+    }
+    return headers, data
+
+def _tts_cache_key(text):
+    return cache_key(text, VOICE_ID, TTS_MODEL_ID, TTS_VOICE_SETTINGS)
+
+def synthesize_speech(text):
+    """Convert text to speech using ElevenLabs API, returning the MP3 bytes"""
+    if not text or not ELEVENLABS_API_KEY or not VOICE_ID:
+        logger.error("Missing required parameters for TTS")
+        return None
+        
+    # Previously synthesized lines are served without calling the provider
+    key = _tts_cache_key(text)
+    cached = tts_cache.get(key)
+    if cached is not None:
+        return cached
+    # The audio depends only on the text and voice, so any session's identical request can share it
+    return flights['tts'].do(key, _synthesize_uncached, text, key)
+
+def _synthesize_uncached(text, key):
     try:
-        if not text or not ELEVENLABS_API_KEY or not VOICE_ID:
-            print("Missing required parameters for TTS")
-            return None
-            
         # Prepare the request
-        url = f"https://api.elevenlabs.io/v1/text-to-speech/{VOICE_ID}"
-        
-        headers = {
-            "Accept": "audio/mpeg",
-            "Content-Type": "application/json",
-            "xi-api-key": ELEVENLABS_API_KEY
-        }
-        
-        data = {
-            "text": text,
-            "model_id": "eleven_turbo_v2",
-            "voice_settings": {
-                "stability": 0.5,
-                "similarity_boost": 0.75,
-                "style": 0.5,
-                "use_speaker_boost": True
-            }
-        }
+        headers, data = _tts_request(text)
         
         # Make the API request
-        response = requests.post(url, json=data, headers=headers)
+        response = elevenlabs.post('tts', f"/v1/text-to-speech/{VOICE_ID}", json=data, headers=headers)
         
         # Check if the request was successful
         if response.status_code == 200:
-            # Save the audio file
-            with open(output_file, 'wb') as f:
-                f.write(response.content)
-            print(f"TTS audio saved to {output_file}")
-            return output_file
+            tts_cache.put(key, response.content)
+            return response.content
         else:
-            print(f"Error in TTS API request: {response.status_code} - {response.text}")
+            logger.error("Error in TTS API request: %s - %s", response.status_code, response.text)
             return None
             
     except Exception as e:
-        print(f"Error in text_to_speech: {str(e)}")
+        logger.error("Error in text_to_speech: %s", e)
+        return None
+
+def text_to_speech(text, output_file='output.mp3'):
+    """Convert text to speech and save it to output_file (for scripts and tests)"""
+    audio = synthesize_speech(text)
+    if audio is None:
         return None
+    with open(output_file, 'wb') as f:
+        f.write(audio)
+    logger.info("TTS audio saved to %s", output_file)
+    return output_file
+
+def audio_response(audio, download_name, as_attachment):
+    """Serve MP3 bytes straight from memory"""
+    return send_file(
+        io.BytesIO(audio),
+        mimetype='audio/mpeg',
+        as_attachment=as_attachment,
+        download_name=download_name,
+        conditional=True
+    )
+
+def text_to_speech_stream(text):
+    """Stream synthesized speech for text, yielding MP3 chunks as they arrive"""
+    if not text or not ELEVENLABS_API_KEY or not VOICE_ID:
+        logger.error("Missing required parameters for TTS")
+        return
+        
+    key = _tts_cache_key(text)
+    cached = tts_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+        
+    headers, data = _tts_request(text)
+    
+    try:
+        with elevenlabs.post('tts', f"/v1/text-to-speech/{VOICE_ID}/stream",
+                             json=data, headers=headers, stream=True) as response:
+            if response.status_code != 200:
+                logger.error("Error in TTS stream request: %s - %s", response.status_code, response.text)
+                return
+            audio = bytearray()
+            for chunk in response.iter_content(chunk_size=4096):
+                if chunk:
+                    audio += chunk
+                    yield chunk
+        # Only cache clips that streamed through completely
+        tts_cache.put(key, bytes(audio))
+    except requests.exceptions.RequestException as e:
+        logger.error("Request error in text_to_speech_stream: %s", e)
+
+def stream_voice_response(prompt, cached_reply=None, cache_key=None, timeline=None, session_id='default'):
+    """Generate the interviewer reply with Gemini and relay it as MP3 audio.
+
+    Gemini output is consumed on a background thread and cut into sentences;
+    each sentence is synthesized as soon as it is complete, so the first audio
+    bytes reach the client while the rest of the reply is still generating.
+    A cached_reply skips Gemini entirely; otherwise a complete reply is stored
+    under cache_key (when given) for the hint cache.
+    """
+    timeline = timeline or TurnTimeline()
+    if cached_reply is not None:
+        chunks = iter([cached_reply])
+    else:
+        # Make sure a live TTS connection is waiting for the first sentence
+        timeline.run('tts_warmup', elevenlabs.warm)
+        chunks = iter_in_background(timeline.iterate('gemini', run_gemini_stream(prompt)))
+    
+    spoken = []
+    try:
+        with timeline.stage('stream'):
+            for sentence in iter_sentences(chunks):
+                spoken.append(sentence)
+                with timeline.stage('tts'):
+                    for chunk in text_to_speech_stream(sentence):
+                        yield chunk
+    finally:
+        # The full breakdown (Gemini overlapping per-sentence TTS) only exists now,
+        # after the headers are long gone, so it is logged rather than sent
+        logger.info("Turn complete", extra={'mode': 'stream', 'timing': timeline.breakdown()})
+        timeline.finish('stream')
+    
+    gemini_output = ' '.join(spoken)
+    log_conversation_async("AI", gemini_output, session_id)
+    if cached_reply is None and cache_key and ERROR_REPLY not in gemini_output:
+        hint_cache.put(cache_key, gemini_output)
 
 @app.route('/text-to-speech', methods=['POST'])
 def handle_text_to_speech():
     """Endpoint to handle text-to-speech conversion"""
-    audio_path = None
     try:
         data = request.get_json()
         if not data or 'text' not in data:
@@ -614,99 +1027,128 @@ def handle_text_to_speech():
             }), 400
             
         text = data['text'].strip()
+        session_id = current_session().session_id
         
         # Log the TTS request
-        print(f"Received TTS request for text: {text[:50]}...")
-        log_conversation("TTS Input", text)
+        logger.debug("Received TTS request", extra={'chars': len(text)})
+        log_conversation("TTS Input", text, session_id)
         
         # Generate speech using ElevenLabs
-        audio_path = text_to_speech(text)
+        audio = synthesize_speech(text)
         
-        if not audio_path or not os.path.exists(audio_path):
+        if not audio:
             error_msg = f"Failed to generate speech for text: {text[:200]}..."
-            log_conversation("TTS Error", error_msg)
+            log_conversation("TTS Error", error_msg, session_id)
             return jsonify({'error': 'Failed to generate speech'}), 500
             
         # Log successful TTS generation
-        log_conversation("TTS Output", f"Generated audio: {os.path.basename(audio_path)} ({os.path.getsize(audio_path)} bytes)")
-            
-        # Return the audio file
-        response = send_file(
-            audio_path,
-            mimetype='audio/mpeg',
-            as_attachment=False,
-            download_name='speech.mp3',
-            conditional=True
-        )
-        
-        # Clean up the audio file after sending
-        response.call_on_close(lambda: os.remove(audio_path) if audio_path and os.path.exists(audio_path) else None)
-        return response
+        log_conversation("TTS Output", f"Generated audio: speech.mp3 ({len(audio)} bytes)", session_id)
+            
+        # Return the audio from memory
+        return audio_response(audio, 'speech.mp3', as_attachment=False)
         
     except Exception as e:
         error_msg = f"Error in text-to-speech endpoint: {str(e)}"
-        print(error_msg)
-        log_conversation("TTS Error", error_msg)
-        
-        # Clean up in case of error
-        if audio_path and os.path.exists(audio_path):
-            try:
-                os.remove(audio_path)
-            except Exception as cleanup_error:
-                log_conversation("Cleanup Error", f"Failed to remove audio file: {str(cleanup_error)}")
+        logger.error(error_msg)
+        log_conversation("TTS Error", error_msg, current_session().session_id)
         return jsonify({'error': str(e)}), 500
 
+@app.route('/text-to-speech/cache', methods=['GET'])
+def tts_cache_stats():
+    """Hit/miss counters and tier sizes for the TTS audio cache"""
+    return jsonify({'status': 'success', 'data': tts_cache.get_stats()})
+
+def readiness():
+    """(ready, checks): an instance is ready once the Gemini handles are warm"""
+    checks = {'gemini_warm': gateway.is_warm()}
+    return all(checks.values()), checks
+
+def status_report() -> Dict:
+    """Warm state, provider pools, tracker state and turn load of this process"""
+    ready, checks = readiness()
+    return {
+        'ready': ready,
+        'checks': checks,
+        'uptime_seconds': round(time.time() - STARTED_AT, 1),
+        'fast_start': FAST_START,
+        'deferred_imports': {name: round(seconds, 3) for name, seconds in get_load_times().items()},
+        'gemini': {'warm': gateway.is_warm(), 'models': gateway.models if gateway.configured else None},
+        'elevenlabs': elevenlabs.get_pool_stats(),
+        'health_tracker': health_tracker.get_status() if health_tracker is not None else None,
+        'emotion_batcher': emotion_batcher.get_stats() if emotion_batcher else None,
+        'turns': {**turn_scheduler.get_stats(), **get_executor_stats()},
+        'single_flight': {name: flight.get_stats() for name, flight in flights.items()},
+        'video_feed': video_broadcaster.get_stats(),
+        'sessions': sessions.get_stats()
+    }
+
+@app.route('/readyz', methods=['GET'])
+def readyz():
+    """200 once this instance can take turns without cold-start costs, else 503"""
+    ready, checks = readiness()
+    return jsonify({'ready': ready, 'checks': checks}), 200 if ready else 503
+
+@app.route('/statusz', methods=['GET'])
+def statusz():
+    return jsonify(status_report())
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    """Stage latency histograms and provider/LLM error counters in Prometheus text format"""
+    return Response(REGISTRY.render(), mimetype='text/plain; version=0.0.4')
+
+def generate_interview_analysis(session):
+    """Score the session's interview and add Gemini's written summary"""
+    # Generate the analysis report
+    # '' rather than None: a session without code must not be scored on another run's test.txt
+    analysis = analyze_interview(journal=session.journal, code=session.code or '')
+    
+    # Log the analysis for reference
+    log_conversation("System", f"Interview analysis completed. Overall score: {analysis['overall_score']}/10",
+                     session.session_id)
+    
+    # Generate a more detailed summary with Gemini
+    strengths = '\n- '.join(analysis['strengths'])
+    improvements = '\n- '.join(analysis['areas_for_improvement']) if analysis['areas_for_improvement'] else 'None'
+    
+    summary_prompt = (
+        "You are an experienced technical interviewer. Below is an analysis of a coding interview:\n\n"
+        f"Scores:\n"
+        f"- Communication: {analysis['detailed_scores']['communication']}/10\n"
+        f"- Charisma: {analysis['detailed_scores']['charisma']}/10\n"
+        f"- Responsiveness: {analysis['detailed_scores']['responsiveness']}/10\n"
+        f"- Technical Understanding: {analysis['detailed_scores']['technical_understanding']}/10\n"
+        f"- Problem Solving: {analysis['detailed_scores']['problem_solving']}/10\n\n"
+        f"Strengths:\n- {strengths}\n\n"
+        f"Areas for Improvement:\n- {improvements}\n\n"
+        "Please provide a concise, constructive summary of the candidate's performance that would be helpful "
+        "for both the interviewer and the candidate. Focus on specific, actionable feedback."
+    )
+
+    # Get a more detailed analysis from Gemini (the gateway walks the model fallback chain)
+    try:
+        detailed_summary = gateway.generate(summary_prompt)
+    except LLMError as e:
+        logger.error("Error generating detailed analysis: %s", e)
+        detailed_summary = "Detailed analysis could not be generated due to model errors."
+    
+    # Add the detailed summary to the response
+    analysis['detailed_summary'] = detailed_summary
+    session.analysis = analysis
+    return analysis
+
 @app.route('/submit-interview', methods=['POST'])
 def submit_interview():
     """Endpoint to handle interview submission and generate analysis"""
     try:
-        # Generate the analysis report
-        analysis = analyze_interview()
+        session = current_session()
         
-        # Log the analysis for reference
-        log_conversation("System", f"Interview analysis completed. Overall score: {analysis['overall_score']}/10")
-        
-        # Generate a more detailed summary with Gemini
-        strengths = '\n- '.join(analysis['strengths'])
-        improvements = '\n- '.join(analysis['areas_for_improvement']) if analysis['areas_for_improvement'] else 'None'
-        
-        summary_prompt = (
-            "You are an experienced technical interviewer. Below is an analysis of a coding interview:\n\n"
-            f"Scores:\n"
-            f"- Communication: {analysis['detailed_scores']['communication']}/10\n"
-            f"- Charisma: {analysis['detailed_scores']['charisma']}/10\n"
-            f"- Responsiveness: {analysis['detailed_scores']['responsiveness']}/10\n"
-            f"- Technical Understanding: {analysis['detailed_scores']['technical_understanding']}/10\n"
-            f"- Problem Solving: {analysis['detailed_scores']['problem_solving']}/10\n\n"
-            f"Strengths:\n- {strengths}\n\n"
-            f"Areas for Improvement:\n- {improvements}\n\n"
-            "Please provide a concise, constructive summary of the candidate's performance that would be helpful "
-            "for both the interviewer and the candidate. Focus on specific, actionable feedback."
-        )
-
-        # Get a more detailed analysis from Gemini
-        try:
-            # Use the latest available model for text generation
-            try:
-                model = genai.GenerativeModel('gemini-2.5-flash')
-                response = model.generate_content(summary_prompt)
-                detailed_summary = response.text if hasattr(response, 'text') else "Detailed analysis not available."
-            except Exception as e:
-                print(f"Error with gemini-2.5-flash: {str(e)}")
-                # Fallback to another model if the first one fails
-                try:
-                    model = genai.GenerativeModel('gemini-2.0-flash-latest')
-                    response = model.generate_content(summary_prompt)
-                    detailed_summary = response.text if hasattr(response, 'text') else "Detailed analysis not available."
-                except Exception as e2:
-                    print(f"Error with fallback model: {str(e2)}")
-                    detailed_summary = "Detailed analysis could not be generated due to model errors."
-        except Exception as e:
-            print(f"Error generating detailed analysis: {str(e)}")
-            detailed_summary = "Detailed analysis could not be generated."
-        
-        # Add the detailed summary to the response
-        analysis['detailed_summary'] = detailed_summary
+        # A repeated submit while the same transcript and code are being analyzed shares that analysis.
+        # System entries are left out of the key: the analysis itself writes one while it runs.
+        turns = session.journal.turns() if session.journal is not None else []
+        transcript = [(t.speaker, t.text) for t in turns if t.speaker != 'System']
+        key = flight_key(session.session_id, session.code, *transcript)
+        analysis = flights['analysis'].do(key, generate_interview_analysis, session)
         
         return jsonify({
             'status': 'success',
@@ -714,7 +1156,7 @@ def submit_interview():
         })
         
     except Exception as e:
-        print(f"Error in submit_interview: {str(e)}")
+        logger.error("Error in submit_interview: %s", e)
         return jsonify({
             'status': 'error',
             'message': str(e)
@@ -726,7 +1168,7 @@ def health_status():
     """Get current health status."""
     return jsonify({
         'status': 'success',
-        'data': tracker.latest_data if hasattr(tracker, 'latest_data') else {}
+        'data': health_tracker.latest_data if health_tracker is not None else {}
     })
 
 @app.route('/api/health/summary')
@@ -734,30 +1176,30 @@ def health_summary():
     """Get session summary."""
     return jsonify({
         'status': 'success',
-        'data': tracker.get_summary() if hasattr(tracker, 'get_summary') else {}
+        'data': health_tracker.get_summary() if health_tracker is not None else {}
     })
 
+# One producer annotates and encodes each captured frame once for every video feed viewer
+video_broadcaster = FrameBroadcaster(
+    lambda seq, timeout: get_health_tracker().next_annotated_frame(seq, timeout), encode_jpeg)
+
+# Seconds without camera frames before viewers are sent a placeholder (repeated at the same
+# interval), so a stalled feed still shows something and dropped viewers are noticed
+VIDEO_FEED_IDLE_TIMEOUT = float(os.getenv("VIDEO_FEED_IDLE_TIMEOUT", 5))
+
 def generate_frames():
     """Generate camera frames with emotion detection overlay."""
-    while True:
-        if not hasattr(tracker, 'get_annotated_frame'):
-            time.sleep(1)
-            continue
-            
-        success, frame = tracker.get_annotated_frame()
-        if not success:
-            time.sleep(0.1)
-            continue
-            
-        # Encode the frame in JPEG format
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if not ret:
-            continue
-            
-        # Convert to bytes and yield for streaming
-        frame = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+    with video_broadcaster.subscribe() as subscription:
+        idle_since = time.monotonic()
+        while True:
+            frame = subscription.get()
+            if frame is None:
+                if time.monotonic() - idle_since < VIDEO_FEED_IDLE_TIMEOUT:
+                    continue
+                frame = placeholder_jpeg()
+            idle_since = time.monotonic()
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
 
 @app.route('/api/health/video_feed')
 def video_feed():
@@ -937,8 +1379,6 @@ def health_monitor():
     """
 
 if __name__ == '__main__':
-    # Ensure upload directory exists
-    os.makedirs('uploads', exist_ok=True)
     port = int(os.environ.get('PORT', 5008))  # Use port from environment variable or default to 5008
-    print(f"Starting server on port {port}...")
-    app.run(debug=True, port=port, host='0.0.0.0')
\ No newline at end of file
+    logger.info("Starting server on port %s", port)
+    app.run(debug=True, threaded=True, port=port, host='0.0.0.0')
\ No newline at end of file
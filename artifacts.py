@@ -0,0 +1,35 @@
+import logging
+import os
+import tempfile
+from contextlib import contextmanager
+
+logger = logging.getLogger(__name__)
+
+# Where request-scoped scratch files are created (system temp dir by default)
+ARTIFACT_DIR = os.getenv("ARTIFACT_DIR") or None
+
+
+@contextmanager
+def scratch_file(data: bytes, suffix: str = ''):
+    """Write data to a uniquely named temp file that lives only for one request.
+
+    Only for tools that cannot work from memory (e.g. ffmpeg reading an MP4
+    whose index sits at the end of the file). The file is removed when the
+    block exits, even on error, so concurrent requests never share or
+    delete each other's files.
+
+    Yields:
+        The path of the temporary file
+    """
+    if ARTIFACT_DIR:
+        os.makedirs(ARTIFACT_DIR, exist_ok=True)
+    fd, path = tempfile.mkstemp(suffix=suffix, dir=ARTIFACT_DIR)
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        yield path
+    finally:
+        try:
+            os.remove(path)
+        except OSError as e:
+            logger.warning("Failed to clean up scratch file %s: %s", path, e)
@@ -0,0 +1,519 @@
+"""Async serving mode for the interview backend.
+
+Run with:  uvicorn asgi:app --port 5008
+
+The long-running routes (/process_audio, /text-to-speech and
+/api/health/video_feed) are implemented natively here: ElevenLabs calls go
+through an httpx pool, Gemini through the gateway's async API, and ffmpeg
+runs as an asyncio subprocess, so a turn that is waiting on a provider holds
+no thread. Every other route is served by the Flask app in app.py, mounted
+underneath, so both modes expose the same API.
+"""
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import time
+
+from a2wsgi import WSGIMiddleware
+from starlette.applications import Starlette
+from starlette.background import BackgroundTask
+from starlette.middleware import Middleware
+from starlette.middleware.cors import CORSMiddleware
+from starlette.requests import Request
+from starlette.responses import JSONResponse, Response, StreamingResponse
+from starlette.routing import Mount, Route
+
+import app as backend
+from app import (ERROR_REPLY, VOICE_ID, ELEVENLABS_API_KEY, ELEVENLABS_BASE_URL,
+                 SENTENCE_END, apply_vad, build_interviewer_prompt, hint_cache,
+                 log_conversation_async, sessions,
+                 tts_cache, vad_headers, _tts_cache_key, _tts_request)
+from audio_pipeline import transcode_to_wav_async
+from frame_broadcaster import placeholder_jpeg
+from hint_cache import hint_key
+from llm_gateway import gateway
+from log_pipeline import get_request_id, new_request_id
+from providers import AsyncProviderClient
+from session_store import DEFAULT_SESSION, resolve_session_id
+from turn_scheduler import TurnRejected, admission_key
+from voice_turn import TurnTimeline
+
+logger = logging.getLogger(__name__)
+
+# Async keep-alive client for ElevenLabs (same limits as the Flask client)
+elevenlabs = AsyncProviderClient(
+    ELEVENLABS_BASE_URL,
+    headers={"xi-api-key": ELEVENLABS_API_KEY or ""},
+    name='elevenlabs',
+    limits={
+        'stt': int(os.getenv("ELEVENLABS_STT_CONCURRENCY", 8)),
+        'tts': int(os.getenv("ELEVENLABS_TTS_CONCURRENCY", 8))
+    }
+)
+
+
+# Fire-and-forget tasks, referenced here so they aren't garbage collected mid-flight
+_background_tasks = set()
+
+
+def spawn(coro):
+    """Run a coroutine concurrently without awaiting it."""
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+    return task
+
+
+async def timed(timeline, name, coro):
+    """Await coro, recording it as a stage on the turn timeline."""
+    with timeline.stage(name):
+        return await coro
+
+
+async def speech_to_text(wav_data):
+    """Async version of app.speech_to_text for in-memory WAV bytes"""
+    if not wav_data:
+        logger.error("Audio is empty")
+        return None
+    try:
+        response = await elevenlabs.post(
+            'stt', '/v1/speech-to-text',
+            headers={"Accept": "application/json"},
+            data={'model_id': 'scribe_v2'},
+            files={'file': ('audio.wav', wav_data, 'audio/wav')}
+        )
+        if response.status_code != 200:
+            logger.error("Error in speech-to-text API: %s - %s", response.status_code, response.text)
+            return None
+        text = response.json().get('text', '').strip()
+        logger.debug("Transcribed audio", extra={'chars': len(text)})
+        return text
+    except Exception:
+        logger.exception("Unexpected error in speech_to_text")
+        return None
+
+
+async def synthesize_speech(text):
+    """Async version of app.synthesize_speech (shares the TTS cache)"""
+    if not text or not ELEVENLABS_API_KEY or not VOICE_ID:
+        logger.error("Missing required parameters for TTS")
+        return None
+
+    key = _tts_cache_key(text)
+    cached = tts_cache.get(key)
+    if cached is not None:
+        return cached
+    return await backend.flights['tts'].do_async(key, _synthesize_uncached, text, key)
+
+
+async def _synthesize_uncached(text, key):
+    headers, data = _tts_request(text)
+    try:
+        response = await elevenlabs.post('tts', f"/v1/text-to-speech/{VOICE_ID}", json=data, headers=headers)
+    except Exception as e:
+        logger.error("Error in text_to_speech: %s", e)
+        return None
+    if response.status_code != 200:
+        logger.error("Error in TTS API request: %s - %s", response.status_code, response.text)
+        return None
+    tts_cache.put(key, response.content)
+    return response.content
+
+
+async def text_to_speech_stream(text):
+    """Async version of app.text_to_speech_stream"""
+    if not text or not ELEVENLABS_API_KEY or not VOICE_ID:
+        logger.error("Missing required parameters for TTS")
+        return
+
+    key = _tts_cache_key(text)
+    cached = tts_cache.get(key)
+    if cached is not None:
+        yield cached
+        return
+
+    headers, data = _tts_request(text)
+    try:
+        response = await elevenlabs.post('tts', f"/v1/text-to-speech/{VOICE_ID}/stream",
+                                         json=data, headers=headers, stream=True)
+    except Exception as e:
+        logger.error("Request error in text_to_speech_stream: %s", e)
+        return
+    try:
+        if response.status_code != 200:
+            await response.aread()
+            logger.error("Error in TTS stream request: %s - %s", response.status_code, response.text)
+            return
+        audio = bytearray()
+        async for chunk in response.aiter_bytes(4096):
+            audio += chunk
+            yield chunk
+        # Only cache clips that streamed through completely
+        tts_cache.put(key, bytes(audio))
+    finally:
+        await response.aclose()
+
+
+async def run_gemini(prompt):
+    try:
+        return await gateway.agenerate(prompt)
+    except Exception as e:
+        logger.error("Error in run_gemini: %s", e)
+        return ERROR_REPLY
+
+
+async def run_gemini_stream(prompt):
+    produced = False
+    try:
+        async for text in gateway.astream(prompt):
+            produced = True
+            yield text
+    except Exception as e:
+        logger.error("Error in run_gemini_stream: %s", e)
+        if not produced:
+            yield ERROR_REPLY
+
+
+async def aiter_in_background(aiterable):
+    """Drain an async iterable in its own task so the producer keeps running
+    while the consumer awaits something else (Gemini generating during TTS)."""
+    items = asyncio.Queue()
+    done = object()
+
+    async def pump():
+        try:
+            async for item in aiterable:
+                await items.put(item)
+        finally:
+            await items.put(done)
+
+    task = asyncio.create_task(pump())
+    try:
+        while True:
+            item = await items.get()
+            if item is done:
+                return
+            yield item
+    finally:
+        task.cancel()
+
+
+async def aiter_sentences(chunks):
+    """Async version of app.iter_sentences"""
+    buffer = ''
+    async for chunk in chunks:
+        buffer += chunk
+        parts = SENTENCE_END.split(buffer)
+        buffer = parts.pop()
+        for sentence in parts:
+            if sentence.strip():
+                yield sentence.strip()
+    if buffer.strip():
+        yield buffer.strip()
+
+
+async def _single(text):
+    yield text
+
+
+async def stream_voice_response(prompt, cached_reply=None, cache_key=None, timeline=None, session_id='default'):
+    """Async version of app.stream_voice_response"""
+    timeline = timeline or TurnTimeline()
+    if cached_reply is not None:
+        chunks = _single(cached_reply)
+    else:
+        spawn(timed(timeline, 'tts_warmup', elevenlabs.warm()))
+        chunks = aiter_in_background(timeline.aiterate('gemini', run_gemini_stream(prompt)))
+
+    spoken = []
+    try:
+        with timeline.stage('stream'):
+            async for sentence in aiter_sentences(chunks):
+                spoken.append(sentence)
+                with timeline.stage('tts'):
+                    async for chunk in text_to_speech_stream(sentence):
+                        yield chunk
+    finally:
+        logger.info("Turn complete", extra={'mode': 'stream', 'timing': timeline.breakdown()})
+        timeline.finish('stream')
+
+    gemini_output = ' '.join(spoken)
+    log_conversation_async("AI", gemini_output, session_id)
+    if cached_reply is None and cache_key and ERROR_REPLY not in gemini_output:
+        hint_cache.put(cache_key, gemini_output)
+
+
+def current_session(request, fields=None):
+    """Async-side counterpart of app.current_session; fields is the parsed form or JSON body"""
+    return sessions.get(resolve_session_id(
+        request.headers.get('x-session-id'),
+        request.query_params.get('session_id'),
+        fields.get('session_id') if hasattr(fields, 'get') else None
+    ))
+
+
+def audio_response(audio, download_name, as_attachment):
+    disposition = 'attachment' if as_attachment else 'inline'
+    return Response(audio, media_type='audio/mpeg',
+                    headers={'Content-Disposition': f'{disposition}; filename="{download_name}"'})
+
+
+async def process_audio(request):
+    """Async version of app.process_audio"""
+    try:
+        form = await request.form()
+        audio_file = form.get('audio')
+        if audio_file is None or not hasattr(audio_file, 'read'):
+            return JSONResponse({"error": "No audio file provided"}, status_code=400)
+        if audio_file.filename == '':
+            return JSONResponse({"error": "No selected file"}, status_code=400)
+
+        session = current_session(request, form)
+        timeline = TurnTimeline()
+        with timeline.stage('upload'):
+            audio_data = await audio_file.read()
+        if not audio_data:
+            return JSONResponse({"error": "Uploaded audio is empty"}, status_code=400)
+
+        with timeline.stage('transcode'):
+            wav_data = await transcode_to_wav_async(audio_data)
+        if wav_data is None:
+            return JSONResponse({"error": "Failed to process audio format"}, status_code=400)
+
+        with timeline.stage('vad'):
+            wav_data, vad_stats = await asyncio.to_thread(apply_vad, wav_data)
+        if wav_data is None:
+            return JSONResponse({"error": "No speech detected", "vad": vad_stats}, status_code=400)
+
+        with timeline.stage('stt'):
+            text = await speech_to_text(wav_data)
+        if not text:
+            return JSONResponse({"error": "Failed to transcribe audio"}, status_code=500)
+        log_conversation_async("User", text, session.session_id)
+
+        question_title = request.query_params.get('question_title', 'the coding problem')
+        test_code = session.code
+        with timeline.stage('prompt'):
+            prompt = build_interviewer_prompt(text, question_title, test_code)
+
+        use_cache = (request.query_params.get('no_cache') != '1'
+                     and 'no-cache' not in request.headers.get('cache-control', ''))
+        key = hint_key(test_code or '', question_title, text)
+        cached_reply = hint_cache.get(key) if use_cache else None
+
+        if request.query_params.get('stream') == '1':
+            return StreamingResponse(
+                stream_voice_response(prompt, cached_reply, key if use_cache else None, timeline,
+                                      session.session_id),
+                media_type='audio/mpeg',
+                headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no', **vad_headers(vad_stats)}
+            )
+
+        if cached_reply is not None:
+            gemini_output = cached_reply
+        else:
+            # Make sure a live TTS connection is waiting once Gemini is done
+            spawn(timed(timeline, 'tts_warmup', elevenlabs.warm()))
+            with timeline.stage('gemini'):
+                if use_cache:
+                    # The same question about the same code, already being answered (shared with app.py's flight)
+                    gemini_output = await backend.flights['hint'].do_async(key, run_gemini, prompt)
+                else:
+                    gemini_output = await run_gemini(prompt)
+            if use_cache and gemini_output != ERROR_REPLY:
+                hint_cache.put(key, gemini_output)
+        log_conversation_async("AI", gemini_output, session.session_id)
+
+        with timeline.stage('tts'):
+            audio = await synthesize_speech(gemini_output)
+        if not audio:
+            log_conversation_async("Error", "Failed to generate speech", session.session_id)
+            return JSONResponse({"error": "Failed to generate speech"}, status_code=500)
+        response = audio_response(audio, 'response.mp3', as_attachment=True)
+        response.headers.update(vad_headers(vad_stats))
+        response.headers['X-Turn-Timing'] = timeline.header()
+        response.background = BackgroundTask(timeline.on_sent('buffered'))
+        logger.info("Turn complete", extra={'mode': 'buffered', 'timing': timeline.breakdown()})
+        return response
+
+    except Exception as e:
+        logger.exception("Error in process_audio")
+        return JSONResponse({"error": "Audio processing failed", "details": str(e)}, status_code=500)
+
+
+async def handle_text_to_speech(request):
+    """Async version of app.handle_text_to_speech"""
+    session_id = 'default'
+    try:
+        try:
+            data = await request.json()
+        except json.JSONDecodeError:
+            data = None
+        session_id = current_session(request, data).session_id
+        if not data or 'text' not in data:
+            return JSONResponse({'status': 'error', 'message': 'No text provided'}, status_code=400)
+
+        text = data['text'].strip()
+        log_conversation_async("TTS Input", text, session_id)
+
+        audio = await synthesize_speech(text)
+        if not audio:
+            log_conversation_async("TTS Error", f"Failed to generate speech for text: {text[:200]}...", session_id)
+            return JSONResponse({'error': 'Failed to generate speech'}, status_code=500)
+
+        log_conversation_async("TTS Output", f"Generated audio: speech.mp3 ({len(audio)} bytes)", session_id)
+        return audio_response(audio, 'speech.mp3', as_attachment=False)
+
+    except Exception as e:
+        error_msg = f"Error in text-to-speech endpoint: {str(e)}"
+        logger.error(error_msg)
+        log_conversation_async("TTS Error", error_msg, session_id)
+        return JSONResponse({'error': str(e)}, status_code=500)
+
+
+async def generate_frames():
+    """Async version of app.generate_frames; viewers share app's broadcaster and only hold a coroutine."""
+    with backend.video_broadcaster.subscribe(asyncio.get_running_loop()) as subscription:
+        idle_since = time.monotonic()
+        while True:
+            frame = await subscription.get_async()
+            if frame is None:
+                if time.monotonic() - idle_since < backend.VIDEO_FEED_IDLE_TIMEOUT:
+                    continue
+                frame = placeholder_jpeg()
+            idle_since = time.monotonic()
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+
+
+async def video_feed(request):
+    return StreamingResponse(generate_frames(), media_type='multipart/x-mixed-replace; boundary=frame')
+
+
+class RequestIdMiddleware:
+    """Bind a request id for the native async routes and echo it back.
+
+    The id is also written into the request headers, so routes served by the
+    mounted Flask app pick up the same one in their before_request hook.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+
+        headers = [(k, v) for k, v in scope['headers'] if k != b'x-request-id']
+        incoming = dict(scope['headers']).get(b'x-request-id', b'').decode('latin-1')
+        request_id = new_request_id(incoming)
+        scope = {**scope, 'headers': headers + [(b'x-request-id', request_id.encode('latin-1'))]}
+
+        async def send_with_id(message):
+            if message['type'] == 'http.response.start':
+                response_headers = list(message.get('headers', []))
+                if not any(k.lower() == b'x-request-id' for k, _ in response_headers):
+                    response_headers.append((b'x-request-id', get_request_id().encode('latin-1')))
+                message = {**message, 'headers': response_headers}
+            await send(message)
+
+        await self.app(scope, receive, send_with_id)
+
+
+def _replay(body: bytes, receive):
+    """ASGI receive that hands out an already-read body, then defers to the real one."""
+    sent = False
+
+    async def replay():
+        nonlocal sent
+        if not sent:
+            sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+        return await receive()
+
+    return replay
+
+
+class TurnAdmissionMiddleware:
+    """Admission control for /process_audio, sharing app.turn_scheduler.
+
+    A turn holds its slot until its response (streamed or not) has been sent;
+    refused turns get 429/503 with Retry-After. The session is resolved like
+    app.current_session (header, query, then form field), so a client gets
+    the same slot on either server; the upload is only read up front when the
+    session id is not in the header or query.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        # CORS preflights are answered by CORSMiddleware outside this one and never count as turns
+        if scope['type'] != 'http' or scope['path'] != '/process_audio' or scope['method'] == 'OPTIONS':
+            return await self.app(scope, receive, send)
+
+        request = Request(scope, receive)
+        session_id = resolve_session_id(request.headers.get('x-session-id'),
+                                        request.query_params.get('session_id'))
+        if session_id == DEFAULT_SESSION:
+            # Only the form can still name the session; buffer the body and replay it downstream
+            body = await request.body()
+            form = await request.form()
+            session_id = resolve_session_id(form.get('session_id'))
+            await form.close()
+            receive = _replay(body, receive)
+        client = scope.get('client')
+        session_id = admission_key(session_id, client[0] if client else None)
+        try:
+            await backend.turn_scheduler.acquire_async(session_id)
+        except TurnRejected as e:
+            logger.warning("Voice turn rejected", extra={'reason': e.reason, 'session_id': session_id})
+            response = JSONResponse(
+                {'error': backend.REJECTION_MESSAGES.get(e.reason, str(e)), 'reason': e.reason},
+                status_code=e.status, headers={'Retry-After': str(e.retry_after)})
+            return await response(scope, receive, send)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            backend.turn_scheduler.release(session_id)
+
+
+async def statusz(request):
+    """app.statusz, reporting this server's async ElevenLabs pool."""
+    report = await asyncio.to_thread(backend.status_report)
+    report['elevenlabs'] = elevenlabs.get_pool_stats()
+    return JSONResponse(report)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    yield
+    await elevenlabs.aclose()
+
+
+app = Starlette(
+    routes=[
+        Route('/process_audio', process_audio, methods=['POST']),
+        Route('/text-to-speech', handle_text_to_speech, methods=['POST']),
+        Route('/api/health/video_feed', video_feed),
+        Route('/statusz', statusz),
+        # Everything else is served by the Flask app
+        Mount('/', app=WSGIMiddleware(backend.app)),
+    ],
+    middleware=[
+        Middleware(RequestIdMiddleware),
+        # Outside admission control, so 429/503 rejections carry CORS headers too
+        Middleware(CORSMiddleware, allow_origins=['*'], allow_methods=['*'], allow_headers=['*']),
+        Middleware(TurnAdmissionMiddleware)
+    ],
+    lifespan=lifespan
+)
+
+if __name__ == '__main__':
+    import uvicorn
+
+    port = int(os.environ.get('PORT', 5008))
+    logger.info("Starting async server on port %s", port)
+    uvicorn.run(app, host='0.0.0.0', port=port)
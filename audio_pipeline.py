@@ -0,0 +1,209 @@
+import asyncio
+import io
+import logging
+import subprocess
+import wave
+from typing import Dict, Optional, Tuple
+
+from artifacts import scratch_file
+from lazy_imports import lazy_module
+
+logger = logging.getLogger(__name__)
+
+# Format expected by the speech-to-text provider: 16 kHz, 16-bit, mono
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+CHANNELS = 1
+
+# Deferred until the first upload when FAST_START is set
+pydub = lazy_module('pydub')
+pydub_silence = lazy_module('pydub.silence')
+
+try:
+    av = lazy_module('av')
+    PYAV_AVAILABLE = True
+except ImportError:
+    logger.info("PyAV not found. Falling back to piping audio through ffmpeg.")
+    PYAV_AVAILABLE = False
+
+
+def is_wav(data: bytes) -> bool:
+    """Check the RIFF/WAVE header of an in-memory upload."""
+    return len(data) >= 12 and data[:4] == b'RIFF' and data[8:12] == b'WAVE'
+
+
+def pcm_to_wav(pcm: bytes) -> bytes:
+    """Wrap raw 16 kHz mono s16le PCM in a WAV container."""
+    buffer = io.BytesIO()
+    with wave.open(buffer, 'wb') as wav:
+        wav.setnchannels(CHANNELS)
+        wav.setsampwidth(SAMPLE_WIDTH)
+        wav.setframerate(SAMPLE_RATE)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+def _decode_with_pyav(data: bytes) -> bytes:
+    """Decode and resample in-process with PyAV (no subprocess, no disk)."""
+    pcm = bytearray()
+    resampler = av.AudioResampler(format='s16', layout='mono', rate=SAMPLE_RATE)
+    with av.open(io.BytesIO(data)) as container:
+        stream = container.streams.audio[0]
+        for frame in container.decode(stream):
+            for resampled in resampler.resample(frame):
+                pcm += resampled.to_ndarray().tobytes()
+    # Flush samples still buffered inside the resampler
+    for resampled in resampler.resample(None):
+        pcm += resampled.to_ndarray().tobytes()
+    return bytes(pcm)
+
+
+def _run_ffmpeg(source: str, data: bytes = None) -> bytes:
+    result = subprocess.run([
+        'ffmpeg', '-hide_banner', '-loglevel', 'error',
+        '-i', source,
+        '-ar', str(SAMPLE_RATE),
+        '-ac', str(CHANNELS),
+        '-f', 's16le',
+        'pipe:1'
+    ], input=data, check=True, capture_output=True)
+    return result.stdout
+
+
+def _decode_with_ffmpeg(data: bytes) -> bytes:
+    """Decode by piping the upload through ffmpeg's stdin/stdout."""
+    try:
+        return _run_ffmpeg('pipe:0', data)
+    except subprocess.CalledProcessError:
+        # Some containers (MP4/M4A with a trailing index) need a seekable input
+        with scratch_file(data) as path:
+            return _run_ffmpeg(path)
+
+
+async def _decode_with_ffmpeg_async(data: bytes) -> bytes:
+    """Like _decode_with_ffmpeg, but awaits the subprocess instead of blocking."""
+    args = ['-ar', str(SAMPLE_RATE), '-ac', str(CHANNELS), '-f', 's16le', 'pipe:1']
+    process = await asyncio.create_subprocess_exec(
+        'ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', 'pipe:0', *args,
+        stdin=asyncio.subprocess.PIPE, stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+    stdout, stderr = await process.communicate(data)
+    if process.returncode == 0:
+        return stdout
+
+    # Some containers (MP4/M4A with a trailing index) need a seekable input
+    with scratch_file(data) as path:
+        process = await asyncio.create_subprocess_exec(
+            'ffmpeg', '-hide_banner', '-loglevel', 'error', '-i', path, *args,
+            stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.PIPE)
+        stdout, stderr = await process.communicate()
+    if process.returncode != 0:
+        raise subprocess.CalledProcessError(process.returncode, 'ffmpeg', stdout, stderr)
+    return stdout
+
+
+def decode_to_pcm(data: bytes) -> Optional[bytes]:
+    """Decode any supported upload to 16 kHz mono s16le PCM in memory.
+
+    Returns:
+        The raw PCM bytes, or None if the audio could not be decoded
+    """
+    try:
+        pcm = _decode_with_pyav(data) if PYAV_AVAILABLE else _decode_with_ffmpeg(data)
+    except subprocess.CalledProcessError as e:
+        logger.error("Error decoding audio with ffmpeg: %s", e.stderr.decode(errors='replace'))
+        return None
+    except Exception as e:
+        logger.error("Error decoding audio: %s", e)
+        return None
+
+    if not pcm:
+        logger.error("Decoded audio is empty")
+        return None
+    return pcm
+
+
+def transcode_to_wav(data: bytes) -> Optional[bytes]:
+    """Turn an uploaded recording into WAV bytes ready for speech-to-text.
+
+    WAV uploads are passed through untouched; everything else is decoded
+    from the request buffer without touching the filesystem.
+    """
+    if is_wav(data):
+        return data
+
+    pcm = decode_to_pcm(data)
+    if pcm is None:
+        return None
+    return pcm_to_wav(pcm)
+
+
+def trim_silence(wav: bytes, silence_thresh: float = -45.0, min_silence_len: int = 400,
+                 keep_silence: int = 150) -> Tuple[Optional[bytes], Dict]:
+    """Voice-activity trim: drop leading/trailing silence and shorten long pauses.
+
+    Args:
+        wav: WAV bytes (as returned by transcode_to_wav)
+        silence_thresh: Loudness in dBFS below which audio counts as silence
+        min_silence_len: Shortest pause in ms that gets compacted
+        keep_silence: Padding in ms kept around every stretch of speech
+
+    Returns:
+        (trimmed WAV bytes, stats). The bytes are None when the clip contains no
+        speech at all, so the caller can skip speech-to-text entirely.
+    """
+    segment = pydub.AudioSegment.from_wav(io.BytesIO(wav))
+    speech = pydub_silence.detect_nonsilent(segment, min_silence_len=min_silence_len,
+                                            silence_thresh=silence_thresh, seek_step=10)
+
+    stats = {'original_seconds': len(segment) / 1000.0, 'original_bytes': len(wav)}
+    if not speech:
+        stats.update(trimmed_seconds=0.0, seconds_saved=stats['original_seconds'],
+                     trimmed_bytes=0, bytes_saved=len(wav))
+        return None, stats
+
+    # Pad every stretch of speech, merging stretches whose padding overlaps
+    ranges = []
+    for start, end in speech:
+        start, end = max(0, start - keep_silence), min(len(segment), end + keep_silence)
+        if ranges and start <= ranges[-1][1]:
+            ranges[-1][1] = end
+        else:
+            ranges.append([start, end])
+
+    trimmed = sum((segment[start:end] for start, end in ranges[1:]), segment[ranges[0][0]:ranges[0][1]])
+    buffer = io.BytesIO()
+    trimmed.export(buffer, format='wav')
+    trimmed_wav = buffer.getvalue()
+
+    stats.update(trimmed_seconds=len(trimmed) / 1000.0,
+                 seconds_saved=(len(segment) - len(trimmed)) / 1000.0,
+                 trimmed_bytes=len(trimmed_wav),
+                 bytes_saved=len(wav) - len(trimmed_wav))
+    return trimmed_wav, stats
+
+
+async def transcode_to_wav_async(data: bytes) -> Optional[bytes]:
+    """Awaitable transcode_to_wav for the ASGI server.
+
+    The ffmpeg fallback is awaited as an asyncio subprocess; the in-process
+    PyAV decode is CPU-bound and short, so it runs on the default executor.
+    """
+    if is_wav(data):
+        return data
+
+    try:
+        if PYAV_AVAILABLE:
+            pcm = await asyncio.get_running_loop().run_in_executor(None, _decode_with_pyav, data)
+        else:
+            pcm = await _decode_with_ffmpeg_async(data)
+    except subprocess.CalledProcessError as e:
+        logger.error("Error decoding audio with ffmpeg: %s", e.stderr.decode(errors='replace'))
+        return None
+    except Exception as e:
+        logger.error("Error decoding audio: %s", e)
+        return None
+
+    if not pcm:
+        logger.error("Decoded audio is empty")
+        return None
+    return pcm_to_wav(pcm)
@@ -0,0 +1,65 @@
+import time
+from typing import Dict, Tuple
+
+from lazy_imports import lazy_module
+
+cv2 = lazy_module('cv2')
+np = lazy_module('numpy')
+
+
+class ChangeGate:
+    """Decides whether a frame differs enough from the last classified one to classify again.
+
+    Frames are reduced to a tiny grayscale thumbnail and compared with the
+    thumbnail of the last frame that passed, as the mean absolute difference
+    scaled to 0..1. Comparing against the last *passed* frame rather than the
+    previous one means slow drift still adds up and eventually passes. A
+    frame always passes once max_age seconds have gone by, so a result is
+    never reused indefinitely.
+    """
+
+    def __init__(self, threshold: float = 0.02, max_age: float = 10.0, size: Tuple[int, int] = (32, 24)):
+        """
+        Args:
+            threshold: Mean difference (0..1) at or above which a frame counts as changed; 0 passes every frame
+            max_age: Seconds after which a frame passes regardless
+            size: Thumbnail (width, height) frames are compared at
+        """
+        self.threshold = threshold
+        self.max_age = max_age
+        self.size = size
+        self._reference = None
+        self._passed_at = 0.0
+        self.last_difference = None
+        self._stats = {'checked': 0, 'skipped': 0}
+
+    def _thumbnail(self, frame):
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY) if frame.ndim == 3 else frame
+        return cv2.resize(gray, self.size, interpolation=cv2.INTER_AREA).astype(np.float32)
+
+    def changed(self, frame) -> bool:
+        """True if frame should be classified; it then becomes the new reference."""
+        self._stats['checked'] += 1
+        thumbnail = self._thumbnail(frame)
+        now = time.monotonic()
+        if self._reference is not None and self.threshold > 0 and now - self._passed_at < self.max_age:
+            self.last_difference = float(np.mean(np.abs(thumbnail - self._reference))) / 255
+            if self.last_difference < self.threshold:
+                self._stats['skipped'] += 1
+                return False
+        self._reference = thumbnail
+        self._passed_at = now
+        return True
+
+    def reset(self):
+        """Make the next frame pass (e.g. after the camera restarts)."""
+        self._reference = None
+
+    def get_stats(self) -> Dict:
+        checked = self._stats['checked']
+        return {
+            **self._stats,
+            'skip_rate': round(self._stats['skipped'] / checked, 3) if checked else None,
+            'threshold': self.threshold,
+            'last_difference': round(self.last_difference, 4) if self.last_difference is not None else None
+        }
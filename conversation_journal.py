@@ -0,0 +1,193 @@
+import logging
+import os
+import re
+import threading
+import time
+from datetime import datetime
+from typing import Dict, List, NamedTuple, Optional
+
+logger = logging.getLogger(__name__)
+
+# Same line layout as the original conversation_log.txt, so existing readers still parse it
+TIMESTAMP_FORMAT = '%Y-%m-%d %H:%M:%S'
+LINE_PATTERN = re.compile(r'^\[(?P<ts>[^\]]+)\] (?P<speaker>[^:]+): (?P<text>.*)$')
+
+
+class Turn(NamedTuple):
+    """One journal entry and where its line starts in the session file."""
+    speaker: str
+    text: str
+    timestamp: datetime
+    offset: int
+    length: int
+
+
+def session_filename(session_id: str) -> str:
+    """Filesystem-safe file name for a session id."""
+    return re.sub(r'[^A-Za-z0-9_.-]', '_', session_id)[:64] + '.log'
+
+
+class ConversationJournal:
+    """Append-only conversation log for one interview session.
+
+    Entries are buffered and written in batches (when max_buffered entries
+    are pending, or on flush()), and every turn is kept in an in-memory
+    index so readers never re-read or re-parse the file.
+    """
+
+    def __init__(self, path: str, fresh: bool = False, max_buffered: int = 32):
+        """
+        Args:
+            path: Session log file
+            fresh: Start an empty log instead of appending to an existing one
+            max_buffered: Pending entries that trigger a write
+        """
+        self.path = path
+        self.max_buffered = max_buffered
+        self._lock = threading.Lock()
+        self._turns: List[Turn] = []
+        self._pending: List[bytes] = []
+
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        if not fresh and os.path.exists(path):
+            self._load()
+        self._file = open(path, 'wb' if fresh else 'ab')
+        self._size = self._file.tell()
+
+    def _load(self):
+        """Rebuild the index from an existing file (only when reopening a session)."""
+        offset = 0
+        with open(self.path, 'rb') as f:
+            for raw in f:
+                match = LINE_PATTERN.match(raw.decode('utf-8', errors='replace').rstrip('\n'))
+                if match:
+                    try:
+                        timestamp = datetime.strptime(match.group('ts'), TIMESTAMP_FORMAT)
+                    except ValueError:
+                        timestamp = None
+                    self._turns.append(Turn(match.group('speaker'), match.group('text'),
+                                            timestamp, offset, len(raw)))
+                offset += len(raw)
+
+    def append(self, speaker: str, text: str, timestamp: Optional[datetime] = None) -> Turn:
+        """Record one entry; it reaches the file with the next batch."""
+        timestamp = timestamp or datetime.now()
+        # Newlines would split the entry across lines and break re-parsing
+        text = ' '.join(str(text).splitlines())
+        line = f"[{timestamp.strftime(TIMESTAMP_FORMAT)}] {speaker}: {text}\n\n".encode('utf-8')
+        with self._lock:
+            turn = Turn(speaker, text, timestamp, self._size, len(line))
+            self._turns.append(turn)
+            self._pending.append(line)
+            self._size += len(line)
+            # Once closed there is no background flush, so late entries are written straight away
+            if len(self._pending) >= self.max_buffered or self._file.closed:
+                self._write_pending()
+        return turn
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        reopened = self._file.closed
+        if reopened:
+            # A turn still in flight when the session was closed; append rather than drop it
+            logger.debug("Appending %d late entries to closed journal %s", len(self._pending), self.path)
+            try:
+                self._file = open(self.path, 'ab')
+            except OSError as e:
+                logger.error("Error reopening conversation journal %s: %s", self.path, e)
+                return
+        try:
+            self._file.write(b''.join(self._pending))
+            self._file.flush()
+        except OSError as e:
+            logger.error("Error writing conversation journal %s: %s", self.path, e)
+            return
+        finally:
+            if reopened:
+                self._file.close()
+        self._pending.clear()
+
+    def flush(self):
+        """Write every buffered entry to the file."""
+        with self._lock:
+            self._write_pending()
+
+    def turns(self, speaker: Optional[str] = None) -> List[Turn]:
+        """Indexed turns in order, optionally only those from one speaker."""
+        with self._lock:
+            return [t for t in self._turns if speaker is None or t.speaker == speaker]
+
+    def __len__(self):
+        return len(self._turns)
+
+    def close(self):
+        with self._lock:
+            self._write_pending()
+            self._file.close()
+
+
+class JournalManager:
+    """Opens one ConversationJournal per session and flushes them in the background."""
+
+    def __init__(self, directory: str = 'conversation_logs', flush_interval: float = 1.0):
+        """
+        Args:
+            directory: Where session files are created
+            flush_interval: Seconds between background flushes of buffered entries
+        """
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._journals: Dict[str, ConversationJournal] = {}
+        self._started = time.time()
+        self._flusher = None
+
+    def get(self, session_id: str = 'default', resume: bool = False) -> ConversationJournal:
+        """The session's journal, opened on first use.
+
+        A session first seen by this process starts with an empty file, as
+        the single shared log used to be cleared for each new session, unless
+        resume is set (e.g. the session was restored from a spill). A file this
+        process already wrote (the session was closed and came back) is
+        appended to.
+        """
+        journal = self._journals.get(session_id)
+        if journal is not None:
+            return journal
+        with self._lock:
+            journal = self._journals.get(session_id)
+            if journal is None:
+                path = os.path.join(self.directory, session_filename(session_id))
+                journal = ConversationJournal(path, fresh=not resume and not self._written_since_start(path))
+                self._journals[session_id] = journal
+                self._start_flusher()
+        return journal
+
+    def _written_since_start(self, path: str) -> bool:
+        # The file's mtime stands in for a per-session record, so closed sessions leave nothing behind
+        try:
+            return os.path.getmtime(path) >= self._started
+        except OSError:
+            return False
+
+    def close(self, session_id: str):
+        """Flush and close one session's journal (it can be reopened later)."""
+        with self._lock:
+            journal = self._journals.pop(session_id, None)
+        if journal is not None:
+            journal.close()
+
+    def flush_all(self):
+        for journal in list(self._journals.values()):
+            journal.flush()
+
+    def _start_flusher(self):
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='journal-flush', daemon=True)
+            self._flusher.start()
+
+    def _flush_loop(self):
+        while True:
+            time.sleep(self.flush_interval)
+            self.flush_all()
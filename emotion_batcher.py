@@ -0,0 +1,138 @@
+import logging
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from metrics import EMOTION_BATCH_FRAMES, EMOTION_BATCH_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class _Request:
+    __slots__ = ('frame', 'done', 'result', 'error')
+
+    def __init__(self, frame):
+        self.frame = frame
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class EmotionBatcher:
+    """One emotion model shared by every tracker, fed in batches.
+
+    A frame submitted while nothing else is in flight (the usual case with
+    one tracker per process) is classified right away on the caller's
+    thread. Frames that arrive while the model is busy are queued; a worker
+    thread takes whatever is queued, plus anything arriving within max_wait
+    of the first frame (up to max_batch frames), and classifies them with
+    one predict call, so several producers share the per-call overhead.
+    """
+
+    def __init__(self, predict: Callable[[List[Any]], List[Any]], max_batch: int = 8, max_wait: float = 0.0):
+        """
+        Args:
+            predict: Classifies a list of frames, returning one result per frame
+            max_batch: Most frames passed to one predict call
+            max_wait: Seconds to wait for more frames after the first arrives
+        """
+        self.predict = predict
+        self.max_batch = max(1, max_batch)
+        self.max_wait = max_wait
+        self._queue = queue.Queue()
+        self._thread = None
+        self._lock = threading.Lock()
+        self._model_lock = threading.Lock()  # one predict call at a time
+        self._in_flight = 0
+        self._stats = {'frames': 0, 'batches': 0, 'inline': 0, 'errors': 0, 'predict_seconds': 0.0}
+
+    def submit(self, frame: Any, timeout: Optional[float] = None) -> Any:
+        """Classify one frame, batched with any others waiting, and return its result.
+
+        Raises:
+            TimeoutError: if a queued frame got no result within timeout seconds
+            Exception: whatever predict raised for the batch
+        """
+        request = _Request(frame)
+        with self._lock:
+            inline = self._in_flight == 0
+            self._in_flight += 1
+        try:
+            if inline:
+                # Nothing to batch with: skip the queue and the thread hop
+                with self._model_lock:
+                    self._stats['inline'] += 1
+                    self._classify([request])
+            else:
+                self._ensure_worker()
+                self._queue.put(request)
+                if not request.done.wait(timeout):
+                    raise TimeoutError("Emotion batch did not complete in time")
+        finally:
+            with self._lock:
+                self._in_flight -= 1
+        if request.error is not None:
+            raise request.error
+        return request.result
+
+    def _ensure_worker(self):
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(target=self._run, name='emotion-batcher', daemon=True)
+                self._thread.start()
+
+    def _collect(self, first: _Request) -> List[_Request]:
+        batch = [first]
+        deadline = time.monotonic() + self.max_wait
+        while len(batch) < self.max_batch:
+            remaining = deadline - time.monotonic()
+            try:
+                batch.append(self._queue.get(timeout=remaining) if remaining > 0 else self._queue.get_nowait())
+            except queue.Empty:
+                break
+        return batch
+
+    def _classify(self, batch: List[_Request]):
+        # Called with _model_lock held
+        started = time.monotonic()
+        try:
+            results = self.predict([request.frame for request in batch])
+            if len(results) != len(batch):
+                raise ValueError(f"Emotion model returned {len(results)} results for {len(batch)} frames")
+            for request, result in zip(batch, results):
+                request.result = result
+        except Exception as e:
+            logger.error("Error classifying emotion batch: %s", e)
+            self._stats['errors'] += 1
+            for request in batch:
+                request.error = e
+        elapsed = time.monotonic() - started
+        self._stats['frames'] += len(batch)
+        self._stats['batches'] += 1
+        self._stats['predict_seconds'] += elapsed
+        EMOTION_BATCH_FRAMES.observe(len(batch))
+        EMOTION_BATCH_SECONDS.observe(elapsed)
+        for request in batch:
+            request.done.set()
+
+    def _run(self):
+        while True:
+            first = self._queue.get()
+            # Frames queued while the model was busy all join this batch
+            with self._model_lock:
+                self._classify(self._collect(first))
+
+    def get_stats(self) -> Dict:
+        batches = self._stats['batches']
+        return {
+            'frames': self._stats['frames'],
+            'batches': batches,
+            'inline': self._stats['inline'],
+            'errors': self._stats['errors'],
+            'avg_batch_size': round(self._stats['frames'] / batches, 2) if batches else None,
+            'avg_batch_ms': round(self._stats['predict_seconds'] / batches * 1000, 1) if batches else None,
+            'pending': self._queue.qsize(),
+            'max_batch': self.max_batch,
+            'max_wait_ms': self.max_wait * 1000
+        }
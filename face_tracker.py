@@ -0,0 +1,133 @@
+import logging
+import os
+from typing import Dict, Optional, Tuple
+
+from lazy_imports import lazy_module
+
+cv2 = lazy_module('cv2')
+
+logger = logging.getLogger(__name__)
+
+Box = Tuple[int, int, int, int]  # x, y, width, height in full-frame pixels
+
+FACE_CASCADE = 'haarcascade_frontalface_default.xml'
+
+
+class FaceTracker:
+    """Finds the candidate's face once, then follows it cheaply.
+
+    A Haar cascade detects the largest face on a downscaled grayscale frame.
+    Later frames are matched against that face's template in a window around
+    the last box, so the detector only runs again when the match score drops
+    (drift, occlusion, the candidate leaving) or every redetect_every frames
+    to pick up changes in scale. The emotion model then sees only the crop.
+    """
+
+    def __init__(self, detect_scale: float = 0.5, match_threshold: float = 0.6,
+                 redetect_every: int = 30, margin: float = 0.15, min_face: int = 48):
+        """
+        Args:
+            detect_scale: Downscale factor applied before running the cascade
+            match_threshold: Lowest template-match score still treated as the same face
+            redetect_every: Tracked frames before the cascade is run again regardless
+            margin: Fraction of the box added on each side of the crop
+            min_face: Smallest face side, in full-frame pixels, the cascade reports
+        """
+        self.detect_scale = detect_scale
+        self.match_threshold = match_threshold
+        self.redetect_every = redetect_every
+        self.margin = margin
+        self.min_face = min_face
+        self.box: Optional[Box] = None
+        self._template = None
+        self._since_detect = 0
+        self._cascade = None
+        self._stats = {'detections': 0, 'tracked': 0, 'lost': 0, 'no_face': 0}
+
+    @property
+    def available(self) -> bool:
+        """Whether the face cascade could be loaded (OpenCV builds without objdetect lack it)."""
+        if self._cascade is None:
+            self._cascade = False
+            path = os.path.join(cv2.data.haarcascades, FACE_CASCADE)
+            cascade = cv2.CascadeClassifier(path) if hasattr(cv2, 'CascadeClassifier') else None
+            if cascade is None or cascade.empty():
+                logger.warning("Could not load face cascade %s; classifying whole frames", path)
+            else:
+                self._cascade = cascade
+        return self._cascade is not False
+
+    def reset(self):
+        """Forget the tracked face; the next frame runs the detector."""
+        self.box = None
+        self._template = None
+
+    def detect(self, gray) -> Optional[Box]:
+        """Largest face in a grayscale frame, or None."""
+        small = cv2.resize(gray, None, fx=self.detect_scale, fy=self.detect_scale, interpolation=cv2.INTER_AREA)
+        small = cv2.equalizeHist(small)
+        min_side = max(1, int(self.min_face * self.detect_scale))
+        faces = self._cascade.detectMultiScale(small, scaleFactor=1.1, minNeighbors=5, minSize=(min_side, min_side))
+        if len(faces) == 0:
+            return None
+        x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+        return tuple(int(round(v / self.detect_scale)) for v in (x, y, w, h))
+
+    def _track(self, gray) -> Optional[Box]:
+        # Search a window one half-box around the last position for the face template
+        x, y, w, h = self.box
+        frame_h, frame_w = gray.shape[:2]
+        x0, y0 = max(0, x - w // 2), max(0, y - h // 2)
+        x1, y1 = min(frame_w, x + w + w // 2), min(frame_h, y + h + h // 2)
+        region = gray[y0:y1, x0:x1]
+        if region.shape[0] < h or region.shape[1] < w:
+            return None
+        scores = cv2.matchTemplate(region, self._template, cv2.TM_CCOEFF_NORMED)
+        _, best, _, (dx, dy) = cv2.minMaxLoc(scores)
+        if best < self.match_threshold:
+            return None
+        return x0 + dx, y0 + dy, w, h
+
+    def locate(self, frame) -> Optional[Box]:
+        """Face box in a BGR frame, tracked from the previous call when possible."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        if self.box is not None and self._since_detect < self.redetect_every:
+            box = self._track(gray)
+            if box is not None:
+                self.box = box
+                self._since_detect += 1
+                self._stats['tracked'] += 1
+                return box
+            self._stats['lost'] += 1
+
+        box = self.detect(gray)
+        self._stats['detections'] += 1
+        self._since_detect = 0
+        if box is None:
+            self._stats['no_face'] += 1
+            self.reset()
+            return None
+        x, y, w, h = box
+        self.box = box
+        self._template = gray[y:y + h, x:x + w].copy()
+        return box
+
+    def crop(self, frame):
+        """The face (plus margin) cut from frame; the whole frame if no cascade is available, None if no face."""
+        if not self.available:
+            return frame
+        box = self.locate(frame)
+        if box is None:
+            return None
+        x, y, w, h = box
+        pad_x, pad_y = int(w * self.margin), int(h * self.margin)
+        frame_h, frame_w = frame.shape[:2]
+        return frame[max(0, y - pad_y):min(frame_h, y + h + pad_y), max(0, x - pad_x):min(frame_w, x + w + pad_x)]
+
+    def get_stats(self) -> Dict:
+        frames = self._stats['detections'] + self._stats['tracked']
+        return {
+            **self._stats,
+            'detect_rate': round(self._stats['detections'] / frames, 3) if frames else None,
+            'box': list(self.box) if self.box is not None else None
+        }
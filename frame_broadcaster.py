@@ -0,0 +1,172 @@
+import asyncio
+import functools
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from lazy_imports import lazy_module
+
+logger = logging.getLogger(__name__)
+
+cv2 = lazy_module('cv2')
+np = lazy_module('numpy')
+
+
+def encode_jpeg(frame) -> Optional[bytes]:
+    """JPEG bytes for a frame, or None if encoding failed."""
+    ret, buffer = cv2.imencode('.jpg', frame)
+    return buffer.tobytes() if ret else None
+
+
+@functools.lru_cache(maxsize=None)
+def placeholder_jpeg(text: str = 'Camera unavailable', width: int = 640, height: int = 480) -> bytes:
+    """A dark frame with a message, sent to viewers while no frames arrive."""
+    frame = np.zeros((height, width, 3), dtype=np.uint8)
+    (text_width, _), _ = cv2.getTextSize(text, cv2.FONT_HERSHEY_SIMPLEX, 0.8, 2)
+    cv2.putText(frame, text, ((width - text_width) // 2, height // 2), cv2.FONT_HERSHEY_SIMPLEX,
+                0.8, (200, 200, 200), 2)
+    return encode_jpeg(frame)
+
+
+class Subscription:
+    """One viewer's latest-frame slot.
+
+    The producer overwrites the slot with every new frame, so a slow viewer
+    skips frames instead of building a backlog. Use as a context manager so
+    the slot is dropped when the viewer disconnects.
+    """
+
+    def __init__(self, broadcaster: 'FrameBroadcaster', loop: Optional[asyncio.AbstractEventLoop] = None):
+        self._broadcaster = broadcaster
+        self._loop = loop
+        self._cond = threading.Condition()
+        self._event = asyncio.Event() if loop is not None else None
+        self._slot: Optional[bytes] = None
+        self.delivered = 0
+        self.dropped = 0
+
+    def _offer(self, data: bytes):
+        # Called on the producer thread
+        with self._cond:
+            if self._slot is not None:
+                self.dropped += 1
+            self._slot = data
+            self._cond.notify()
+        if self._loop is not None:
+            try:
+                self._loop.call_soon_threadsafe(self._event.set)
+            except RuntimeError:
+                # Loop already closed; the viewer is gone
+                self.close()
+
+    def _take(self) -> Optional[bytes]:
+        with self._cond:
+            data, self._slot = self._slot, None
+        if data is not None:
+            self.delivered += 1
+        return data
+
+    def get(self, timeout: float = 1.0) -> Optional[bytes]:
+        """Next frame published after the last one taken, or None after timeout."""
+        with self._cond:
+            self._cond.wait_for(lambda: self._slot is not None, timeout)
+        return self._take()
+
+    async def get_async(self, timeout: float = 1.0) -> Optional[bytes]:
+        """get() for subscriptions created with an event loop."""
+        try:
+            await asyncio.wait_for(self._event.wait(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        self._event.clear()
+        return self._take()
+
+    def close(self):
+        self._broadcaster._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+class FrameBroadcaster:
+    """Fans one producer's encoded frames out to any number of viewers.
+
+    A single producer thread pulls frames from source, encodes each once and
+    copies the bytes reference into every subscriber's slot. It runs only
+    while someone is subscribed, so an extra viewer costs a slot write, not
+    another encode.
+    """
+
+    def __init__(self, source: Callable[[int, float], Tuple[int, Optional[Any]]],
+                 encode: Callable[[Any], Optional[bytes]], name: str = 'video'):
+        """
+        Args:
+            source: (last_seq, timeout) -> (seq, frame); blocks until a frame newer than
+                last_seq is available and returns (last_seq, None) on timeout
+            encode: Turns a frame into the bytes sent to viewers (None to drop it)
+            name: Used for the producer thread name
+        """
+        self.source = source
+        self.encode = encode
+        self.name = name
+        self._lock = threading.Lock()
+        self._subscribers = set()
+        self._thread = None
+        self._stats = {'encoded': 0, 'encode_failures': 0, 'source_errors': 0}
+
+    def subscribe(self, loop: Optional[asyncio.AbstractEventLoop] = None) -> Subscription:
+        """Add a viewer (pass the running loop for async viewers); starts the producer if needed."""
+        subscription = Subscription(self, loop)
+        with self._lock:
+            self._subscribers.add(subscription)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name=f'{self.name}-broadcaster', daemon=True)
+                self._thread.start()
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription):
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def _run(self):
+        seq = 0
+        while True:
+            with self._lock:
+                # Exit when the last viewer leaves; subscribe() starts a new producer
+                if not self._subscribers:
+                    self._thread = None
+                    return
+            try:
+                seq, frame = self.source(seq, 1.0)
+            except Exception as e:
+                logger.error("Error reading frame for %s broadcast: %s", self.name, e)
+                self._stats['source_errors'] += 1
+                time.sleep(1)
+                continue
+            if frame is None:
+                continue
+            data = self.encode(frame)
+            if data is None:
+                self._stats['encode_failures'] += 1
+                continue
+            self._stats['encoded'] += 1
+            with self._lock:
+                subscribers = list(self._subscribers)
+            for subscription in subscribers:
+                subscription._offer(data)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            subscribers = list(self._subscribers)
+            running = self._thread is not None
+        return {
+            **self._stats,
+            'running': running,
+            'subscribers': len(subscribers),
+            'delivered': sum(s.delivered for s in subscribers),
+            'dropped': sum(s.dropped for s in subscribers)
+        }
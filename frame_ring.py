@@ -0,0 +1,47 @@
+import threading
+from collections import deque
+from typing import Any, Optional, Tuple
+
+
+class FrameRing:
+    """The last few camera frames, numbered in capture order.
+
+    The capture thread only ever appends (old frames fall off the end), so
+    it never waits on a reader; readers take the newest frame or wait for
+    one newer than the last they saw.
+    """
+
+    def __init__(self, size: int = 4):
+        """
+        Args:
+            size: Frames kept; older ones are dropped as new ones arrive
+        """
+        self._frames = deque(maxlen=size)
+        self._cond = threading.Condition()
+        self._seq = 0
+
+    def put(self, frame: Any) -> int:
+        """Add a captured frame; returns its sequence number."""
+        with self._cond:
+            self._seq += 1
+            self._frames.append((self._seq, frame))
+            self._cond.notify_all()
+            return self._seq
+
+    def latest(self) -> Tuple[int, Optional[Any]]:
+        """(sequence number, frame) of the newest frame, or (0, None) if there is none yet."""
+        with self._cond:
+            return self._frames[-1] if self._frames else (0, None)
+
+    def wait_newer(self, seq: int, timeout: float = 1.0) -> Tuple[int, Optional[Any]]:
+        """Newest frame captured after seq, waiting up to timeout for one to arrive.
+
+        Returns latest() unchanged if nothing newer arrived in time.
+        """
+        with self._cond:
+            self._cond.wait_for(lambda: self._seq > seq, timeout)
+            return self._frames[-1] if self._frames else (0, None)
+
+    @property
+    def seq(self) -> int:
+        return self._seq
@@ -7,6 +7,18 @@ import ReactMarkdown from 'react-markdown';
 import EmotionStats from './components/EmotionStats';
 import './App.css';
 
+// Identifies this tab's interview to the backend, which keeps per-candidate state by it
+const SESSION_ID = (() => {
+  let id = sessionStorage.getItem('interviewSessionId');
+  if (!id) {
+    id = (window.crypto && window.crypto.randomUUID)
+      ? window.crypto.randomUUID()
+      : `${Date.now()}-${Math.random().toString(36).slice(2)}`;
+    sessionStorage.setItem('interviewSessionId', id);
+  }
+  return id;
+})();
+
 const questions = [
   {
     id: 1,
@@ -1234,6 +1246,7 @@ function Interview({ question, onInterviewFinish, onBack }) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Session-Id': SESSION_ID,
         },
       });
       
@@ -1322,6 +1335,7 @@ function Interview({ question, onInterviewFinish, onBack }) {
             method: 'POST',
             headers: {
               'Content-Type': 'application/json',
+              'X-Session-Id': SESSION_ID,
             },
           });
           console.log('Health tracking stopped on unmount');
@@ -1396,6 +1410,7 @@ function Interview({ question, onInterviewFinish, onBack }) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Session-Id': SESSION_ID,
         },
         body: JSON.stringify({ 
           code: code || '// No code to save',
@@ -1503,6 +1518,53 @@ function Interview({ question, onInterviewFinish, onBack }) {
     }
   };
   
+  // Play a chunked MP3 response while it is still downloading
+  const playStreamingAudio = async (response) => {
+    const mediaSource = new MediaSource();
+    const audio = new Audio(URL.createObjectURL(mediaSource));
+    
+    audio.onended = () => {
+      console.log('Playback finished');
+      setIsPlaying(false);
+    };
+    
+    audio.onerror = (e) => {
+      console.error('Audio playback error:', e);
+      setIsPlaying(false);
+    };
+    
+    await new Promise(resolve => mediaSource.addEventListener('sourceopen', resolve, { once: true }));
+    const sourceBuffer = mediaSource.addSourceBuffer('audio/mpeg');
+    const reader = response.body.getReader();
+    let started = false;
+    
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      
+      sourceBuffer.appendBuffer(value);
+      await new Promise(resolve => sourceBuffer.addEventListener('updateend', resolve, { once: true }));
+      
+      if (!started) {
+        started = true;
+        console.log('Starting streamed playback...');
+        setIsPlaying(true);
+        audio.play().catch(e => {
+          console.error('Error playing audio:', e);
+          setIsPlaying(false);
+        });
+      }
+    }
+    
+    if (mediaSource.readyState === 'open') {
+      mediaSource.endOfStream();
+    }
+    
+    if (!started) {
+      throw new Error('Received empty audio response');
+    }
+  };
+  
   // Function to send audio to backend for processing
   const sendToElevenLabs = async (audioBlob) => {
     try {
@@ -1515,9 +1577,13 @@ function Interview({ question, onInterviewFinish, onBack }) {
       // Get the current question title or use a default
       const questionTitle = question?.title || 'the coding problem';
       
+      // Stream the reply when the browser can play MP3 from a MediaSource
+      const canStream = window.MediaSource && MediaSource.isTypeSupported('audio/mpeg');
+      
       // Send to backend with question title
-      const response = await fetch(`http://localhost:5008/process_audio?question_title=${encodeURIComponent(questionTitle)}`, {
+      const response = await fetch(`http://localhost:5008/process_audio?question_title=${encodeURIComponent(questionTitle)}${canStream ? '&stream=1' : ''}`, {
         method: 'POST',
+        headers: { 'X-Session-Id': SESSION_ID },
         body: formData,
         // Don't set Content-Type header, let the browser set it with the correct boundary
       });
@@ -1527,6 +1593,11 @@ function Interview({ question, onInterviewFinish, onBack }) {
         throw new Error(errorData.error || 'Failed to process audio');
       }
       
+      if (canStream && response.body) {
+        await playStreamingAudio(response);
+        return;
+      }
+      
       // Get the audio response as a blob
       const audioData = await response.blob();
       
@@ -1600,6 +1671,7 @@ function Interview({ question, onInterviewFinish, onBack }) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Session-Id': SESSION_ID,
         },
         body: JSON.stringify({ code }),
       });
@@ -1615,6 +1687,7 @@ function Interview({ question, onInterviewFinish, onBack }) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Session-Id': SESSION_ID,
         },
         body: JSON.stringify({ 
           code, 
@@ -1678,6 +1751,7 @@ function Interview({ question, onInterviewFinish, onBack }) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Session-Id': SESSION_ID,
         },
         body: JSON.stringify({ text: cleanText }),
       });
@@ -1813,6 +1887,7 @@ function Interview({ question, onInterviewFinish, onBack }) {
         method: 'POST',
         headers: {
           'Content-Type': 'application/json',
+          'X-Session-Id': SESSION_ID,
         },
       });
       
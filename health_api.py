@@ -1,11 +1,23 @@
 from flask import Flask, jsonify, Response, request
 from health_tracker import HealthTracker
+from frame_broadcaster import FrameBroadcaster, encode_jpeg, placeholder_jpeg
+from log_pipeline import setup_logging
+import profiling
 import threading
 import time
 import json
+import logging
+import os
+
+setup_logging()
+logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
 
+# X-Profile / ?profile= runs a request under a profiler (PROFILE_REQUESTS, PROFILE_DIR);
+# PROFILE_BACKGROUND or SIGUSR2 samples the tracker thread
+profiling.init_app(app)
+
 # Initialize the health tracker
 tracker = HealthTracker(update_interval=2.0)
 
@@ -60,7 +72,7 @@ def stream():
                     yield f"data: {json.dumps(data)}\n\n"
                 time.sleep(1)  # Update every second
         except GeneratorExit:
-            print("Client disconnected")
+            logger.info("Client disconnected")
     
     return Response(
         generate(),
@@ -72,22 +84,31 @@ def stream():
         }
     )
 
+def next_status_frame(last_seq, timeout):
+    """Render the status frame ten times a second (it is drawn, not captured, so nothing paces it)"""
+    time.sleep(0.1)
+    success, frame = tracker.get_annotated_frame()
+    return last_seq + 1, frame if success else None
+
+# One producer renders and encodes each frame once for every viewer
+video_broadcaster = FrameBroadcaster(next_status_frame, encode_jpeg)
+
+# Seconds without frames before viewers get a placeholder instead
+VIDEO_FEED_IDLE_TIMEOUT = float(os.getenv("VIDEO_FEED_IDLE_TIMEOUT", 5))
+
 def generate_frames():
     """Generate camera frames with emotion detection overlay."""
-    while True:
-        success, frame = tracker.get_annotated_frame()
-        if not success:
-            break
-            
-        # Encode the frame in JPEG format
-        ret, buffer = cv2.imencode('.jpg', frame)
-        if not ret:
-            continue
-            
-        # Convert to bytes and yield for streaming
-        frame = buffer.tobytes()
-        yield (b'--frame\r\n'
-               b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
+    with video_broadcaster.subscribe() as subscription:
+        idle_since = time.monotonic()
+        while True:
+            frame = subscription.get()
+            if frame is None:
+                if time.monotonic() - idle_since < VIDEO_FEED_IDLE_TIMEOUT:
+                    continue
+                frame = placeholder_jpeg()
+            idle_since = time.monotonic()
+            yield (b'--frame\r\n'
+                   b'Content-Type: image/jpeg\r\n\r\n' + frame + b'\r\n')
 
 @app.route('/api/health/video_feed')
 def video_feed():
@@ -1,4 +1,5 @@
 import os
+import logging
 import cv2
 import numpy as np
 import time
@@ -7,6 +8,9 @@ from datetime import datetime
 from typing import Dict, List, Optional
 import threading
 from collections import defaultdict
+from face_tracker import FaceTracker
+
+logger = logging.getLogger(__name__)
 
 class HealthTracker:
     def __init__(self, camera_index: int = 0, update_interval: float = 2.0, log_file: str = "emotion_log.txt"):
@@ -20,7 +24,7 @@ class HealthTracker:
         """
         # Set device for PyTorch (MPS for Apple Silicon, fallback to CPU)
         self.device = torch.device('mps' if torch.backends.mps.is_available() else 'cpu')
-        print(f"Using device: {self.device}")
+        logger.info("Using device: %s", self.device)
         
         # Initialize log file
         self.log_file = log_file
@@ -36,21 +40,15 @@ class HealthTracker:
             from deepface import DeepFace
             import numpy as np
             
-            print("Initializing DeepFace...")
             self.emotion_detection_available = True
-            print("Emotion detection initialized successfully with DeepFace")
+            logger.info("Emotion detection initialized successfully with DeepFace")
                 
         except ImportError as ie:
-            print(f"Error importing DeepFace: {ie}")
-            print("Please install it with: pip install deepface")
-            print("Falling back to mock emotion detection")
+            logger.warning("Error importing DeepFace (%s); install it with: pip install deepface. "
+                           "Falling back to mock emotion detection", ie)
             self.emotion_detection_available = False
         except Exception as e:
-            print(f"Unexpected error initializing DeepFace: {str(e)}")
-            import traceback
-            print("Full traceback:")
-            traceback.print_exc()
-            print("Falling back to mock emotion detection")
+            logger.exception("Unexpected error initializing DeepFace, falling back to mock emotion detection")
             self.emotion_detection_available = False
             
         # Tracking state
@@ -62,6 +60,7 @@ class HealthTracker:
         self.latest_data = {}
         self.running = False
         self.thread = None
+        self.faces = FaceTracker()
         
         # Engagement weights (customize based on your needs)
         self.engagement_weights = {
@@ -77,7 +76,7 @@ class HealthTracker:
     def _detect_emotions(self):
         """Detect emotions using DeepFace from the default camera"""
         if not self.emotion_detection_available:
-            print("Emotion detection not available, using mock data")
+            logger.debug("Emotion detection not available, using mock data")
             return {
                 'angry': 0.1,
                 'disgust': 0.01,
@@ -90,45 +89,35 @@ class HealthTracker:
             
         try:
             from deepface import DeepFace
-            import tempfile
-            import os
-            
-            # Create a temporary directory if it doesn't exist
-            temp_dir = "/tmp/emotion_frames"
-            os.makedirs(temp_dir, exist_ok=True)
             
             # Capture a single frame from the default camera
             cap = cv2.VideoCapture(0)
             if not cap.isOpened():
-                print("Error: Could not open camera")
+                logger.error("Could not open camera")
                 return None
                 
             ret, frame = cap.read()
             cap.release()
             
             if not ret:
-                print("Error: Could not capture frame from camera")
+                logger.error("Could not capture frame from camera")
                 return None
                 
-            # Save frame to a temporary file
-            temp_path = os.path.join(temp_dir, f"frame_{int(time.time())}.jpg")
-            cv2.imwrite(temp_path, frame)
+            # Find (or keep following) the face ourselves so DeepFace only classifies the crop
+            face = self.faces.crop(frame)
+            if face is None:
+                logger.debug("No face in frame")
+                return None
             
-            # Analyze the captured frame
+            # Analyze the face crop; detection already happened above (unless the cascade is missing)
             result = DeepFace.analyze(
-                img_path=temp_path,
+                img_path=face,
                 actions=['emotion'],
                 enforce_detection=False,
-                detector_backend='opencv',
+                detector_backend='skip' if self.faces.available else 'opencv',
                 silent=True
             )
             
-            # Clean up the temporary file
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-            
             if isinstance(result, list) and len(result) > 0:
                 if 'emotion' in result[0]:
                     return result[0]['emotion']
@@ -136,7 +125,7 @@ class HealthTracker:
             return None
             
         except Exception as e:
-            print(f"Error in emotion detection: {str(e)}")
+            logger.error("Error in emotion detection: %s", e)
             return None
     
     def calculate_engagement(self, emotions: Dict) -> float:
@@ -181,8 +170,7 @@ class HealthTracker:
         with open(self.log_file, 'a') as f:
             f.write(data_line)
         
-        print(f"Logged emotions at {timestamp}")
-        print(f"Dominant emotion: {dominant_emotion} (Engagement: {engagement:.2f})")
+        logger.debug("Logged emotions", extra={'dominant_emotion': dominant_emotion, 'engagement': round(engagement, 2)})
     
     def update(self) -> Optional[Dict]:
         """Update tracking metrics and log to file."""
@@ -195,7 +183,7 @@ class HealthTracker:
         # Detect emotions
         emotions = self._detect_emotions()
         if not emotions:
-            print("No emotions detected, skipping update")
+            logger.debug("No emotions detected, skipping update")
             return None
             
         # Calculate engagement
@@ -279,7 +267,7 @@ class HealthTracker:
             return
             
         self.running = True
-        self.thread = threading.Thread(target=self._update_loop, daemon=True)
+        self.thread = threading.Thread(target=self._update_loop, name='health-tracker', daemon=True)
         self.thread.start()
     
     def stop(self):
@@ -296,7 +284,7 @@ class HealthTracker:
                 self.update()
                 time.sleep(0.1)  # Small sleep to prevent high CPU usage
             except Exception as e:
-                print(f"Error in update loop: {e}")
+                logger.error("Error in update loop: %s", e)
                 time.sleep(1)
     
     def get_annotated_frame(self):
@@ -373,6 +361,9 @@ def print_status(tracker):
         print("====================\n")
 
 if __name__ == "__main__":
+    from log_pipeline import setup_logging
+    setup_logging(fmt='text')
+    
     print("Starting Emotion Detection Logger...")
     print("Press Ctrl+C to stop\n")
     
@@ -0,0 +1,64 @@
+import hashlib
+import re
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+def normalize_code(code: str) -> str:
+    """Ignore whitespace-only edits: trailing spaces and blank lines."""
+    lines = [line.rstrip() for line in code.splitlines()]
+    return '\n'.join(line for line in lines if line)
+
+
+def normalize_utterance(text: str) -> str:
+    """Lowercase, drop punctuation and collapse whitespace in a transcript."""
+    text = re.sub(r"[^\w\s']", ' ', text.lower())
+    return ' '.join(text.split())
+
+
+def hint_key(code: str, question_title: str, utterance: str) -> str:
+    """Cache key for an interviewer hint: same code, question and words -> same key."""
+    parts = [normalize_code(code), question_title.strip().lower(), normalize_utterance(utterance)]
+    return hashlib.sha256('\x00'.join(parts).encode('utf-8')).hexdigest()
+
+
+class HintCache:
+    """Thread-safe LRU cache whose entries also expire after ttl seconds."""
+
+    def __init__(self, max_entries: int = 512, ttl: float = 600.0):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # key -> (expires_at, value), oldest first
+        self.stats = {'hits': 0, 'misses': 0, 'expired': 0, 'evictions': 0}
+
+    def get(self, key: str) -> Optional[str]:
+        """Return the cached value, or None if missing or expired."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.stats['misses'] += 1
+                return None
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.stats['expired'] += 1
+                self.stats['misses'] += 1
+                return None
+            self._entries.move_to_end(key)
+            self.stats['hits'] += 1
+            return value
+
+    def put(self, key: str, value: str):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+                self.stats['evictions'] += 1
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self.stats, 'entries': len(self._entries)}
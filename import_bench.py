@@ -0,0 +1,101 @@
+"""Import-time benchmark for the backend, with a budget.
+
+Imports a module (app by default) in fresh interpreters, reports the
+median wall time, the slowest imports (from -X importtime) and which heavy
+libraries were loaded, and exits non-zero when the median is over budget.
+
+Examples:
+    python import_bench.py                         # FAST_START=1 app, 1000 ms budget
+    python import_bench.py --eager                 # compare with eager imports
+    python import_bench.py --module asgi --budget-ms 1500 --runs 5
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from typing import Dict, List
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+# Libraries FAST_START is meant to keep out of a cold start (google.generativeai still
+# shows up: the gateway warms it on a background thread rather than during the import)
+HEAVY_MODULES = ['cv2', 'numpy', 'pydub', 'av', 'google.generativeai', 'emotiefflib', 'torch']
+
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", 1000))
+
+_CHILD = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+elapsed = time.perf_counter() - start
+print(json.dumps({{'elapsed_ms': elapsed * 1000,
+                  'loaded': [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def parse_importtime(stderr: str, top: int = 10) -> List[Dict]:
+    """Slowest imports by cumulative time from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        try:
+            self_us, cumulative_us, name = [part.strip() for part in line.split(':', 1)[1].split('|')]
+            rows.append({'module': name, 'self_ms': int(self_us) / 1000, 'cumulative_ms': int(cumulative_us) / 1000})
+        except ValueError:
+            continue
+    return sorted(rows, key=lambda row: -row['cumulative_ms'])[:top]
+
+
+def measure(module: str = 'app', fast_start: bool = True, runs: int = 3) -> Dict:
+    """Import module in runs fresh interpreters; return timings and what got loaded."""
+    env = dict(os.environ, FAST_START='1' if fast_start else '0', LOG_LEVEL='WARNING')
+    code = _CHILD.format(module=module, heavy=HEAVY_MODULES)
+    timings, loaded, slowest = [], [], []
+    for _ in range(runs):
+        result = subprocess.run([sys.executable, '-X', 'importtime', '-c', code], cwd=ROOT, env=env,
+                                capture_output=True, text=True)
+        if result.returncode != 0:
+            raise RuntimeError(f"Importing {module} failed:\n{result.stderr[-2000:]}")
+        report = json.loads(result.stdout.strip().splitlines()[-1])
+        timings.append(report['elapsed_ms'])
+        loaded = report['loaded']
+        slowest = parse_importtime(result.stderr)
+    return {
+        'module': module,
+        'fast_start': fast_start,
+        'runs': runs,
+        'median_ms': round(statistics.median(timings), 1),
+        'min_ms': round(min(timings), 1),
+        'heavy_loaded': loaded,
+        'slowest': slowest,
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--module', default='app', help='Module to import')
+    parser.add_argument('--eager', action='store_true', help='Measure without FAST_START')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh interpreters to time')
+    parser.add_argument('--budget-ms', type=float, default=IMPORT_BUDGET_MS, help='Fail above this median')
+    args = parser.parse_args(argv)
+
+    report = measure(args.module, fast_start=not args.eager, runs=args.runs)
+    mode = 'eager' if args.eager else 'FAST_START'
+    print(f"import {report['module']} ({mode}): median {report['median_ms']} ms, "
+          f"min {report['min_ms']} ms over {report['runs']} runs (budget {args.budget_ms:.0f} ms)")
+    print(f"Heavy modules loaded: {', '.join(report['heavy_loaded']) or 'none'}")
+    print("Slowest imports (cumulative):")
+    for row in report['slowest']:
+        print(f"  {row['cumulative_ms']:>8.1f} ms  {row['module']}")
+
+    if report['median_ms'] > args.budget_ms:
+        print(f"Over budget by {report['median_ms'] - args.budget_ms:.0f} ms")
+        return 1
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
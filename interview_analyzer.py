@@ -1,12 +1,25 @@
 import re
 from datetime import datetime
 from collections import defaultdict
+import logging
 import os
 
+logger = logging.getLogger(__name__)
+
 class InterviewAnalyzer:
-    def __init__(self, log_file='conversation_logs/conversation_log.txt', code_file='test.txt'):
+    def __init__(self, log_file='conversation_logs/conversation_log.txt', code_file='test.txt', journal=None,
+                 code=None):
+        """
+        Args:
+            log_file: Conversation log to parse when no journal is given
+            code_file: The candidate's saved code, read when no code is given
+            journal: ConversationJournal whose in-memory turns are read instead of log_file
+            code: The candidate's code as held in their session
+        """
         self.log_file = log_file
         self.code_file = code_file
+        self.journal = journal
+        self.code = code
         self.metrics = {
             'communication': 0,
             'charisma': 0,
@@ -29,47 +42,32 @@ class InterviewAnalyzer:
             bool: True if analysis was successful, False otherwise
         """
         try:
-            if not os.path.exists(self.log_file):
-                print(f"Error: Log file {self.log_file} not found")
+            turns = self._load_turns()
+            if turns is None:
                 return False
                 
-            if os.path.getsize(self.log_file) == 0:
-                print("Error: Log file is empty")
-                return False
-            
-            with open(self.log_file, 'r', encoding='utf-8') as f:
-                lines = f.readlines()
-                
             user_messages = []
             response_times = []
             prev_time = None
         
             # Extract user messages and response times
-            for line in lines:
-                # Extract timestamp from the line if it exists
-                if ']' in line and ':' in line.split(']')[0]:
-                    timestamp_str = line.split(']')[0][1:]
-                    try:
-                        current_time = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
-                        
-                        if 'User:' in line and prev_time is not None:
-                            # Calculate time since last AI response
-                            response_time = (current_time - prev_time).total_seconds()
-                            response_times.append(response_time)
-                        
-                        if 'AI:' in line:
-                            prev_time = current_time
-                            
-                    except ValueError as e:
-                        print(f"Warning: Could not parse timestamp '{timestamp_str}': {str(e)}")
+            for speaker, text, current_time in turns:
+                if current_time is not None:
+                    if speaker == 'User' and prev_time is not None:
+                        # Calculate time since last AI response
+                        response_time = (current_time - prev_time).total_seconds()
+                        response_times.append(response_time)
+                    
+                    if speaker == 'AI':
+                        prev_time = current_time
                 
                 # Always collect user messages for analysis
-                if 'User:' in line:
-                    user_messages.append(line.split('User: ')[1].strip())
+                if speaker == 'User':
+                    user_messages.append(text.strip())
             
             # Analyze communication metrics
             if not user_messages:
-                print("Warning: No user messages found in the log")
+                logger.warning("No user messages found in the log")
                 return False
                 
             total_words = sum(len(msg.split()) for msg in user_messages)
@@ -88,7 +86,7 @@ class InterviewAnalyzer:
             return True
             
         except Exception as e:
-            print(f"Error analyzing conversation: {str(e)}")
+            logger.error("Error analyzing conversation: %s", e)
             return False
         total_words = sum(len(msg.split()) for msg in user_messages)
         avg_words = total_words / max(len(user_messages), 1)
@@ -107,15 +105,52 @@ class InterviewAnalyzer:
                            if word in positive_words)
         self.metrics['charisma'] = min(10, positive_count * 2)  # Up to 5 positive words = 10/10
         
+    def _load_turns(self):
+        """(speaker, text, timestamp) for every entry, or None if there is nothing to analyze"""
+        if self.journal is not None:
+            turns = [(t.speaker, t.text, t.timestamp) for t in self.journal.turns()]
+            if not turns:
+                logger.error("Conversation journal is empty")
+                return None
+            return turns
+            
+        if not os.path.exists(self.log_file):
+            logger.error("Log file %s not found", self.log_file)
+            return None
+            
+        if os.path.getsize(self.log_file) == 0:
+            logger.error("Log file is empty")
+            return None
+        
+        turns = []
+        with open(self.log_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                # Lines look like "[2025-11-22 15:00:10] User: text"
+                if not line.startswith('[') or ']' not in line:
+                    continue
+                timestamp_str, _, rest = line[1:].partition('] ')
+                speaker, sep, text = rest.partition(': ')
+                if not sep:
+                    continue
+                try:
+                    timestamp = datetime.strptime(timestamp_str, '%Y-%m-%d %H:%M:%S')
+                except ValueError as e:
+                    logger.warning("Could not parse timestamp '%s': %s", timestamp_str, e)
+                    timestamp = None
+                turns.append((speaker, text.strip(), timestamp))
+        return turns
+        
     def analyze_code_quality(self):
-        """Analyze the code quality in test.txt"""
-        if not os.path.exists(self.code_file):
-            print(f"Warning: Code file {self.code_file} not found"
-                  " - Technical understanding score will be affected")
+        """Analyze the code quality of the session's code (or test.txt)"""
+        if self.code is not None:
+            code = self.code
+        elif not os.path.exists(self.code_file):
+            logger.warning("Code file %s not found - Technical understanding score will be affected",
+                           self.code_file)
             return
-            
-        with open(self.code_file, 'r') as f:
-            code = f.read()
+        else:
+            with open(self.code_file, 'r') as f:
+                code = f.read()
             
         # Simple code quality checks
         has_comments = int('#' in code)
@@ -169,9 +204,14 @@ class InterviewAnalyzer:
             
         return feedback
 
-def analyze_interview():
-    """Main function to analyze the interview"""
-    analyzer = InterviewAnalyzer()
+def analyze_interview(journal=None, code=None):
+    """Main function to analyze the interview
+    
+    Args:
+        journal: Session ConversationJournal to analyze (defaults to the log file)
+        code: Session code to score (defaults to test.txt)
+    """
+    analyzer = InterviewAnalyzer(journal=journal, code=code)
     return analyzer.generate_report()
 
 if __name__ == "__main__":
@@ -0,0 +1,81 @@
+import importlib
+import importlib.util
+import os
+import sys
+import threading
+import time
+from typing import Dict
+
+# Defer heavy imports (vision, emotion, audio processing, Gemini SDK) until first use.
+# Read from the process environment, since it has to be known before app.env is loaded.
+FAST_START = os.getenv("FAST_START", "0") == "1"
+
+_load_times: Dict[str, float] = {}
+_lock = threading.Lock()
+
+
+class LazyModule:
+    """Stands in for a module and imports it on first attribute access.
+
+    Call sites keep using the usual module.attr spelling, so a module
+    can switch between eager and deferred loading without other changes.
+    """
+
+    def __init__(self, name: str):
+        self._name = name
+        self._module = None
+
+    def _load(self):
+        if self._module is None:
+            start = time.perf_counter()
+            module = importlib.import_module(self._name)
+            with _lock:
+                _load_times.setdefault(self._name, time.perf_counter() - start)
+            self._module = module
+        return self._module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __repr__(self):
+        state = 'loaded' if self.loaded else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_module(name: str, lazy: bool = None):
+    """Return module name, imported now or on first use.
+
+    Args:
+        name: Dotted module name
+        lazy: Defer the import (defaults to FAST_START)
+
+    Returns:
+        The module itself, or a LazyModule proxy for it
+
+    Raises:
+        ImportError: If the module is not installed (checked without importing
+            it when deferred, so optional-dependency fallbacks still work)
+    """
+    if lazy is None:
+        lazy = FAST_START
+    if not lazy or name in sys.modules:
+        return importlib.import_module(name)
+    # Only the top-level package is looked up; finding a submodule would import its parent
+    if importlib.util.find_spec(name.partition('.')[0]) is None:
+        raise ImportError(f"No module named '{name}'")
+    return LazyModule(name)
+
+
+def is_loaded(module) -> bool:
+    """Whether a module returned by lazy_module() has actually been imported."""
+    return not isinstance(module, LazyModule) or module.loaded
+
+
+def get_load_times() -> Dict[str, float]:
+    """Seconds spent on each deferred import, measured when it happened."""
+    with _lock:
+        return dict(_load_times)
@@ -0,0 +1,248 @@
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import deque
+from typing import AsyncIterator, Dict, Iterator, List, Optional
+
+from lazy_imports import lazy_module
+from metrics import LLM_ERRORS, LLM_FALLBACKS, LLM_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# The SDK takes about a second to import; with FAST_START it loads on the first call
+genai = lazy_module('google.generativeai')
+
+# Models tried in order until one answers; override with GEMINI_MODELS="a,b,c"
+DEFAULT_MODELS = ['gemini-2.5-flash', 'gemini-2.0-flash-latest']
+
+
+class LLMError(Exception):
+    """Raised when every model in the fallback chain failed."""
+
+
+class LLMGateway:
+    """Single entry point for Gemini calls.
+
+    Model handles are created once and reused, calls are capped at
+    max_concurrency in flight with a per-call timeout, and a failing model
+    falls through to the next one in the chain. Latency and error counts
+    are recorded per model.
+    """
+
+    def __init__(self, models: Optional[List[str]] = None, timeout: Optional[float] = None,
+                 max_concurrency: Optional[int] = None):
+        """
+        Args:
+            models: Fallback chain (defaults to GEMINI_MODELS or DEFAULT_MODELS)
+            timeout: Per-call timeout in seconds (defaults to GEMINI_TIMEOUT or 30)
+            max_concurrency: Max in-flight calls (defaults to GEMINI_CONCURRENCY or 8)
+        """
+        self._models = models
+        self._timeout = timeout
+        self._max_concurrency = max_concurrency
+        self._lock = threading.Lock()
+        self._handles = {}
+        self._semaphore = None
+        self._async_semaphore = None
+        self._stats = {}
+        self.configured = False
+
+    def _ensure_configured(self):
+        """Read configuration on first use, after the app has loaded its .env."""
+        if self.configured:
+            return
+        with self._lock:
+            if self.configured:
+                return
+            endpoint = os.getenv("GEMINI_API_ENDPOINT")
+            if endpoint:
+                # e.g. a local stand-in (loadtest.py); only the REST transport takes a plain URL
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"), transport='rest',
+                                client_options={'api_endpoint': endpoint})
+            else:
+                genai.configure(api_key=os.getenv("GEMINI_API_KEY"))
+            if self._models is None:
+                chain = os.getenv("GEMINI_MODELS")
+                self._models = [m.strip() for m in chain.split(',') if m.strip()] if chain else list(DEFAULT_MODELS)
+            if self._timeout is None:
+                self._timeout = float(os.getenv("GEMINI_TIMEOUT", 30))
+            if self._max_concurrency is None:
+                self._max_concurrency = int(os.getenv("GEMINI_CONCURRENCY", 8))
+            self._semaphore = threading.BoundedSemaphore(self._max_concurrency)
+            self.configured = True
+
+    @property
+    def models(self) -> List[str]:
+        self._ensure_configured()
+        return list(self._models)
+
+    def _handle(self, model_name: str):
+        handle = self._handles.get(model_name)
+        if handle is None:
+            with self._lock:
+                handle = self._handles.get(model_name)
+                if handle is None:
+                    handle = genai.GenerativeModel(model_name)
+                    self._handles[model_name] = handle
+        return handle
+
+    def warm(self):
+        """Create the handle for every model in the chain ahead of the first call."""
+        for model_name in self.models:
+            self._handle(model_name)
+
+    def is_warm(self) -> bool:
+        return self.configured and all(m in self._handles for m in self._models)
+
+    def _record(self, model_name: str, seconds: Optional[float] = None, error: bool = False):
+        with self._lock:
+            stats = self._stats.setdefault(model_name, {'calls': 0, 'errors': 0, 'latencies': deque(maxlen=200)})
+            stats['calls'] += 1
+            if error:
+                stats['errors'] += 1
+            if seconds is not None:
+                stats['latencies'].append(seconds)
+        if error:
+            LLM_ERRORS.inc(model=model_name)
+        if seconds is not None:
+            LLM_SECONDS.observe(seconds, model=model_name)
+
+    def _count_fallback(self, model_name: str):
+        """Count a failure that hands the call on to the next model in the chain."""
+        if model_name != self._models[-1]:
+            LLM_FALLBACKS.inc(from_model=model_name)
+
+    def generate(self, prompt: str) -> str:
+        """Return the first successful response text along the fallback chain.
+
+        Raises:
+            LLMError: if every model failed
+        """
+        self._ensure_configured()
+        errors = []
+        for model_name in self._models:
+            start = time.perf_counter()
+            try:
+                with self._semaphore:
+                    response = self._handle(model_name).generate_content(
+                        prompt, request_options={'timeout': self._timeout})
+                text = response.text
+            except Exception as e:
+                self._record(model_name, error=True)
+                logger.warning("Error with %s: %s", model_name, e)
+                self._count_fallback(model_name)
+                errors.append(f"{model_name}: {str(e)}")
+                continue
+            self._record(model_name, time.perf_counter() - start)
+            return text
+        raise LLMError("All models failed - " + "; ".join(errors))
+
+    def stream(self, prompt: str) -> Iterator[str]:
+        """Yield response text chunks, falling back only until the first chunk.
+
+        Once text has been yielded the reply cannot be restarted on another
+        model, so a later failure is raised instead of retried.
+
+        Raises:
+            LLMError: if every model failed, or the stream broke off midway
+        """
+        self._ensure_configured()
+        errors = []
+        for model_name in self._models:
+            start = time.perf_counter()
+            produced = False
+            try:
+                with self._semaphore:
+                    response = self._handle(model_name).generate_content(
+                        prompt, stream=True, request_options={'timeout': self._timeout})
+                    for chunk in response:
+                        text = chunk.text
+                        if text:
+                            produced = True
+                            yield text
+            except Exception as e:
+                self._record(model_name, error=True)
+                logger.warning("Error streaming from %s: %s", model_name, e)
+                if produced:
+                    raise LLMError(f"Stream from {model_name} was interrupted: {str(e)}")
+                self._count_fallback(model_name)
+                errors.append(f"{model_name}: {str(e)}")
+                continue
+            self._record(model_name, time.perf_counter() - start)
+            return
+        raise LLMError("All models failed - " + "; ".join(errors))
+
+    def _async_limit(self) -> asyncio.Semaphore:
+        # Created on first async use so it binds to the server's event loop
+        if self._async_semaphore is None:
+            self._async_semaphore = asyncio.Semaphore(self._max_concurrency)
+        return self._async_semaphore
+
+    async def agenerate(self, prompt: str) -> str:
+        """Awaitable generate() for the ASGI server; same fallback chain and stats."""
+        self._ensure_configured()
+        errors = []
+        for model_name in self._models:
+            start = time.perf_counter()
+            try:
+                async with self._async_limit():
+                    response = await self._handle(model_name).generate_content_async(
+                        prompt, request_options={'timeout': self._timeout})
+                text = response.text
+            except Exception as e:
+                self._record(model_name, error=True)
+                logger.warning("Error with %s: %s", model_name, e)
+                self._count_fallback(model_name)
+                errors.append(f"{model_name}: {str(e)}")
+                continue
+            self._record(model_name, time.perf_counter() - start)
+            return text
+        raise LLMError("All models failed - " + "; ".join(errors))
+
+    async def astream(self, prompt: str) -> AsyncIterator[str]:
+        """Async counterpart of stream()."""
+        self._ensure_configured()
+        errors = []
+        for model_name in self._models:
+            start = time.perf_counter()
+            produced = False
+            try:
+                async with self._async_limit():
+                    response = await self._handle(model_name).generate_content_async(
+                        prompt, stream=True, request_options={'timeout': self._timeout})
+                    async for chunk in response:
+                        text = chunk.text
+                        if text:
+                            produced = True
+                            yield text
+            except Exception as e:
+                self._record(model_name, error=True)
+                logger.warning("Error streaming from %s: %s", model_name, e)
+                if produced:
+                    raise LLMError(f"Stream from {model_name} was interrupted: {str(e)}")
+                self._count_fallback(model_name)
+                errors.append(f"{model_name}: {str(e)}")
+                continue
+            self._record(model_name, time.perf_counter() - start)
+            return
+        raise LLMError("All models failed - " + "; ".join(errors))
+
+    def get_stats(self) -> Dict:
+        """Per-model call counts, error counts and latency summary in seconds."""
+        with self._lock:
+            result = {}
+            for model_name, stats in self._stats.items():
+                latencies = sorted(stats['latencies'])
+                result[model_name] = {
+                    'calls': stats['calls'],
+                    'errors': stats['errors'],
+                    'avg_latency': sum(latencies) / len(latencies) if latencies else None,
+                    'p95_latency': latencies[int(0.95 * (len(latencies) - 1))] if latencies else None
+                }
+            return result
+
+
+# Shared gateway used by app.py and analyzer.py
+gateway = LLMGateway()
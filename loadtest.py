@@ -0,0 +1,283 @@
+"""Load test for the interview backend with local provider stand-ins.
+
+Starts provider_stubs.ProviderStubs in place of ElevenLabs and Gemini,
+serves app.py on a local port pointed at them, then drives concurrent
+/process_audio, /text-to-speech, /save-code and /submit-interview traffic
+and reports throughput, latency percentiles and error rates.
+
+Examples:
+    python loadtest.py --concurrency 8 --duration 30
+    python loadtest.py --llm-latency 900 --jitter 200 --error-rate 0.05 --json report.json
+    python loadtest.py --stream --mix process_audio=1
+    python loadtest.py --target http://localhost:5008   # an already running backend
+"""
+import argparse
+import glob
+import itertools
+import json
+import logging
+import math
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+import requests
+
+from provider_stubs import ProviderStubs
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+
+DEFAULT_MIX = 'process_audio=6,text-to-speech=2,save-code=1,submit-interview=1'
+
+SAMPLE_CODE = '''def two_sum(nums, target):
+    # Map each value to its index
+    seen = {}
+    for i, num in enumerate(nums):
+        if target - num in seen:
+            return [seen[target - num], i]
+        seen[num] = i
+    return []
+'''
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = math.ceil(pct / 100 * len(sorted_values))
+    return sorted_values[max(0, min(len(sorted_values), rank) - 1)]
+
+
+def parse_mix(mix: str) -> Dict[str, float]:
+    weights = {}
+    for part in mix.split(','):
+        name, _, weight = part.partition('=')
+        weights[name.strip()] = float(weight or 1)
+    unknown = set(weights) - set(SCENARIOS)
+    if unknown:
+        raise ValueError(f"Unknown scenarios: {', '.join(sorted(unknown))}")
+    return weights
+
+
+def load_audio_fixtures() -> List[tuple]:
+    paths = sorted(glob.glob(os.path.join(ROOT, 'uploads', '*')))
+    fixtures = []
+    for path in paths:
+        with open(path, 'rb') as f:
+            fixtures.append((os.path.basename(path), f.read()))
+    if not fixtures:
+        raise SystemExit("No audio fixtures found in uploads/")
+    return fixtures
+
+
+class Scenario:
+    """Per-worker request state shared by the scenario functions."""
+
+    def __init__(self, base_url: str, worker: int, args, fixtures):
+        self.base_url = base_url
+        self.args = args
+        self.fixtures = fixtures
+        self.http = requests.Session()
+        self.http.headers['X-Session-Id'] = f"loadtest-{worker}"
+        self.counter = itertools.count(1)
+
+
+def process_audio(s: Scenario) -> requests.Response:
+    name, data = random.choice(s.fixtures)
+    params = {'question_title': 'Two Sum'}
+    if not s.args.allow_cache:
+        params['no_cache'] = '1'
+    if s.args.stream:
+        params['stream'] = '1'
+    response = s.http.post(f"{s.base_url}/process_audio", params=params,
+                           files={'audio': (name, data)}, stream=s.args.stream, timeout=s.args.timeout)
+    # Read the whole body so streamed replies are timed to their last byte
+    _ = response.content
+    return response
+
+
+def text_to_speech(s: Scenario) -> requests.Response:
+    # A fresh line each time unless caching is being measured
+    suffix = '' if s.args.allow_cache else f" Test case {next(s.counter)}."
+    return s.http.post(f"{s.base_url}/text-to-speech",
+                       json={'text': f"Let's walk through an example.{suffix}"}, timeout=s.args.timeout)
+
+
+def save_code(s: Scenario) -> requests.Response:
+    return s.http.post(f"{s.base_url}/save-code",
+                       json={'code': SAMPLE_CODE + f"# revision {next(s.counter)}\n"}, timeout=s.args.timeout)
+
+
+def submit_interview(s: Scenario) -> requests.Response:
+    return s.http.post(f"{s.base_url}/submit-interview", json={}, timeout=s.args.timeout)
+
+
+SCENARIOS = {
+    'process_audio': process_audio,
+    'text-to-speech': text_to_speech,
+    'save-code': save_code,
+    'submit-interview': submit_interview,
+}
+
+
+def run_load(base_url: str, args) -> Dict:
+    """Drive the backend with args.concurrency workers; return the raw samples."""
+    weights = parse_mix(args.mix)
+    names, cumulative = list(weights), list(itertools.accumulate(weights.values()))
+    fixtures = load_audio_fixtures()
+    samples = defaultdict(list)  # scenario -> [(latency_s, ok, status)]
+    lock = threading.Lock()
+    budget = itertools.count(1)
+    deadline = time.perf_counter() + args.duration
+
+    def worker(index):
+        scenario = Scenario(base_url, index, args, fixtures)
+        while time.perf_counter() < deadline:
+            if args.requests and next(budget) > args.requests:
+                return
+            name = random.choices(names, cum_weights=cumulative)[0]
+            start = time.perf_counter()
+            try:
+                response = SCENARIOS[name](scenario)
+                status = response.status_code
+                ok = 200 <= status < 300
+            except requests.exceptions.RequestException as e:
+                status, ok = type(e).__name__, False
+            with lock:
+                samples[name].append((time.perf_counter() - start, ok, status))
+
+    threads = [threading.Thread(target=worker, args=(i,), daemon=True) for i in range(args.concurrency)]
+    started = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return {'elapsed': time.perf_counter() - started, 'samples': samples}
+
+
+def summarize(result: Dict) -> Dict:
+    elapsed = result['elapsed']
+
+    def stats(entries):
+        latencies = sorted(latency * 1000 for latency, _, _ in entries)
+        errors = [status for _, ok, status in entries if not ok]
+        by_status = defaultdict(int)
+        for status in errors:
+            by_status[str(status)] += 1
+        return {
+            'requests': len(entries),
+            'errors': len(errors),
+            'error_rate': round(len(errors) / len(entries), 4) if entries else 0.0,
+            'throughput_rps': round(len(entries) / elapsed, 2) if elapsed else 0.0,
+            'p50_ms': round(percentile(latencies, 50), 1),
+            'p95_ms': round(percentile(latencies, 95), 1),
+            'p99_ms': round(percentile(latencies, 99), 1),
+            'max_ms': round(latencies[-1], 1) if latencies else 0.0,
+            'error_statuses': dict(by_status),
+        }
+
+    report = {name: stats(entries) for name, entries in sorted(result['samples'].items())}
+    report['total'] = stats([entry for entries in result['samples'].values() for entry in entries])
+    return {'elapsed_s': round(elapsed, 2), 'endpoints': report}
+
+
+def print_report(summary: Dict, stub_stats: Dict = None):
+    print(f"\n=== Load test ({summary['elapsed_s']}s) ===")
+    header = f"{'endpoint':<18}{'reqs':>7}{'rps':>9}{'err%':>8}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}"
+    print(header)
+    print('-' * len(header))
+    for name, s in summary['endpoints'].items():
+        print(f"{name:<18}{s['requests']:>7}{s['throughput_rps']:>9}{s['error_rate'] * 100:>7.1f}%"
+              f"{s['p50_ms']:>10}{s['p95_ms']:>10}{s['p99_ms']:>10}{s['max_ms']:>10}")
+        if s['error_statuses'] and name != 'total':
+            print(f"{'':<18}errors: {s['error_statuses']}")
+    if stub_stats:
+        print(f"\nProvider stand-ins: {stub_stats}")
+
+
+def start_backend(stubs: ProviderStubs, args, workdir: str):
+    """Point app.py at the stand-ins and serve it on a free local port.
+
+    Caches and journals go under workdir, which the caller removes afterwards.
+    """
+    os.environ.update({
+        'ELEVENLABS_BASE_URL': stubs.base_url,
+        'ELEVENLABS_API_KEY': 'stub-key',
+        'VOICE_ID': 'stub-voice',
+        'GEMINI_API_KEY': 'stub-key',
+        'GEMINI_API_ENDPOINT': stubs.base_url,
+        'TTS_CACHE_DIR': os.path.join(workdir, 'tts_cache'),
+        'JOURNAL_DIR': os.path.join(workdir, 'conversation_logs'),
+        'LOG_LEVEL': os.environ.get('LOG_LEVEL', 'WARNING'),
+    })
+    from werkzeug.serving import make_server
+    import app as backend
+
+    # Werkzeug pins its own logger to INFO; one access line per request drowns the report
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)
+
+    server = make_server('127.0.0.1', 0, backend.app, threaded=True)
+    threading.Thread(target=server.serve_forever, name='loadtest-backend', daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_port}"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients')
+    parser.add_argument('--duration', type=float, default=20, help='Seconds to run')
+    parser.add_argument('--requests', type=int, default=0, help='Stop after this many requests (0 = no limit)')
+    parser.add_argument('--mix', default=DEFAULT_MIX, help='Scenario weights, e.g. "process_audio=3,save-code=1"')
+    parser.add_argument('--stream', action='store_true', help='Use the streaming /process_audio mode')
+    parser.add_argument('--allow-cache', action='store_true', help='Let hint/TTS caches absorb repeated requests')
+    parser.add_argument('--timeout', type=float, default=60, help='Per-request timeout in seconds')
+    parser.add_argument('--target', help='Drive an already running backend instead of starting one')
+    parser.add_argument('--stt-latency', type=float, default=300, help='Stub speech-to-text latency (ms)')
+    parser.add_argument('--tts-latency', type=float, default=250, help='Stub text-to-speech latency (ms)')
+    parser.add_argument('--llm-latency', type=float, default=700, help='Stub Gemini latency (ms)')
+    parser.add_argument('--jitter', type=float, default=50, help='Uniform +/- jitter on every stub call (ms)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of stub calls that fail')
+    parser.add_argument('--error-status', type=int, default=503, help='Status returned by failed stub calls')
+    parser.add_argument('--json', help='Also write the report to this file')
+    args = parser.parse_args(argv)
+
+    stubs = server = workdir = None
+    try:
+        if args.target:
+            base_url = args.target.rstrip('/')
+        else:
+            profile = lambda latency: {'latency_ms': latency, 'jitter_ms': args.jitter,
+                                       'error_rate': args.error_rate, 'error_status': args.error_status}
+            fixture = os.path.join(ROOT, 'response.mp3')
+            tts_audio = open(fixture, 'rb').read() if os.path.exists(fixture) else b''
+            stubs = ProviderStubs({'stt': profile(args.stt_latency), 'tts': profile(args.tts_latency),
+                                   'llm': profile(args.llm_latency)}, tts_audio=tts_audio)
+            stubs.start()
+            workdir = tempfile.TemporaryDirectory(prefix='loadtest-', ignore_cleanup_errors=True)
+            server, base_url = start_backend(stubs, args, workdir.name)
+
+        print(f"Driving {base_url} with {args.concurrency} clients for {args.duration}s (mix: {args.mix})")
+        summary = summarize(run_load(base_url, args))
+        stub_stats = stubs.get_stats() if stubs else None
+        print_report(summary, stub_stats)
+    finally:
+        if server is not None:
+            server.shutdown()
+        if stubs is not None:
+            stubs.stop()
+        if workdir is not None:
+            workdir.cleanup()
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'config': vars(args), **summary, 'provider_stubs': stub_stats}, f, indent=2)
+        print(f"\nReport written to {args.json}")
+    return 0 if summary['endpoints']['total']['requests'] else 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,187 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Tuple
+
+# Latency buckets in seconds, from cache hits up to slow provider calls
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labelnames: Tuple[str, ...], labels: Dict) -> Tuple:
+    return tuple(str(labels.get(name, '')) for name in labelnames)
+
+
+def _format_labels(labelnames: Tuple[str, ...], values: Tuple, extra: str = '') -> str:
+    pairs = [f'{name}="{value}"' for name, value in zip(labelnames, values)]
+    if extra:
+        pairs.append(extra)
+    return '{' + ','.join(pairs) + '}' if pairs else ''
+
+
+class Counter:
+    """Monotonically increasing count, optionally split by labels."""
+
+    type = 'counter'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values = {}
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self) -> List[str]:
+        with self._lock:
+            return [f"{self.name}{_format_labels(self.labelnames, key)} {value}"
+                    for key, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Value that can go up and down (e.g. turns in flight)."""
+
+    type = 'gauge'
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        with self._lock:
+            self._values[key] = value
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(_label_key(self.labelnames, labels), 0.0)
+
+
+class Histogram:
+    """Cumulative-bucket histogram in the Prometheus layout.
+
+    p50/p99 are derived on the Prometheus side with histogram_quantile().
+    """
+
+    type = 'histogram'
+
+    def __init__(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                 buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._series = {}  # label values -> [bucket counts..., sum, count]
+
+    def observe(self, value: float, **labels):
+        key = _label_key(self.labelnames, labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.setdefault(key, [0] * len(self.buckets) + [0.0, 0])
+            if index < len(self.buckets):
+                series[index] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe how long the block took, in seconds."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+    def samples(self) -> List[str]:
+        lines = []
+        with self._lock:
+            for key, series in sorted(self._series.items()):
+                cumulative = 0
+                for bound, count in zip(self.buckets, series):
+                    cumulative += count
+                    le = _format_labels(self.labelnames, key, 'le="%s"' % bound)
+                    lines.append(f"{self.name}_bucket{le} {cumulative}")
+                le = _format_labels(self.labelnames, key, 'le="+Inf"')
+                lines.append(f"{self.name}_bucket{le} {series[-1]}")
+                lines.append(f"{self.name}_sum{_format_labels(self.labelnames, key)} {series[-2]}")
+                lines.append(f"{self.name}_count{_format_labels(self.labelnames, key)} {series[-1]}")
+        return lines
+
+
+class Registry:
+    """Holds every metric and renders them in the Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._metrics = {}
+
+    def _register(self, metric):
+        with self._lock:
+            existing = self._metrics.get(metric.name)
+            if existing is not None:
+                return existing
+            self._metrics[metric.name] = metric
+            return metric
+
+    def counter(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def gauge(self, name: str, documentation: str, labelnames: Tuple[str, ...] = ()) -> Gauge:
+        return self._register(Gauge(name, documentation, labelnames))
+
+    def histogram(self, name: str, documentation: str, labelnames: Tuple[str, ...] = (),
+                  buckets: Tuple[float, ...] = DEFAULT_BUCKETS) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, buckets))
+
+    def render(self) -> str:
+        with self._lock:
+            metrics = list(self._metrics.values())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            lines.extend(metric.samples())
+        return '\n'.join(lines) + '\n'
+
+
+# Process-wide registry served at /metrics
+REGISTRY = Registry()
+
+# Shared metrics for the voice pipeline and its providers
+STAGE_SECONDS = REGISTRY.histogram(
+    'voice_turn_stage_seconds', 'Duration of each stage of a voice turn', ('stage',))
+TURN_SECONDS = REGISTRY.histogram(
+    'voice_turn_seconds', 'End-to-end duration of a voice turn', ('mode',))
+PROVIDER_SECONDS = REGISTRY.histogram(
+    'provider_request_seconds', 'Latency of provider HTTP calls', ('provider', 'endpoint'))
+PROVIDER_ERRORS = REGISTRY.counter(
+    'provider_errors_total', 'Provider calls that failed or returned an error status',
+    ('provider', 'endpoint', 'reason'))
+PROVIDER_RETRIES = REGISTRY.counter(
+    'provider_retries_total', 'Provider calls retried after a transient failure', ('provider', 'endpoint'))
+LLM_SECONDS = REGISTRY.histogram(
+    'llm_request_seconds', 'Latency of successful LLM calls', ('model',))
+LLM_ERRORS = REGISTRY.counter(
+    'llm_errors_total', 'LLM calls that failed', ('model',))
+LLM_FALLBACKS = REGISTRY.counter(
+    'llm_fallbacks_total', 'Times a failing model handed the call to the next one in the chain', ('from_model',))
+TURNS_IN_FLIGHT = REGISTRY.gauge(
+    'voice_turns_in_flight', 'Voice turns admitted whose response has not finished sending')
+TURNS_QUEUED = REGISTRY.gauge(
+    'voice_turns_queued', 'Voice turns waiting for a scheduler slot')
+TURN_QUEUE_WAIT = REGISTRY.histogram(
+    'voice_turn_queue_wait_seconds', 'Time a voice turn waited for a scheduler slot')
+TURNS_REJECTED = REGISTRY.counter(
+    'voice_turns_rejected_total', 'Voice turns refused by admission control', ('reason',))
+SINGLE_FLIGHT_SHARED = REGISTRY.counter(
+    'single_flight_shared_total', 'Calls answered by an identical call already in flight', ('flight',))
+EMOTION_BATCH_FRAMES = REGISTRY.histogram(
+    'emotion_batch_frames', 'Frames classified per emotion model call', buckets=(1, 2, 4, 8, 16, 32))
+EMOTION_BATCH_SECONDS = REGISTRY.histogram(
+    'emotion_batch_seconds', 'Duration of one batched emotion model call')
+EMOTION_FRAMES_REUSED = REGISTRY.counter(
+    'emotion_frames_reused_total', 'Tracker updates that reused the last emotion result for an unchanged frame')
@@ -0,0 +1,318 @@
+"""Opt-in profiling for the Flask backends.
+
+Per request: with PROFILE_REQUESTS=1, a request carrying an X-Profile header
+(or ?profile=) runs under a profiler, and the result is written to PROFILE_DIR:
+
+    X-Profile: sample    wall-clock stack sampler -> <name>.folded
+    X-Profile: cprofile  deterministic cProfile of the request thread -> <name>.prof
+
+Folded stacks load directly into flamegraph.pl, speedscope or inferno;
+.prof files open in snakeviz or flameprof. The file name is returned in the
+X-Profile-File response header. If PROFILE_TOKEN is set, the request must
+also send it as X-Profile-Token (or ?profile_token=).
+
+Process-wide: PROFILE_BACKGROUND=1 (or SIGUSR2 to toggle at runtime)
+continuously samples the threads named in PROFILE_THREADS (the health
+tracker update loops by default) into background-<pid>.folded.
+"""
+import contextvars
+import cProfile
+import hmac
+import logging
+import os
+import signal
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Iterable, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_DIR = os.getenv("PROFILE_DIR", "profiles")
+PROFILE_INTERVAL = float(os.getenv("PROFILE_INTERVAL_MS", 5)) / 1000
+PROFILE_MAX_SECONDS = float(os.getenv("PROFILE_MAX_SECONDS", 120))
+PROFILE_THREADS = tuple(p.strip() for p in os.getenv("PROFILE_THREADS", "health-tracker").split(',') if p.strip())
+
+MODES = {'sample': '.folded', 'cprofile': '.prof'}
+
+# The request profile (if any) that work started on behalf of this context belongs to
+_active_profile = contextvars.ContextVar('active_profile', default=None)
+
+_background = None
+
+
+class StackSampler:
+    """Samples Python stacks of selected threads and counts them in folded form.
+
+    Threads are selected by ident (add_thread) or by name prefix. Each sample
+    walks sys._current_frames(), so the profiled code runs unmodified and
+    time spent blocked on I/O shows up as well as CPU time.
+    """
+
+    def __init__(self, interval: float = PROFILE_INTERVAL, name_prefixes: Iterable[str] = (),
+                 max_seconds: Optional[float] = None, on_tick=None):
+        """
+        Args:
+            interval: Seconds between samples
+            name_prefixes: Also sample any thread whose name starts with one of these
+            max_seconds: Stop sampling on its own after this long (None for no limit)
+            on_tick: Called from the sampler thread after every sample
+        """
+        self.interval = interval
+        self.name_prefixes = tuple(name_prefixes)
+        self.max_seconds = max_seconds
+        self.on_tick = on_tick
+        self.samples = 0
+        self._lock = threading.Lock()
+        self._stacks = Counter()
+        self._threads = Counter()  # ident -> how many holders asked for it
+        self._stop = threading.Event()
+        self._thread = None
+
+    def add_thread(self, ident: int):
+        with self._lock:
+            self._threads[ident] += 1
+
+    def remove_thread(self, ident: int):
+        with self._lock:
+            self._threads[ident] -= 1
+            if self._threads[ident] <= 0:
+                del self._threads[ident]
+
+    def start(self) -> 'StackSampler':
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name='profiler-sampler', daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> 'StackSampler':
+        self._stop.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=1.0)
+        return self
+
+    @property
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive() and not self._stop.is_set()
+
+    def _run(self):
+        deadline = time.monotonic() + self.max_seconds if self.max_seconds else None
+        while not self._stop.wait(self.interval):
+            self.sample_once()
+            if self.on_tick:
+                self.on_tick()
+            if deadline and time.monotonic() > deadline:
+                logger.warning("Profiler stopped after %.0fs without being closed", self.max_seconds)
+                break
+
+    def sample_once(self):
+        names = {t.ident: t.name for t in threading.enumerate()}
+        own = threading.get_ident()
+        with self._lock:
+            wanted = set(self._threads)
+        if self.name_prefixes:
+            wanted.update(ident for ident, name in names.items() if name.startswith(self.name_prefixes))
+        wanted.discard(own)
+
+        frames = sys._current_frames()
+        stacks = []
+        for ident in wanted:
+            frame = frames.get(ident)
+            if frame is None:
+                continue
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                frame = frame.f_back
+            stack.append(names.get(ident, str(ident)))
+            stacks.append(';'.join(reversed(stack)))
+        with self._lock:
+            self._stacks.update(stacks)
+            self.samples += 1
+
+    def folded(self) -> str:
+        """Brendan Gregg's folded format: one "frame;frame;frame count" line per stack."""
+        with self._lock:
+            return ''.join(f"{stack} {count}\n" for stack, count in self._stacks.most_common())
+
+    def write(self, path: str) -> str:
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            f.write(self.folded())
+        os.replace(tmp_path, path)
+        return path
+
+
+class RequestProfile:
+    """One profiled request: started on the request thread, written when it closes."""
+
+    def __init__(self, label: str, mode: str = 'sample', directory: str = PROFILE_DIR):
+        """
+        Args:
+            label: Identifies the request in the file name (e.g. request id and endpoint)
+            mode: 'sample' (folded stacks) or 'cprofile' (pstats dump)
+            directory: Where the profile is written
+        """
+        self.mode = mode
+        stamp = datetime.now().strftime('%Y%m%d-%H%M%S')
+        safe_label = ''.join(c if c.isalnum() or c in '-_' else '_' for c in label)[:80]
+        self.path = os.path.join(directory, f"{stamp}-{safe_label}{MODES[mode]}")
+        self.sampler = None
+        self.profiler = None
+        self._started = None
+        self._token = None
+
+    def start(self) -> 'RequestProfile':
+        self._started = time.perf_counter()
+        if self.mode == 'cprofile':
+            self.profiler = cProfile.Profile()
+            self.profiler.enable()
+        else:
+            self.sampler = StackSampler(max_seconds=PROFILE_MAX_SECONDS)
+            self.sampler.add_thread(threading.get_ident())
+            self.sampler.start()
+        self._token = _active_profile.set(self)
+        return self
+
+    def stop(self) -> Optional[str]:
+        """Stop profiling and write the file; returns its path, or None on error."""
+        try:
+            if self.profiler is not None:
+                self.profiler.disable()
+                os.makedirs(os.path.dirname(self.path) or '.', exist_ok=True)
+                self.profiler.dump_stats(self.path)
+            elif self.sampler is not None:
+                self.sampler.stop().write(self.path)
+        except Exception as e:
+            logger.error("Error writing profile %s: %s", self.path, e)
+            return None
+        finally:
+            try:
+                _active_profile.reset(self._token)
+            except ValueError:
+                pass  # closed from a different context than it was started in
+        logger.info("Profile written", extra={'profile': self.path, 'mode': self.mode,
+                                              'elapsed_ms': round((time.perf_counter() - self._started) * 1000, 1)})
+        return self.path
+
+
+@contextmanager
+def track_thread():
+    """Include the calling thread in the active request profile while the block runs.
+
+    Work handed to other threads with contextvars.copy_context() (voice turn
+    stages, background pumps) calls this so the request's profile covers it.
+    Does nothing when the request isn't being profiled.
+    """
+    profile = _active_profile.get()
+    sampler = profile.sampler if profile is not None else None
+    if sampler is None or not sampler.running:
+        yield
+        return
+    ident = threading.get_ident()
+    sampler.add_thread(ident)
+    try:
+        yield
+    finally:
+        sampler.remove_thread(ident)
+
+
+def requested_mode(*flags) -> Optional[str]:
+    """Profiler mode asked for by a header/query value ('1'/'true' mean 'sample')."""
+    for flag in flags:
+        flag = (flag or '').strip().lower()
+        if flag in MODES:
+            return flag
+        if flag in ('1', 'true', 'yes'):
+            return 'sample'
+    return None
+
+
+def start_background(directory: str = PROFILE_DIR, name_prefixes: Iterable[str] = PROFILE_THREADS,
+                     flush_interval: float = 30.0) -> StackSampler:
+    """Continuously sample the named threads, rewriting background-<pid>.folded as it goes."""
+    global _background
+    if _background is not None and _background.running:
+        return _background
+
+    path = os.path.join(directory, f"background-{os.getpid()}.folded")
+    last_flush = [time.monotonic()]
+
+    def flush_periodically():
+        if time.monotonic() - last_flush[0] >= flush_interval:
+            last_flush[0] = time.monotonic()
+            _background.write(path)
+
+    _background = StackSampler(interval=max(PROFILE_INTERVAL, 0.01), name_prefixes=name_prefixes,
+                               on_tick=flush_periodically)
+    _background.path = path
+    _background.start()
+    logger.info("Background profiling started", extra={'threads': list(name_prefixes), 'profile': path})
+    return _background
+
+
+def stop_background() -> Optional[str]:
+    global _background
+    if _background is None:
+        return None
+    sampler, _background = _background, None
+    path = sampler.stop().write(sampler.path)
+    logger.info("Background profiling stopped", extra={'profile': path, 'samples': sampler.samples})
+    return path
+
+
+def toggle_background(*_args):
+    """Start background sampling, or stop it and write the profile (SIGUSR2 handler)."""
+    if _background is not None and _background.running:
+        stop_background()
+    else:
+        start_background()
+
+
+def init_app(app, directory: str = PROFILE_DIR):
+    """Wire profiling into a Flask app according to the PROFILE_* settings.
+
+    Register after any hook that assigns the request id, so profiles are
+    named after it.
+    """
+    from flask import g, request
+    from log_pipeline import get_request_id, new_request_id
+
+    if os.getenv("PROFILE_BACKGROUND", "0") == "1":
+        start_background(directory)
+    if hasattr(signal, 'SIGUSR2') and threading.current_thread() is threading.main_thread():
+        signal.signal(signal.SIGUSR2, toggle_background)
+
+    if os.getenv("PROFILE_REQUESTS", "0") != "1":
+        return
+    token = os.getenv("PROFILE_TOKEN")
+
+    @app.before_request
+    def start_request_profile():
+        mode = requested_mode(request.headers.get('X-Profile'), request.args.get('profile'))
+        if not mode:
+            return
+        if token and not hmac.compare_digest(
+                token, request.headers.get('X-Profile-Token') or request.args.get('profile_token') or ''):
+            logger.warning("Profiling requested without a valid token")
+            return
+        request_id = get_request_id()
+        if request_id == '-':
+            request_id = new_request_id(request.headers.get('X-Request-Id'))
+        g.request_profile = RequestProfile(f"{request_id}-{request.endpoint}", mode, directory).start()
+
+    @app.after_request
+    def finish_request_profile(response):
+        profile = g.pop('request_profile', None)
+        if profile is not None:
+            # Close callbacks only run once the body (including a stream) has been sent,
+            # which send_file's passthrough would otherwise skip
+            response.direct_passthrough = False
+            response.headers['X-Profile-File'] = os.path.basename(profile.path)
+            response.call_on_close(profile.stop)
+        return response
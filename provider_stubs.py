@@ -0,0 +1,167 @@
+"""Local stand-ins for the ElevenLabs and Gemini APIs, for load tests.
+
+One HTTP server answers the routes app.py calls:
+
+    POST /v1/speech-to-text                          (ElevenLabs STT)
+    POST /v1/text-to-speech/<voice>[/stream]         (ElevenLabs TTS)
+    POST /v1beta/models/<model>:generateContent      (Gemini, REST transport)
+    POST /v1beta/models/<model>:streamGenerateContent
+
+Each route family ('stt', 'tts', 'llm') has its own latency, jitter and
+error rate, so provider slowness and failures can be reproduced without a
+network or quota. Point the backend at it with ELEVENLABS_BASE_URL and
+GEMINI_API_ENDPOINT.
+"""
+import itertools
+import json
+import random
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional
+
+DEFAULT_PROFILE = {'latency_ms': 0.0, 'jitter_ms': 0.0, 'error_rate': 0.0, 'error_status': 503}
+
+STUB_REPLY = ("That's a reasonable start. What is the time complexity of that approach? "
+              "Think about what happens with duplicate values.")
+
+
+class ProviderStubs:
+    """Threaded HTTP server imitating the providers with configurable behaviour."""
+
+    def __init__(self, profiles: Optional[Dict[str, Dict]] = None, tts_audio: bytes = b'',
+                 host: str = '127.0.0.1', port: int = 0, chunk_size: int = 4096):
+        """
+        Args:
+            profiles: Per route family ('stt', 'tts', 'llm'): latency_ms, jitter_ms,
+                error_rate (0-1) and error_status
+            tts_audio: MP3 bytes returned for every synthesis
+            host: Interface to bind
+            port: Port to bind (0 picks a free one)
+            chunk_size: Bytes per chunk on the streaming TTS route
+        """
+        self.profiles = {name: {**DEFAULT_PROFILE, **(profiles or {}).get(name, {})}
+                         for name in ('stt', 'tts', 'llm')}
+        self.tts_audio = tts_audio or b'\xff\xfb\x90\x00' * 256
+        self.chunk_size = chunk_size
+        self._counter = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stats = {name: {'requests': 0, 'injected_errors': 0} for name in self.profiles}
+        self.server = ThreadingHTTPServer((host, port), self._handler_class())
+        self.server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self.server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> str:
+        self._thread = threading.Thread(target=self.server.serve_forever, name='provider-stubs', daemon=True)
+        self._thread.start()
+        return self.base_url
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {name: dict(stats) for name, stats in self._stats.items()}
+
+    def _admit(self, route: str) -> Optional[int]:
+        """Sleep for the route's latency; return an error status to inject, if any."""
+        profile = self.profiles[route]
+        delay = profile['latency_ms'] + random.uniform(-1, 1) * profile['jitter_ms']
+        if delay > 0:
+            time.sleep(delay / 1000)
+        failed = random.random() < profile['error_rate']
+        with self._lock:
+            self._stats[route]['requests'] += 1
+            if failed:
+                self._stats[route]['injected_errors'] += 1
+        return profile['error_status'] if failed else None
+
+    def _handler_class(self):
+        stubs = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def _send(self, status, body: bytes, content_type='application/json'):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def _send_json(self, status, payload):
+                self._send(status, json.dumps(payload).encode())
+
+            def _send_error(self, status):
+                self._send_json(status, {'error': {'code': status, 'message': 'Injected stub failure',
+                                                   'status': 'UNAVAILABLE'}})
+
+            def do_HEAD(self):
+                # Connection warm-up (ProviderClient.warm)
+                self.send_response(200)
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+
+            def do_POST(self):
+                length = int(self.headers.get('Content-Length', 0))
+                if length:
+                    self.rfile.read(length)
+                path = self.path.split('?', 1)[0]
+
+                if path == '/v1/speech-to-text':
+                    route = 'stt'
+                elif path.startswith('/v1/text-to-speech/'):
+                    route = 'tts'
+                elif path.startswith('/v1beta/models/'):
+                    route = 'llm'
+                else:
+                    return self._send_json(404, {'error': f'No stub for {path}'})
+
+                error_status = stubs._admit(route)
+                if error_status:
+                    return self._send_error(error_status)
+
+                n = next(stubs._counter)
+                if route == 'stt':
+                    # Unique per request so the hint cache doesn't absorb the load
+                    return self._send_json(200, {'text': f"I would use a hash map here, attempt {n}"})
+                if route == 'tts':
+                    if path.endswith('/stream'):
+                        return self._stream_audio()
+                    return self._send(200, stubs.tts_audio, 'audio/mpeg')
+                return self._generate(n, stream=':streamGenerateContent' in path)
+
+            def _stream_audio(self):
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/mpeg')
+                self.send_header('Transfer-Encoding', 'chunked')
+                self.end_headers()
+                audio = stubs.tts_audio
+                for i in range(0, len(audio), stubs.chunk_size):
+                    chunk = audio[i:i + stubs.chunk_size]
+                    self.wfile.write(f"{len(chunk):X}\r\n".encode() + chunk + b"\r\n")
+                self.wfile.write(b"0\r\n\r\n")
+
+            def _generate(self, n, stream):
+                def candidate(text):
+                    return {'candidates': [{'content': {'parts': [{'text': text}], 'role': 'model'},
+                                            'finishReason': 'STOP', 'index': 0}]}
+
+                reply = f"{STUB_REPLY} ({n})"
+                if not stream:
+                    return self._send_json(200, candidate(reply))
+                # The REST transport reads a streamed JSON array of responses
+                pieces = re.split(r'(?<=[.?!] )', reply)
+                self._send_json(200, [candidate(piece) for piece in pieces])
+
+        return Handler
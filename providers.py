@@ -0,0 +1,326 @@
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Callable, Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from metrics import PROVIDER_ERRORS, PROVIDER_RETRIES, PROVIDER_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Responses worth retrying: throttling and transient upstream failures
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+# Methods safe to resend after the request may already have reached the provider
+IDEMPOTENT_METHODS = {'GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE'}
+
+
+def _release_on_close(response, release: Callable[[], None]):
+    """Make response.close() also release the concurrency slot the response holds (once)."""
+    close = response.close
+    released = False
+
+    def close_and_release():
+        nonlocal released
+        try:
+            close()
+        finally:
+            if not released:
+                released = True
+                release()
+    response.close = close_and_release
+
+
+def _release_on_aclose(response, release: Callable[[], None]):
+    """Async counterpart of _release_on_close for httpx responses."""
+    aclose = response.aclose
+    released = False
+
+    async def aclose_and_release():
+        nonlocal released
+        try:
+            await aclose()
+        finally:
+            if not released:
+                released = True
+                release()
+    response.aclose = aclose_and_release
+
+
+class ProviderClient:
+    """Keep-alive HTTP client shared by every call to one provider.
+
+    All requests go through a single pooled requests.Session, so consecutive
+    turns reuse the same TCP+TLS connection instead of paying a fresh
+    handshake. Each logical endpoint ("stt", "tts", ...) gets its own
+    concurrency limit (held until a streamed body is closed), every call has
+    a timeout, and throttled or transient failures are retried a bounded
+    number of times with exponential backoff. Read timeouts are only retried
+    for idempotent methods: a POST that timed out may already be running.
+    """
+
+    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None,
+                 limits: Optional[Dict[str, int]] = None, pool_size: int = 20,
+                 timeout=(5, 30), max_retries: int = 2, backoff: float = 0.5,
+                 name: Optional[str] = None):
+        """
+        Args:
+            base_url: Scheme and host every path is resolved against
+            headers: Headers sent with every request (e.g. the API key)
+            limits: Max concurrent in-flight requests per endpoint name
+            pool_size: Number of keep-alive connections kept open
+            timeout: Default (connect, read) timeout in seconds
+            max_retries: Retries after the first attempt
+            backoff: Base delay in seconds, doubled on every retry
+            name: Provider label used in metrics (defaults to the host name)
+        """
+        self.base_url = base_url.rstrip('/')
+        self.name = name or urlparse(base_url).hostname
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff = backoff
+
+        self.session = requests.Session()
+        self.session.headers.update(headers or {})
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+
+        self._limits = {name: threading.BoundedSemaphore(n) for name, n in (limits or {}).items()}
+        self.last_used = 0.0
+
+    def _sleep_before_retry(self, attempt: int):
+        delay = self.backoff * (2 ** attempt)
+        time.sleep(delay + random.uniform(0, delay / 2))
+
+    def request(self, method: str, endpoint: str, path: str, **kwargs) -> requests.Response:
+        """Send a request, retrying connection errors and retryable statuses.
+
+        With stream=True the endpoint's concurrency slot stays taken until the
+        caller closes the response (use it as a context manager).
+
+        Args:
+            method: HTTP method
+            endpoint: Name of the concurrency limit to apply
+            path: Path appended to base_url
+            **kwargs: Passed through to requests.Session.request
+
+        Returns:
+            The final response (which may still be an error status)
+
+        Raises:
+            requests.exceptions.RequestException: if every attempt failed to connect,
+                or a non-idempotent request timed out waiting for the response
+        """
+        kwargs.setdefault('timeout', self.timeout)
+        url = f"{self.base_url}{path}"
+
+        semaphore = self._limits.get(endpoint)
+        if semaphore is None:
+            return self._send(method, endpoint, url, **kwargs)
+        semaphore.acquire()
+        try:
+            response = self._send(method, endpoint, url, **kwargs)
+        except BaseException:
+            semaphore.release()
+            raise
+        if kwargs.get('stream'):
+            _release_on_close(response, semaphore.release)
+        else:
+            semaphore.release()
+        return response
+
+    def _send(self, method: str, endpoint: str, url: str, **kwargs) -> requests.Response:
+        retry_read_timeouts = method.upper() in IDEMPOTENT_METHODS
+        with PROVIDER_SECONDS.time(provider=self.name, endpoint=endpoint):
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                try:
+                    response = self.session.request(method, url, **kwargs)
+                    self.last_used = time.monotonic()
+                except (requests.exceptions.ConnectionError, requests.exceptions.Timeout) as e:
+                    # ConnectTimeout is a ConnectionError; anything else timed out after sending
+                    sent = not isinstance(e, requests.exceptions.ConnectionError)
+                    if last_attempt or (sent and not retry_read_timeouts):
+                        PROVIDER_ERRORS.inc(provider=self.name, endpoint=endpoint, reason=type(e).__name__)
+                        raise
+                    logger.warning("%s request failed (%s), retrying...", endpoint, e)
+                    PROVIDER_RETRIES.inc(provider=self.name, endpoint=endpoint)
+                    self._sleep_before_retry(attempt)
+                    continue
+
+                if response.status_code in RETRY_STATUSES and not last_attempt:
+                    logger.warning("%s returned %s, retrying...", endpoint, response.status_code)
+                    PROVIDER_RETRIES.inc(provider=self.name, endpoint=endpoint)
+                    response.close()
+                    self._sleep_before_retry(attempt)
+                    continue
+                if response.status_code >= 400:
+                    PROVIDER_ERRORS.inc(provider=self.name, endpoint=endpoint, reason=response.status_code)
+                return response
+
+    def post(self, endpoint: str, path: str, **kwargs) -> requests.Response:
+        return self.request('POST', endpoint, path, **kwargs)
+
+    def warm(self, max_idle: float = 15.0) -> bool:
+        """Open (or refresh) a pooled connection ahead of the next real call.
+
+        Skipped when the pool was used within max_idle seconds, since its
+        connection is still alive.
+        """
+        if time.monotonic() - self.last_used < max_idle:
+            return True
+        try:
+            self.session.head(self.base_url, timeout=self.timeout).close()
+        except requests.exceptions.RequestException as e:
+            logger.warning("Could not warm connection to %s: %s", self.base_url, e)
+            return False
+        self.last_used = time.monotonic()
+        return True
+
+    def get_pool_stats(self, max_idle: float = 15.0) -> Dict:
+        """Keep-alive pool state for status pages.
+
+        The pool counts as connected while it holds an open idle connection
+        that was used within max_idle seconds (the window warm() trusts).
+        """
+        idle_connections = 0
+        adapter = self.session.get_adapter(self.base_url)
+        for key in list(adapter.poolmanager.pools.keys()):
+            pool = adapter.poolmanager.pools.get(key)
+            queue = getattr(pool, 'pool', None)
+            if queue is not None:
+                idle_connections += sum(1 for conn in list(queue.queue)
+                                        if conn is not None and getattr(conn, 'sock', None) is not None)
+        idle_seconds = time.monotonic() - self.last_used if self.last_used else None
+        return {
+            'connected': idle_connections > 0 and idle_seconds is not None and idle_seconds < max_idle,
+            'idle_connections': idle_connections,
+            'idle_seconds': round(idle_seconds, 1) if idle_seconds is not None else None
+        }
+
+
+class AsyncProviderClient:
+    """asyncio counterpart of ProviderClient for the ASGI server (asgi.py).
+
+    Same pooling, per-endpoint limits, timeouts and retry policy, but built
+    on httpx.AsyncClient so a request waiting on the provider holds no thread.
+    """
+
+    def __init__(self, base_url: str, headers: Optional[Dict[str, str]] = None,
+                 limits: Optional[Dict[str, int]] = None, pool_size: int = 20,
+                 timeout=(5, 30), max_retries: int = 2, backoff: float = 0.5,
+                 name: Optional[str] = None):
+        import httpx
+
+        self.name = name or urlparse(base_url).hostname
+        self._httpx = httpx
+        self.max_retries = max_retries
+        self.backoff = backoff
+        connect, read = timeout
+        self.client = httpx.AsyncClient(
+            base_url=base_url.rstrip('/'),
+            headers=headers or {},
+            timeout=httpx.Timeout(read, connect=connect),
+            limits=httpx.Limits(max_connections=pool_size, max_keepalive_connections=pool_size)
+        )
+        self._limit_sizes = dict(limits or {})
+        self._limits = {}
+        self.last_used = 0.0
+
+    def _limit(self, endpoint: str):
+        # asyncio primitives are created lazily so they bind to the running loop
+        if endpoint not in self._limits:
+            size = self._limit_sizes.get(endpoint)
+            self._limits[endpoint] = asyncio.Semaphore(size) if size else None
+        return self._limits[endpoint]
+
+    async def _sleep_before_retry(self, attempt: int):
+        delay = self.backoff * (2 ** attempt)
+        await asyncio.sleep(delay + random.uniform(0, delay / 2))
+
+    async def _send(self, endpoint: str, build_request, stream: bool):
+        with PROVIDER_SECONDS.time(provider=self.name, endpoint=endpoint):
+            for attempt in range(self.max_retries + 1):
+                last_attempt = attempt == self.max_retries
+                try:
+                    response = await self.client.send(build_request(), stream=stream)
+                    self.last_used = time.monotonic()
+                except (self._httpx.ConnectError, self._httpx.ConnectTimeout, self._httpx.PoolTimeout,
+                        self._httpx.ReadTimeout, self._httpx.WriteTimeout) as e:
+                    # Only POSTs come through here: resend only if the request never reached the provider
+                    sent = isinstance(e, (self._httpx.ReadTimeout, self._httpx.WriteTimeout))
+                    if last_attempt or sent:
+                        PROVIDER_ERRORS.inc(provider=self.name, endpoint=endpoint, reason=type(e).__name__)
+                        raise
+                    logger.warning("%s request failed (%s), retrying...", endpoint, e)
+                    PROVIDER_RETRIES.inc(provider=self.name, endpoint=endpoint)
+                    await self._sleep_before_retry(attempt)
+                    continue
+
+                if response.status_code in RETRY_STATUSES and not last_attempt:
+                    logger.warning("%s returned %s, retrying...", endpoint, response.status_code)
+                    PROVIDER_RETRIES.inc(provider=self.name, endpoint=endpoint)
+                    await response.aclose()
+                    await self._sleep_before_retry(attempt)
+                    continue
+                if response.status_code >= 400:
+                    PROVIDER_ERRORS.inc(provider=self.name, endpoint=endpoint, reason=response.status_code)
+                return response
+
+    async def post(self, endpoint: str, path: str, stream: bool = False, **kwargs):
+        """POST with retries. With stream=True the caller must aclose() the response,
+        which also frees the endpoint's concurrency slot.
+
+        Raises:
+            httpx.HTTPError: if every attempt failed to connect, or the request timed
+                out after it was sent
+        """
+        semaphore = self._limit(endpoint)
+        build_request = lambda: self.client.build_request('POST', path, **kwargs)
+        if semaphore is None:
+            return await self._send(endpoint, build_request, stream)
+        await semaphore.acquire()
+        try:
+            response = await self._send(endpoint, build_request, stream)
+        except BaseException:
+            semaphore.release()
+            raise
+        if stream:
+            _release_on_aclose(response, semaphore.release)
+        else:
+            semaphore.release()
+        return response
+
+    async def warm(self, max_idle: float = 15.0) -> bool:
+        """Async counterpart of ProviderClient.warm()."""
+        if time.monotonic() - self.last_used < max_idle:
+            return True
+        try:
+            await self.client.head('/')
+        except self._httpx.HTTPError as e:
+            logger.warning("Could not warm connection to %s: %s", self.client.base_url, e)
+            return False
+        self.last_used = time.monotonic()
+        return True
+
+    def get_pool_stats(self, max_idle: float = 15.0) -> Dict:
+        """Same shape as ProviderClient.get_pool_stats(), read from the httpx pool."""
+        pool = getattr(getattr(self.client, '_transport', None), '_pool', None)
+        connections = list(getattr(pool, 'connections', []))
+        idle_connections = sum(1 for conn in connections if conn.is_idle())
+        idle_seconds = time.monotonic() - self.last_used if self.last_used else None
+        return {
+            'connected': idle_connections > 0 and idle_seconds is not None and idle_seconds < max_idle,
+            'idle_connections': idle_connections,
+            'active_connections': len(connections) - idle_connections,
+            'idle_seconds': round(idle_seconds, 1) if idle_seconds is not None else None
+        }
+
+    async def aclose(self):
+        await self.client.aclose()
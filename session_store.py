@@ -0,0 +1,175 @@
+import json
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_SESSION = 'default'
+SESSION_ID_PATTERN = re.compile(r'^[A-Za-z0-9_-]{1,64}$')
+
+
+def resolve_session_id(*candidates) -> str:
+    """First well-formed id among candidates (header, query, body...), else 'default'."""
+    for candidate in candidates:
+        if candidate and SESSION_ID_PATTERN.match(str(candidate)):
+            return str(candidate)
+    return DEFAULT_SESSION
+
+
+class Session:
+    """Everything one candidate's interview needs."""
+
+    def __init__(self, session_id: str, journal=None, tracker=None):
+        self.session_id = session_id
+        self.code: Optional[str] = None
+        self.solving = False
+        self.analysis: Optional[Dict] = None
+        self.journal = journal
+        self.tracker = tracker
+        self.created = time.time()
+        self.last_seen = self.created
+
+
+class SessionRegistry:
+    """Live sessions keyed by id, bounded by count and idle time.
+
+    The least recently used session is evicted once max_sessions are live,
+    and sessions idle for longer than idle_ttl are swept on access. With a
+    spill_path, an evicted session's code and analysis are written to SQLite
+    and restored the next time its id is seen.
+    """
+
+    def __init__(self, journals=None, tracker_factory: Optional[Callable] = None,
+                 max_sessions: int = 256, idle_ttl: float = 3600, spill_path: Optional[str] = None,
+                 on_evict: Optional[Callable[[Session], None]] = None):
+        """
+        Args:
+            journals: JournalManager providing each session's conversation journal
+            tracker_factory: Returns the health tracker handle for a new session
+            max_sessions: Live sessions kept in memory
+            idle_ttl: Seconds without a request before a session is evicted
+            spill_path: SQLite file for evicted sessions (None to drop them)
+            on_evict: Called with each evicted session, after the registry lock is released
+        """
+        self.journals = journals
+        self.tracker_factory = tracker_factory
+        self.max_sessions = max_sessions
+        self.idle_ttl = idle_ttl
+        self.on_evict = on_evict
+        self._lock = threading.RLock()
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._evicted: List[Session] = []  # waiting for on_evict, which runs outside the lock
+        self._last_sweep = time.monotonic()
+        self._stats = {'created': 0, 'evicted': 0, 'spilled': 0, 'restored': 0}
+
+        self._db = None
+        if spill_path:
+            self._db = sqlite3.connect(spill_path, check_same_thread=False)
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sessions ("
+                "session_id TEXT PRIMARY KEY, code TEXT, analysis TEXT, updated REAL)"
+            )
+            self._db.commit()
+
+    def get(self, session_id: str = DEFAULT_SESSION) -> Session:
+        """Return the live session, restoring or creating it as needed."""
+        with self._lock:
+            self._sweep_idle()
+            session = self._sessions.get(session_id)
+            if session is None:
+                session = self._create(session_id)
+            else:
+                self._sessions.move_to_end(session_id)
+            session.last_seen = time.time()
+            evicted, self._evicted = self._evicted, []
+        # The hook may be slow (stopping the camera joins threads); don't block other lookups on it
+        for old in evicted:
+            self._notify_evicted(old)
+        return session
+
+    def __contains__(self, session_id: str) -> bool:
+        return session_id in self._sessions
+
+    def any_solving(self) -> bool:
+        with self._lock:
+            return any(s.solving for s in self._sessions.values())
+
+    def _create(self, session_id: str) -> Session:
+        spilled = self._restore(session_id)
+        journal = self.journals.get(session_id, resume=spilled is not None) if self.journals else None
+        tracker = self.tracker_factory() if self.tracker_factory else None
+        session = Session(session_id, journal=journal, tracker=tracker)
+        if spilled is not None:
+            session.code, session.analysis = spilled
+            self._stats['restored'] += 1
+        self._stats['created'] += 1
+
+        self._sessions[session_id] = session
+        while len(self._sessions) > self.max_sessions:
+            self._evict(next(iter(self._sessions)))
+        return session
+
+    def _sweep_idle(self):
+        now = time.monotonic()
+        if now - self._last_sweep < min(self.idle_ttl, 60):
+            return
+        self._last_sweep = now
+        cutoff = time.time() - self.idle_ttl
+        for session_id in [sid for sid, s in self._sessions.items() if s.last_seen < cutoff]:
+            self._evict(session_id)
+
+    def _evict(self, session_id: str):
+        session = self._sessions.pop(session_id)
+        self._stats['evicted'] += 1
+        session.solving = False
+        self._spill(session)
+        if self.journals:
+            self.journals.close(session_id)
+        if self.on_evict:
+            self._evicted.append(session)
+
+    def _notify_evicted(self, session: Session):
+        try:
+            self.on_evict(session)
+        except Exception as e:
+            logger.error("Error in session eviction hook: %s", e)
+
+    def _spill(self, session: Session):
+        if self._db is None or (session.code is None and session.analysis is None):
+            return
+        try:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sessions (session_id, code, analysis, updated) VALUES (?, ?, ?, ?)",
+                (session.session_id, session.code,
+                 json.dumps(session.analysis) if session.analysis is not None else None, time.time())
+            )
+            self._db.commit()
+            self._stats['spilled'] += 1
+        except sqlite3.Error as e:
+            logger.error("Error spilling session %s: %s", session.session_id, e)
+
+    def _restore(self, session_id: str):
+        if self._db is None:
+            return None
+        try:
+            row = self._db.execute(
+                "SELECT code, analysis FROM sessions WHERE session_id = ?", (session_id,)).fetchone()
+            if row is None:
+                return None
+            self._db.execute("DELETE FROM sessions WHERE session_id = ?", (session_id,))
+            self._db.commit()
+        except sqlite3.Error as e:
+            logger.error("Error restoring session %s: %s", session_id, e)
+            return None
+        code, analysis = row
+        return code, json.loads(analysis) if analysis else None
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'live': len(self._sessions),
+                    'solving': sum(1 for s in self._sessions.values() if s.solving)}
@@ -0,0 +1,113 @@
+import asyncio
+import hashlib
+import threading
+from typing import Any, Awaitable, Callable, Dict
+
+from metrics import SINGLE_FLIGHT_SHARED
+
+
+def flight_key(*parts) -> str:
+    """Stable key for a call: hash of its payload parts (text, code, session id...)."""
+    digest = hashlib.sha256()
+    for part in parts:
+        digest.update(str(part).encode('utf-8'))
+        digest.update(b'\x00')
+    return digest.hexdigest()
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Coalesces identical concurrent calls into one execution.
+
+    The first caller for a key runs the function; callers that arrive with
+    the same key while it is running wait and receive the same result (or
+    the same exception). Nothing is kept once the call finishes, so this
+    complements the result caches rather than replacing them.
+    """
+
+    def __init__(self, name: str):
+        """
+        Args:
+            name: Label for metrics and stats (e.g. "tts")
+        """
+        self.name = name
+        self._lock = threading.Lock()
+        self._calls: Dict[str, _Call] = {}
+        self._async_calls: Dict[str, asyncio.Future] = {}
+        self._stats = {'calls': 0, 'executed': 0, 'shared': 0}
+
+    def do(self, key: str, fn: Callable, *args, **kwargs) -> Any:
+        """Run fn(*args, **kwargs) unless an identical call is already in flight."""
+        with self._lock:
+            self._stats['calls'] += 1
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self._stats['executed'] += 1
+            else:
+                self._stats['shared'] += 1
+
+        if not leader:
+            SINGLE_FLIGHT_SHARED.inc(flight=self.name)
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            # Forget the call before waking followers, so later arrivals start a fresh one
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    async def do_async(self, key: str, fn: Callable[..., Awaitable], *args, **kwargs) -> Any:
+        """do() for coroutines on one event loop."""
+        with self._lock:
+            self._stats['calls'] += 1
+            future = self._async_calls.get(key)
+            leader = future is None
+            if leader:
+                future = self._async_calls[key] = asyncio.get_running_loop().create_future()
+                self._stats['executed'] += 1
+            else:
+                self._stats['shared'] += 1
+
+        if not leader:
+            SINGLE_FLIGHT_SHARED.inc(flight=self.name)
+            # Shielded so a follower that disconnects doesn't cancel everyone's result
+            return await asyncio.shield(future)
+
+        try:
+            result = await fn(*args, **kwargs)
+            future.set_result(result)
+            return result
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # Followers see the exception; don't warn about it never being retrieved here
+            future.exception()
+            raise
+        finally:
+            with self._lock:
+                self._async_calls.pop(key, None)
+
+    def get_stats(self) -> Dict:
+        with self._lock:
+            return {**self._stats, 'in_flight': len(self._calls) + len(self._async_calls)}
@@ -0,0 +1,59 @@
+import os
+import tempfile
+from starlette.testclient import TestClient
+import app as backend
+import asgi
+from hint_cache import hint_key
+from provider_stubs import ProviderStubs
+from providers import AsyncProviderClient
+from tts_cache import TTSCache
+
+AUDIO_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'input.webm')
+
+
+def test_process_audio_admitted_and_refused():
+    """A voice turn runs end to end through the ASGI app and frees its slot; a busy session gets 429"""
+    stubs = ProviderStubs(tts_audio=b'ID3 stub audio')
+    stubs.start()
+    saved = {name: getattr(asgi, name) for name in ('elevenlabs', 'tts_cache', 'ELEVENLABS_API_KEY', 'VOICE_ID')}
+    try:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            asgi.elevenlabs = AsyncProviderClient(stubs.base_url, name='elevenlabs')
+            # The stub transcribes the first upload as this; a cached hint keeps Gemini out of the turn
+            asgi.hint_cache.put(hint_key('', 'the coding problem', "I would use a hash map here, attempt 1"),
+                                "Good idea, what would the keys be?")
+            asgi.tts_cache = TTSCache(cache_dir=cache_dir)
+            asgi.ELEVENLABS_API_KEY, asgi.VOICE_ID = 'test', 'voice'
+
+            client = TestClient(asgi.app)
+            with open(AUDIO_FIXTURE, 'rb') as f:
+                audio = f.read()
+
+            response = client.post('/process_audio', headers={'X-Session-Id': 'asgi-test'},
+                                   files={'audio': ('input.webm', audio, 'audio/webm')})
+            assert response.status_code == 200, response.text
+            assert response.content == b'ID3 stub audio'
+            assert 'stt' in response.headers['X-Turn-Timing']
+            stats = stubs.get_stats()
+            assert (stats['stt']['requests'], stats['tts']['requests']) == (1, 1)
+            assert backend.turn_scheduler.get_stats()['active'] == 0
+
+            backend.turn_scheduler.acquire('asgi-test')
+            try:
+                busy = client.post('/process_audio', headers={'X-Session-Id': 'asgi-test'},
+                                   files={'audio': ('input.webm', audio, 'audio/webm')})
+            finally:
+                backend.turn_scheduler.release('asgi-test')
+            assert busy.status_code == 429
+            assert busy.json()['reason'] == 'session_busy'
+            assert busy.headers['Retry-After'] == '1'
+            assert stubs.get_stats()['stt']['requests'] == 1
+    finally:
+        for name, value in saved.items():
+            setattr(asgi, name, value)
+        stubs.stop()
+
+
+if __name__ == "__main__":
+    test_process_audio_admitted_and_refused()
+    print("All ASGI tests passed")
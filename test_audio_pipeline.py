@@ -0,0 +1,90 @@
+import asyncio
+import contextlib
+import io
+import logging
+import os
+import wave
+import app
+from audio_pipeline import (SAMPLE_RATE, is_wav, pcm_to_wav, pydub, transcode_to_wav, transcode_to_wav_async,
+                            trim_silence)
+
+AUDIO_FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'uploads', 'input.webm')
+
+
+def read_fixture() -> bytes:
+    with open(AUDIO_FIXTURE, 'rb') as f:
+        return f.read()
+
+
+def wav_info(data: bytes):
+    with wave.open(io.BytesIO(data)) as wav:
+        return wav.getframerate(), wav.getnchannels(), wav.getsampwidth(), wav.getnframes() / wav.getframerate()
+
+
+def test_webm_is_transcoded_to_16k_mono_wav():
+    """A browser WebM recording comes back as 16 kHz mono 16-bit WAV of the same length, sync or async"""
+    wav = transcode_to_wav(read_fixture())
+    assert is_wav(wav)
+    rate, channels, width, seconds = wav_info(wav)
+    assert (rate, channels, width) == (SAMPLE_RATE, 1, 2)
+    assert abs(seconds - 5.37) < 0.05
+    assert asyncio.run(transcode_to_wav_async(read_fixture())) == wav
+
+
+def test_wav_passes_through_untouched():
+    """WAV uploads are not decoded again"""
+    wav = pcm_to_wav(b'\x00\x01' * SAMPLE_RATE)
+    assert transcode_to_wav(wav) is wav
+    assert asyncio.run(transcode_to_wav_async(wav)) is wav
+
+
+def test_garbage_input_is_logged_and_rejected():
+    """Undecodable bytes return None and are reported through the module logger, not stdout"""
+    records = []
+    handler = logging.Handler()
+    handler.emit = records.append
+    pipeline_logger = logging.getLogger('audio_pipeline')
+    pipeline_logger.addHandler(handler)
+    stdout = io.StringIO()
+    try:
+        with contextlib.redirect_stdout(stdout):
+            assert transcode_to_wav(b'definitely not audio' * 50) is None
+            assert asyncio.run(transcode_to_wav_async(b'definitely not audio' * 50)) is None
+    finally:
+        pipeline_logger.removeHandler(handler)
+    assert stdout.getvalue() == ''
+    assert [r.levelname for r in records] == ['ERROR', 'ERROR']
+    assert all(r.getMessage().startswith('Error decoding audio') for r in records)
+
+
+def test_all_silence_is_dropped():
+    """A clip with no speech returns None, counting every byte as saved, and apply_vad skips it"""
+    silence = pcm_to_wav(b'\x00\x00' * SAMPLE_RATE * 2)
+    trimmed, stats = trim_silence(silence)
+    assert trimmed is None
+    assert stats['bytes_saved'] == stats['original_bytes'] == len(silence)
+    assert stats['trimmed_seconds'] == 0.0 and stats['seconds_saved'] == 2.0
+
+    assert app.apply_vad(silence)[0] is None
+
+
+def test_leading_and_trailing_silence_is_trimmed_with_padding():
+    """Silence around the speech goes; keep_silence of padding stays so speech edges are not clipped"""
+    wav = transcode_to_wav(read_fixture())
+    trimmed, stats = trim_silence(wav, silence_thresh=-45, min_silence_len=400, keep_silence=150)
+    assert (stats['original_seconds'], stats['trimmed_seconds']) == (5.374, 3.25)
+    assert stats['bytes_saved'] == len(wav) - len(trimmed) > 0
+
+    # Speech runs from 1.15s to 4.1s in the fixture: the result is exactly that plus 150 ms either side
+    original = pydub.AudioSegment.from_wav(io.BytesIO(wav))
+    result = pydub.AudioSegment.from_wav(io.BytesIO(trimmed))
+    assert result.raw_data == original[1000:4250].raw_data
+
+
+if __name__ == "__main__":
+    test_webm_is_transcoded_to_16k_mono_wav()
+    test_wav_passes_through_untouched()
+    test_garbage_input_is_logged_and_rejected()
+    test_all_silence_is_dropped()
+    test_leading_and_trailing_silence_is_trimmed_with_padding()
+    print("All audio pipeline tests passed")
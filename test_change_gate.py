@@ -0,0 +1,40 @@
+import time
+import numpy as np
+from change_gate import ChangeGate
+
+
+def _frame(level, noise_seed=None):
+    frame = np.full((240, 320, 3), level, dtype=np.uint8)
+    if noise_seed is not None:
+        frame += np.random.default_rng(noise_seed).integers(0, 4, frame.shape, dtype=np.uint8)
+    return frame
+
+
+def test_static_frames_are_skipped_until_the_picture_changes():
+    """Sensor noise is skipped; a real change passes and becomes the new reference"""
+    gate = ChangeGate(threshold=0.02)
+    assert gate.changed(_frame(100, noise_seed=0))
+    assert not gate.changed(_frame(100, noise_seed=1))
+    assert not gate.changed(_frame(100, noise_seed=2))
+    assert gate.changed(_frame(160))
+    assert not gate.changed(_frame(160))
+    stats = gate.get_stats()
+    assert stats['checked'] == 5 and stats['skipped'] == 3 and stats['skip_rate'] == 0.6
+
+
+def test_zero_threshold_and_max_age_force_inference():
+    """threshold=0 never skips; a reused result expires after max_age"""
+    always = ChangeGate(threshold=0)
+    assert always.changed(_frame(100)) and always.changed(_frame(100))
+
+    gate = ChangeGate(threshold=0.02, max_age=0.05)
+    assert gate.changed(_frame(100))
+    assert not gate.changed(_frame(100))
+    time.sleep(0.06)
+    assert gate.changed(_frame(100))
+
+
+if __name__ == "__main__":
+    test_static_frames_are_skipped_until_the_picture_changes()
+    test_zero_threshold_and_max_age_force_inference()
+    print("All change gate tests passed")
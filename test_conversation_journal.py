@@ -0,0 +1,85 @@
+import os
+import tempfile
+from conversation_journal import ConversationJournal, JournalManager
+from interview_analyzer import InterviewAnalyzer
+
+
+def test_buffered_writes_and_index():
+    """Entries are indexed immediately but only written in batches"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        path = os.path.join(log_dir, 'session.log')
+        journal = ConversationJournal(path, max_buffered=3)
+        journal.append("User", "Hello")
+        journal.append("AI", "Hi, let's start.")
+        assert len(journal) == 2
+        assert os.path.getsize(path) == 0
+
+        journal.append("User", "Ready")
+        assert os.path.getsize(path) > 0
+
+        # Offsets point at each entry's line in the file
+        with open(path, 'rb') as f:
+            data = f.read()
+        second = journal.turns()[1]
+        assert data[second.offset:second.offset + second.length].decode().startswith('[')
+        assert b"AI: Hi, let's start." in data[second.offset:second.offset + second.length]
+        assert [t.text for t in journal.turns("User")] == ["Hello", "Ready"]
+        journal.close()
+
+        # Reopening a session rebuilds its index from the file
+        reopened = ConversationJournal(path)
+        assert [t.speaker for t in reopened.turns()] == ["User", "AI", "User"]
+        reopened.close()
+
+
+def test_sessions_are_separate():
+    """Each session gets its own file and index"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        journals = JournalManager(directory=log_dir)
+        journals.get("alice").append("User", "Hi from Alice")
+        journals.get("bob").append("User", "Hi from Bob")
+        journals.flush_all()
+
+        assert [t.text for t in journals.get("alice").turns()] == ["Hi from Alice"]
+        assert sorted(os.listdir(log_dir)) == ["alice.log", "bob.log"]
+        journals.close("alice")
+        journals.close("bob")
+
+
+def test_closed_session_keeps_late_entries():
+    """Entries appended after a session is closed still reach its file, and reopening appends"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        journals = JournalManager(directory=log_dir)
+        journal = journals.get("alice")
+        journal.append("User", "Hi from Alice")
+        journals.close("alice")
+        assert journals._journals == {}
+
+        # A turn that was still in flight when the session was evicted
+        journal.append("AI", "Late reply")
+        with open(journal.path) as f:
+            assert "AI: Late reply" in f.read()
+
+        reopened = journals.get("alice")
+        assert [t.text for t in reopened.turns()] == ["Hi from Alice", "Late reply"]
+        journals.close("alice")
+
+
+def test_analyzer_reads_journal():
+    """The analyzer scores turns straight from the journal index"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        journal = ConversationJournal(os.path.join(log_dir, 'session.log'))
+        journal.append("AI", "Let's begin.")
+        journal.append("User", "I would use a hash map for constant time lookups")
+        analyzer = InterviewAnalyzer(code_file=os.path.join(log_dir, 'missing.txt'), journal=journal)
+        assert analyzer.analyze_conversation()
+        assert analyzer.metrics['communication'] == 5.0
+        journal.close()
+
+
+if __name__ == "__main__":
+    test_buffered_writes_and_index()
+    test_sessions_are_separate()
+    test_closed_session_keeps_late_entries()
+    test_analyzer_reads_journal()
+    print("All conversation journal tests passed")
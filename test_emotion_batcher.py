@@ -0,0 +1,97 @@
+import threading
+import time
+from emotion_batcher import EmotionBatcher
+
+
+def test_lone_producer_classifies_on_its_own_thread():
+    """With nothing else in flight a frame skips the queue: no worker thread, no hop"""
+    threads = []
+
+    def predict(frames):
+        threads.append(threading.current_thread())
+        return [{'happy': frame} for frame in frames]
+
+    batcher = EmotionBatcher(predict)
+    assert [batcher.submit(i) for i in range(3)] == [{'happy': i} for i in range(3)]
+    assert threads == [threading.current_thread()] * 3
+    assert batcher._thread is None
+    assert batcher.get_stats()['inline'] == 3
+
+
+def test_frames_queued_behind_a_busy_model_share_one_call():
+    """Frames submitted while the model is busy are batched, capped at max_batch, each getting its own result"""
+    calls = []
+    busy = threading.Event()
+    release = threading.Event()
+
+    def predict(frames):
+        calls.append(list(frames))
+        if len(calls) == 1:
+            busy.set()
+            release.wait(2)
+        return [{'happy': frame} for frame in frames]
+
+    batcher = EmotionBatcher(predict, max_batch=3)
+    results = {}
+    first = threading.Thread(target=lambda: results.__setitem__(0, batcher.submit(0, timeout=2)))
+    first.start()
+    assert busy.wait(2)
+    threads = [threading.Thread(target=lambda i=i: results.__setitem__(i, batcher.submit(i, timeout=2)))
+               for i in range(1, 5)]
+    for thread in threads:
+        thread.start()
+    while batcher._in_flight < 5:
+        time.sleep(0.01)
+    release.set()
+    for thread in [first] + threads:
+        thread.join()
+
+    assert results == {i: {'happy': i} for i in range(5)}
+    assert [len(frames) for frames in calls] == [1, 3, 1]
+    assert batcher.get_stats()['avg_batch_size'] == round(5 / 3, 2)
+
+
+def test_errors_reach_every_caller_in_the_batch():
+    """A failing predict raises in each caller whose frame was in the batch"""
+    calls = []
+    busy = threading.Event()
+    release = threading.Event()
+
+    def predict(frames):
+        calls.append(len(frames))
+        if len(calls) == 1:
+            busy.set()
+            release.wait(2)
+            return frames
+        raise RuntimeError('model failed')
+
+    batcher = EmotionBatcher(predict)
+    first = threading.Thread(target=batcher.submit, args=('ok',))
+    first.start()
+    assert busy.wait(2)
+    errors = []
+
+    def submit_bad():
+        try:
+            batcher.submit('bad', timeout=2)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    threads = [threading.Thread(target=submit_bad) for _ in range(2)]
+    for thread in threads:
+        thread.start()
+    while batcher._in_flight < 3:
+        time.sleep(0.01)
+    release.set()
+    for thread in [first] + threads:
+        thread.join()
+    assert calls == [1, 2]
+    assert errors == ['model failed'] * 2
+    assert batcher.get_stats()['errors'] == 1
+
+
+if __name__ == "__main__":
+    test_lone_producer_classifies_on_its_own_thread()
+    test_frames_queued_behind_a_busy_model_share_one_call()
+    test_errors_reach_every_caller_in_the_batch()
+    print("All emotion batcher tests passed")
@@ -0,0 +1,49 @@
+import numpy as np
+from face_tracker import FaceTracker
+
+
+def _scene(seed=0):
+    return np.random.default_rng(seed).integers(0, 255, (240, 320, 3), dtype=np.uint8)
+
+
+def test_face_is_tracked_between_detections_and_redetected_when_lost():
+    """After one detection the box follows the face by template matching; a changed scene re-runs the detector"""
+    tracker = FaceTracker(redetect_every=10)
+    detections = []
+
+    def detect(gray):
+        detections.append(1)
+        return (100, 60, 64, 64)
+
+    tracker.detect = detect
+    tracker._cascade = 'stub'  # detection is faked, so don't depend on the OpenCV build having a cascade
+    frame = _scene()
+    assert tracker.locate(frame) == (100, 60, 64, 64)
+
+    # Candidate moves 6px right and 4px down
+    moved = np.roll(np.roll(frame, 6, axis=1), 4, axis=0)
+    assert tracker.locate(moved) == (106, 64, 64, 64)
+    assert len(detections) == 1
+
+    crop = tracker.crop(moved)
+    assert crop.shape[:2] == (64 + 2 * 9, 64 + 2 * 9)
+
+    tracker.locate(_scene(seed=1))
+    assert len(detections) == 2
+    stats = tracker.get_stats()
+    assert stats['tracked'] == 2 and stats['lost'] == 1
+
+
+def test_no_face_gives_no_crop():
+    """Frames without a face are not sent to the classifier"""
+    tracker = FaceTracker()
+    tracker.detect = lambda gray: None
+    tracker._cascade = 'stub'
+    assert tracker.crop(_scene()) is None
+    assert tracker.get_stats()['no_face'] == 1
+
+
+if __name__ == "__main__":
+    test_face_is_tracked_between_detections_and_redetected_when_lost()
+    test_no_face_gives_no_crop()
+    print("All face tracker tests passed")
@@ -0,0 +1,69 @@
+import asyncio
+import time
+from frame_broadcaster import FrameBroadcaster, placeholder_jpeg
+from frame_ring import FrameRing
+
+
+def _broadcaster():
+    ring = FrameRing()
+    encoded = []
+
+    def encode(frame):
+        encoded.append(frame)
+        return f'jpeg-{frame}'.encode()
+
+    return ring, encoded, FrameBroadcaster(ring.wait_newer, encode, name='test')
+
+
+def test_each_frame_is_encoded_once_for_all_viewers():
+    """Three viewers receive the same bytes from a single encode; the producer stops with the last viewer"""
+    ring, encoded, broadcaster = _broadcaster()
+    viewers = [broadcaster.subscribe() for _ in range(3)]
+    ring.put(1)
+    assert [viewer.get(timeout=2) for viewer in viewers] == [b'jpeg-1'] * 3
+    ring.put(2)
+    assert [viewer.get(timeout=2) for viewer in viewers] == [b'jpeg-2'] * 3
+    assert encoded == [1, 2]
+
+    for viewer in viewers:
+        viewer.close()
+    deadline = time.monotonic() + 3
+    while broadcaster.get_stats()['running'] and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert broadcaster.get_stats()['running'] is False
+
+
+def test_slow_viewer_gets_latest_frame_and_async_viewer_is_woken():
+    """Frames a viewer did not take are replaced, not queued; async viewers wait on the event loop"""
+    ring, encoded, broadcaster = _broadcaster()
+    with broadcaster.subscribe() as slow:
+        for frame in (1, 2, 3):
+            ring.put(frame)
+            time.sleep(0.1)
+        assert slow.get(timeout=2) == b'jpeg-3'
+        assert slow.dropped == 2
+
+    async def watch():
+        with broadcaster.subscribe(asyncio.get_running_loop()) as viewer:
+            ring.put(4)
+            # A restarted producer may first republish the current frame
+            frames = [await viewer.get_async(timeout=2)]
+            if frames[-1] != b'jpeg-4':
+                frames.append(await viewer.get_async(timeout=2))
+            return frames[-1]
+
+    assert asyncio.run(watch()) == b'jpeg-4'
+
+
+def test_placeholder_is_a_cached_jpeg():
+    """The idle placeholder is encoded once and is a valid JPEG"""
+    frame = placeholder_jpeg()
+    assert frame[:2] == b'\xff\xd8'
+    assert placeholder_jpeg() is frame
+
+
+if __name__ == "__main__":
+    test_each_frame_is_encoded_once_for_all_viewers()
+    test_slow_viewer_gets_latest_frame_and_async_viewer_is_woken()
+    test_placeholder_is_a_cached_jpeg()
+    print("All frame broadcaster tests passed")
@@ -0,0 +1,32 @@
+import threading
+import time
+from frame_ring import FrameRing
+
+
+def test_ring_keeps_newest_frames_in_order():
+    """Old frames fall off; latest() is the newest with its sequence number"""
+    ring = FrameRing(size=2)
+    assert ring.latest() == (0, None)
+    for frame in ('a', 'b', 'c'):
+        ring.put(frame)
+    assert ring.latest() == (3, 'c')
+    assert ring.seq == 3
+    assert len(ring._frames) == 2
+
+
+def test_wait_newer_wakes_on_put_and_times_out():
+    """A reader waiting for a newer frame is woken by put(), and gives up after the timeout"""
+    ring = FrameRing()
+    ring.put('first')
+    threading.Timer(0.05, ring.put, args=('second',)).start()
+    assert ring.wait_newer(1, timeout=2.0) == (2, 'second')
+
+    start = time.monotonic()
+    assert ring.wait_newer(2, timeout=0.1) == (2, 'second')
+    assert time.monotonic() - start >= 0.09
+
+
+if __name__ == "__main__":
+    test_ring_keeps_newest_frames_in_order()
+    test_wait_newer_wakes_on_put_and_times_out()
+    print("All frame ring tests passed")
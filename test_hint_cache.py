@@ -0,0 +1,46 @@
+import time
+from hint_cache import HintCache, hint_key
+
+
+def test_key_ignores_whitespace_punctuation_and_case():
+    """Whitespace-only code edits and transcript punctuation or case map to the same key"""
+    code = "def solve(nums):\n    return sorted(nums)\n"
+    key = hint_key(code, "Two Sum", "Should I use a hash map?")
+
+    assert hint_key("def solve(nums):   \n\n    return sorted(nums)\n\n\n", "Two Sum",
+                    "Should I use a hash map?") == key
+    assert hint_key(code, "  two sum ", "should i use a HASH map") == key
+    assert hint_key(code, "Two Sum", "Should I...  use a hash-map!") == key
+
+    # Indentation and different words are real changes
+    assert hint_key("def solve(nums):\nreturn sorted(nums)\n", "Two Sum", "Should I use a hash map?") != key
+    assert hint_key(code, "Two Sum", "Should I use a heap?") != key
+
+
+def test_entries_expire_after_ttl():
+    """An entry older than ttl is a miss and is dropped"""
+    cache = HintCache(ttl=0.05)
+    cache.put("k", "Try a hash map.")
+    assert cache.get("k") == "Try a hash map."
+    time.sleep(0.1)
+    assert cache.get("k") is None
+    assert cache.get_stats() == {'hits': 1, 'misses': 1, 'expired': 1, 'evictions': 0, 'entries': 0}
+
+
+def test_least_recently_used_entry_is_evicted():
+    """Reading an entry keeps it; the least recently used one goes when the cache is full"""
+    cache = HintCache(max_entries=2)
+    cache.put("a", "1")
+    cache.put("b", "2")
+    assert cache.get("a") == "1"
+    cache.put("c", "3")
+    assert cache.get("b") is None
+    assert cache.get("a") == "1" and cache.get("c") == "3"
+    assert cache.get_stats()['evictions'] == 1
+
+
+if __name__ == "__main__":
+    test_key_ignores_whitespace_punctuation_and_case()
+    test_entries_expire_after_ttl()
+    test_least_recently_used_entry_is_evicted()
+    print("All hint cache tests passed")
@@ -0,0 +1,36 @@
+import os
+import sys
+from import_bench import IMPORT_BUDGET_MS, measure
+from lazy_imports import is_loaded, lazy_module
+
+
+def test_lazy_module_defers_import():
+    """A deferred module is only imported on first attribute access; missing ones still raise"""
+    sys.modules.pop('tabnanny', None)
+    tabnanny = lazy_module('tabnanny', lazy=True)
+    assert not is_loaded(tabnanny) and 'tabnanny' not in sys.modules
+    assert callable(tabnanny.check)
+    assert is_loaded(tabnanny) and 'tabnanny' in sys.modules
+
+    try:
+        lazy_module('no_such_module_here', lazy=True)
+        assert False, "expected ImportError"
+    except ImportError:
+        pass
+
+
+def test_fast_start_skips_heavy_imports():
+    """With FAST_START, a fresh interpreter importing app has no vision/audio libraries in sys.modules"""
+    report = measure('app', fast_start=True, runs=1)
+    assert not {'cv2', 'numpy', 'pydub', 'av'} & set(report['heavy_loaded'])
+
+    # Wall-clock time depends on the machine, so the budget is only checked on request
+    # (or run import_bench.py directly)
+    if os.getenv("CHECK_IMPORT_BUDGET") == "1":
+        assert report['median_ms'] <= IMPORT_BUDGET_MS, report
+
+
+if __name__ == "__main__":
+    test_lazy_module_defers_import()
+    test_fast_start_skips_heavy_imports()
+    print("All lazy import tests passed")
@@ -0,0 +1,110 @@
+import asyncio
+import threading
+from types import SimpleNamespace
+from llm_gateway import LLMError, LLMGateway
+
+
+class FakeModel:
+    """Stands in for a GenerativeModel: replies with chunks, failing after fail_after of them."""
+
+    def __init__(self, chunks, fail_after=None):
+        self.chunks = chunks
+        self.fail_after = fail_after
+        self.calls = 0
+
+    def _chunks(self):
+        for i, text in enumerate(self.chunks):
+            if i == self.fail_after:
+                raise RuntimeError("model unavailable")
+            yield SimpleNamespace(text=text)
+
+    def generate_content(self, prompt, stream=False, request_options=None):
+        self.calls += 1
+        if not stream:
+            return SimpleNamespace(text=''.join(c.text for c in self._chunks()))
+        return self._chunks()
+
+    async def generate_content_async(self, prompt, stream=False, request_options=None):
+        if not stream:
+            return self.generate_content(prompt)
+        self.calls += 1
+        chunks = self._chunks()
+
+        async def iterate():
+            for chunk in chunks:
+                yield chunk
+        return iterate()
+
+
+def _gateway(**models):
+    """A gateway over fake handles, skipping the SDK configuration."""
+    gateway = LLMGateway(models=list(models), timeout=1, max_concurrency=2)
+    gateway._semaphore = threading.BoundedSemaphore(2)
+    gateway._handles = dict(models)
+    gateway.configured = True
+    return gateway
+
+
+def test_falls_back_to_next_model_on_error():
+    """A model that fails before answering hands the call to the next one in the chain"""
+    primary, backup = FakeModel(["unused"], fail_after=0), FakeModel(["Hello", " there"])
+    gateway = _gateway(primary=primary, backup=backup)
+
+    assert gateway.generate("hi") == "Hello there"
+    assert list(gateway.stream("hi")) == ["Hello", " there"]
+
+    async def collect():
+        return await gateway.agenerate("hi"), [text async for text in gateway.astream("hi")]
+    assert asyncio.run(collect()) == ("Hello there", ["Hello", " there"])
+
+    stats = gateway.get_stats()
+    assert stats['primary'] == {'calls': 4, 'errors': 4, 'avg_latency': None, 'p95_latency': None}
+    assert stats['backup']['calls'] == 4 and stats['backup']['errors'] == 0
+
+
+def test_partial_stream_raises_instead_of_falling_back():
+    """Once text has been yielded a broken stream is raised, not restarted on another model"""
+    primary, backup = FakeModel(["Hello", " there"], fail_after=1), FakeModel(["Other reply"])
+    gateway = _gateway(primary=primary, backup=backup)
+
+    received = []
+    try:
+        for text in gateway.stream("hi"):
+            received.append(text)
+        raised = None
+    except LLMError as e:
+        raised = e
+    assert received == ["Hello"]
+    assert "interrupted" in str(raised)
+
+    async def collect_async():
+        received = []
+        try:
+            async for text in gateway.astream("hi"):
+                received.append(text)
+        except LLMError:
+            return received
+    assert asyncio.run(collect_async()) == ["Hello"]
+    assert backup.calls == 0
+
+
+def test_all_models_failing_raises():
+    """Every model failing raises LLMError naming each of them"""
+    gateway = _gateway(primary=FakeModel(["x"], fail_after=0), backup=FakeModel(["y"], fail_after=0))
+
+    for call in (lambda: gateway.generate("hi"), lambda: list(gateway.stream("hi")),
+                 lambda: asyncio.run(gateway.agenerate("hi"))):
+        try:
+            call()
+            raised = None
+        except LLMError as e:
+            raised = e
+        assert "primary: model unavailable" in str(raised)
+        assert "backup: model unavailable" in str(raised)
+
+
+if __name__ == "__main__":
+    test_falls_back_to_next_model_on_error()
+    test_partial_stream_raises_instead_of_falling_back()
+    test_all_models_failing_raises()
+    print("All LLM gateway tests passed")
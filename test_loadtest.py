@@ -0,0 +1,32 @@
+import requests
+from loadtest import parse_mix, percentile
+from provider_stubs import ProviderStubs
+
+
+def test_percentile_nearest_rank():
+    """Percentiles pick an observed value by nearest rank"""
+    values = [float(v) for v in range(1, 101)]
+    assert percentile(values, 50) == 50.0
+    assert percentile(values, 99) == 99.0
+    assert percentile([], 95) == 0.0
+    assert parse_mix('process_audio=3,save-code') == {'process_audio': 3.0, 'save-code': 1.0}
+
+
+def test_provider_stubs_inject_errors():
+    """Each route family answers like its provider and fails at its own error rate"""
+    stubs = ProviderStubs({'stt': {'error_rate': 1.0, 'error_status': 429}}, tts_audio=b'mp3')
+    base_url = stubs.start()
+    try:
+        assert requests.post(f"{base_url}/v1/speech-to-text").status_code == 429
+        assert requests.post(f"{base_url}/v1/text-to-speech/voice").content == b'mp3'
+        reply = requests.post(f"{base_url}/v1beta/models/gemini:generateContent").json()
+        assert reply['candidates'][0]['content']['parts'][0]['text']
+        assert stubs.get_stats()['stt'] == {'requests': 1, 'injected_errors': 1}
+    finally:
+        stubs.stop()
+
+
+if __name__ == "__main__":
+    test_percentile_nearest_rank()
+    test_provider_stubs_inject_errors()
+    print("All load test harness tests passed")
@@ -0,0 +1,58 @@
+import contextvars
+import io
+import json
+import logging
+import logging.handlers
+import queue
+import app
+from log_pipeline import JsonFormatter, RequestIdFilter, _QueueHandler
+from voice_turn import TurnTimeline
+
+
+def capture(logger):
+    """Wire logger through the same queue handler/listener pair setup_logging uses, into a buffer."""
+    stream = io.StringIO()
+    output = logging.StreamHandler(stream)
+    output.setFormatter(JsonFormatter())
+    log_queue = queue.SimpleQueue()
+    handler = _QueueHandler(log_queue)
+    handler.addFilter(RequestIdFilter())
+    logger.addHandler(handler)
+    logger.propagate = False
+    listener = logging.handlers.QueueListener(log_queue, output)
+    listener.start()
+    return stream, listener, handler
+
+
+def test_request_id_and_extra_fields_reach_json_from_worker_threads():
+    """The request hook's id is stamped on records logged by the request and by its worker threads"""
+    logger = logging.getLogger('test_log_pipeline')
+    logger.setLevel(logging.INFO)
+    stream, listener, handler = capture(logger)
+    try:
+        def handle_request():
+            with app.app.test_request_context('/health', headers={'X-Request-Id': 'req-123'}):
+                app.app.preprocess_request()
+                logger.info("On the request thread", extra={'session_id': 's-1'})
+                TurnTimeline().run('worker', lambda: logger.info("On a worker %s", 'thread',
+                                                                 extra={'bytes': 42})).result()
+
+        # Each request is served in its own context, as under the WSGI server
+        contextvars.copy_context().run(handle_request)
+        logger.info("Outside any request")
+    finally:
+        listener.stop()
+        logger.removeHandler(handler)
+        logger.propagate = True
+
+    entries = [json.loads(line) for line in stream.getvalue().splitlines()]
+    assert [entry['msg'] for entry in entries] == ["On the request thread", "On a worker thread", "Outside any request"]
+    assert [entry['request_id'] for entry in entries] == ['req-123', 'req-123', '-']
+    assert entries[0]['session_id'] == 's-1' and entries[1]['bytes'] == 42
+    assert entries[0]['level'] == 'INFO' and entries[0]['logger'] == 'test_log_pipeline'
+    assert 'bytes' not in entries[0] and 'session_id' not in entries[1]
+
+
+if __name__ == "__main__":
+    test_request_id_and_extra_fields_reach_json_from_worker_threads()
+    print("All log pipeline tests passed")
@@ -0,0 +1,52 @@
+from metrics import Registry
+from voice_turn import TurnTimeline
+
+
+def test_histogram_exposition():
+    """Buckets are cumulative and every series ends with +Inf, _sum and _count"""
+    registry = Registry()
+    histogram = registry.histogram('demo_seconds', 'Demo latency', ('stage',), buckets=(0.1, 1.0))
+    histogram.observe(0.05, stage='stt')
+    histogram.observe(0.5, stage='stt')
+    histogram.observe(5.0, stage='stt')
+
+    text = registry.render()
+    assert '# TYPE demo_seconds histogram' in text
+    assert 'demo_seconds_bucket{stage="stt",le="0.1"} 1' in text
+    assert 'demo_seconds_bucket{stage="stt",le="1.0"} 2' in text
+    assert 'demo_seconds_bucket{stage="stt",le="+Inf"} 3' in text
+    assert 'demo_seconds_sum{stage="stt"} 5.55' in text
+    assert 'demo_seconds_count{stage="stt"} 3' in text
+
+
+def test_counter_labels():
+    """Counters keep one series per label set, and re-registering returns the same metric"""
+    registry = Registry()
+    errors = registry.counter('demo_errors_total', 'Demo errors', ('endpoint',))
+    errors.inc(endpoint='stt')
+    errors.inc(2, endpoint='tts')
+    assert registry.counter('demo_errors_total', 'Demo errors', ('endpoint',)) is errors
+
+    text = registry.render()
+    assert 'demo_errors_total{endpoint="stt"} 1.0' in text
+    assert 'demo_errors_total{endpoint="tts"} 2.0' in text
+
+
+def test_timeline_feeds_stage_histogram():
+    """Stages timed on a turn show up in the shared /metrics registry"""
+    from metrics import REGISTRY, STAGE_SECONDS
+
+    before = REGISTRY.render().count('stage="test_stage"')
+    timeline = TurnTimeline()
+    with timeline.stage('test_stage'):
+        pass
+    assert before == 0
+    assert 'voice_turn_stage_seconds_count{stage="test_stage"} 1' in REGISTRY.render()
+    assert STAGE_SECONDS.name == 'voice_turn_stage_seconds'
+
+
+if __name__ == "__main__":
+    test_histogram_exposition()
+    test_counter_labels()
+    test_timeline_feeds_stage_histogram()
+    print("All metrics tests passed")
@@ -0,0 +1,55 @@
+import contextvars
+import os
+import tempfile
+import threading
+import time
+from profiling import RequestProfile, StackSampler, requested_mode, track_thread
+
+
+def busy_wait(seconds):
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+def test_sampler_folds_named_threads():
+    """Threads matched by name prefix are sampled into folded stacks rooted at the thread name"""
+    worker = threading.Thread(target=busy_wait, args=(0.2,), name='health-tracker')
+    sampler = StackSampler(interval=0.005, name_prefixes=('health-tracker',)).start()
+    worker.start()
+    worker.join()
+    sampler.stop()
+
+    lines = sampler.folded().splitlines()
+    assert lines and all(line.startswith('health-tracker;') for line in lines)
+    assert any('busy_wait (test_profiling.py' in line for line in lines)
+    assert sum(int(line.rsplit(' ', 1)[1]) for line in lines) > 5
+
+
+def test_request_profile_covers_handed_off_work():
+    """Work run in a copied context on another thread lands in the request's profile"""
+    assert requested_mode(None, '1') == 'sample'
+    assert requested_mode('cprofile') == 'cprofile'
+    assert requested_mode('', 'nope') is None
+
+    with tempfile.TemporaryDirectory() as profile_dir:
+        profile = RequestProfile('req-1-process_audio', directory=profile_dir).start()
+
+        def stage():
+            with track_thread():
+                busy_wait(0.1)
+
+        helper = threading.Thread(target=contextvars.copy_context().run, args=(stage,))
+        helper.start()
+        helper.join()
+        path = profile.stop()
+
+        assert os.path.dirname(path) == profile_dir and path.endswith('-req-1-process_audio.folded')
+        with open(path) as f:
+            assert 'stage (test_profiling.py' in f.read()
+
+
+if __name__ == "__main__":
+    test_sampler_folds_named_threads()
+    test_request_profile_covers_handed_off_work()
+    print("All profiling tests passed")
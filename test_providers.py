@@ -0,0 +1,72 @@
+import asyncio
+import time
+import requests
+from provider_stubs import ProviderStubs
+from providers import AsyncProviderClient, ProviderClient
+
+
+def test_streamed_response_holds_its_slot_until_closed():
+    """The endpoint limit covers the whole streamed body, not just the response headers"""
+    stubs = ProviderStubs()
+    stubs.start()
+    try:
+        client = ProviderClient(stubs.base_url, limits={'tts': 1})
+        slot = client._limits['tts']
+        with client.post('tts', '/v1/text-to-speech/voice/stream', json={}, stream=True) as response:
+            assert response.status_code == 200
+            assert not slot.acquire(blocking=False)
+            b''.join(response.iter_content(1024))
+        assert slot.acquire(blocking=False)
+        slot.release()
+
+        client.post('tts', '/v1/text-to-speech/voice', json={})
+        assert slot.acquire(blocking=False)
+        slot.release()
+
+        async def stream_async():
+            async_client = AsyncProviderClient(stubs.base_url, limits={'tts': 1})
+            response = await async_client.post('tts', '/v1/text-to-speech/voice/stream', json={}, stream=True)
+            held = async_client._limit('tts').locked()
+            await response.aclose()
+            released = not async_client._limit('tts').locked()
+            await async_client.aclose()
+            return held, released
+
+        assert asyncio.run(stream_async()) == (True, True)
+    finally:
+        stubs.stop()
+
+
+def test_post_read_timeout_is_not_retried():
+    """A POST that timed out after being sent is not resent; a refused connection is retried"""
+    stubs = ProviderStubs({'tts': {'latency_ms': 300}})
+    stubs.start()
+    try:
+        client = ProviderClient(stubs.base_url, timeout=(1, 0.1), max_retries=2, backoff=0)
+        try:
+            client.post('tts', '/v1/text-to-speech/voice', json={})
+            raised = None
+        except requests.exceptions.ReadTimeout as e:
+            raised = e
+        assert raised is not None
+        time.sleep(0.4)
+        assert stubs.get_stats()['tts']['requests'] == 1
+    finally:
+        stubs.stop()
+
+    # Nothing listens on the stopped stub's port any more
+    attempts = []
+    client = ProviderClient(stubs.base_url, timeout=(0.2, 1), max_retries=2, backoff=0)
+    send = client.session.request
+    client.session.request = lambda *args, **kwargs: (attempts.append(1), send(*args, **kwargs))[1]
+    try:
+        client.post('tts', '/v1/text-to-speech/voice', json={})
+    except requests.exceptions.ConnectionError:
+        pass
+    assert len(attempts) == 3
+
+
+if __name__ == "__main__":
+    test_streamed_response_holds_its_slot_until_closed()
+    test_post_read_timeout_is_not_retried()
+    print("All provider client tests passed")
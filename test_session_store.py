@@ -0,0 +1,77 @@
+import os
+import tempfile
+import threading
+import time
+from conversation_journal import JournalManager
+from session_store import SessionRegistry, resolve_session_id
+
+
+def test_resolve_session_id():
+    """The first well-formed id wins; anything else falls back to the default session"""
+    assert resolve_session_id(None, '', 'abc-123') == 'abc-123'
+    assert resolve_session_id('../etc/passwd', 'ok_id') == 'ok_id'
+    assert resolve_session_id(None) == 'default'
+
+
+def test_sessions_are_isolated_and_lru_evicted():
+    """Each id gets its own state; the least recently used session is evicted first"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        evicted = []
+        sessions = SessionRegistry(journals=JournalManager(directory=log_dir), max_sessions=2,
+                                   on_evict=lambda s: evicted.append(s.session_id))
+        sessions.get('a').code = 'print("a")'
+        sessions.get('b').code = 'print("b")'
+        sessions.get('a').journal.append('User', 'hello from a')
+
+        sessions.get('c')
+        assert evicted == ['b']
+        assert 'a' in sessions and 'b' not in sessions
+        assert sessions.get('a').code == 'print("a")'
+        assert [t.text for t in sessions.get('a').journal.turns()] == ['hello from a']
+
+
+def test_idle_eviction_and_spill():
+    """Idle sessions are swept, and a spilled session comes back with its code and analysis"""
+    with tempfile.TemporaryDirectory() as log_dir:
+        spill_path = os.path.join(log_dir, 'sessions.db')
+        sessions = SessionRegistry(journals=JournalManager(directory=log_dir), idle_ttl=0.05,
+                                   spill_path=spill_path)
+        session = sessions.get('alice')
+        session.code = 'def f(): pass'
+        session.analysis = {'overall_score': 7.5}
+        session.journal.append('User', 'first answer')
+
+        time.sleep(0.1)
+        sessions.get('bob')
+        assert 'alice' not in sessions
+
+        restored = sessions.get('alice')
+        assert restored.code == 'def f(): pass'
+        assert restored.analysis == {'overall_score': 7.5}
+        assert [t.text for t in restored.journal.turns()] == ['first answer']
+        assert sessions.get_stats()['restored'] == 1
+
+
+def test_eviction_hook_runs_outside_the_lock():
+    """A slow eviction hook doesn't hold up lookups from other threads"""
+    lookups = []
+
+    def slow_hook(session):
+        if session.session_id != 'a':
+            return
+        other = threading.Thread(target=lambda: lookups.append(sessions.get('c').session_id))
+        other.start()
+        other.join(timeout=1)
+
+    sessions = SessionRegistry(max_sessions=1, on_evict=slow_hook)
+    sessions.get('a')
+    sessions.get('b')
+    assert lookups == ['c']
+
+
+if __name__ == "__main__":
+    test_resolve_session_id()
+    test_sessions_are_isolated_and_lru_evicted()
+    test_idle_eviction_and_spill()
+    test_eviction_hook_runs_outside_the_lock()
+    print("All session store tests passed")
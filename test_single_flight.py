@@ -0,0 +1,59 @@
+import asyncio
+import threading
+import time
+from single_flight import SingleFlight, flight_key
+
+
+def test_concurrent_identical_calls_share_one_execution():
+    """Callers with the same key get the leader's result; a different key runs separately"""
+    flight = SingleFlight('test')
+    executions = []
+
+    def synthesize(text):
+        executions.append(text)
+        time.sleep(0.1)
+        return text.upper()
+
+    results = []
+    key = flight_key('session-1', 'hello')
+    threads = [threading.Thread(target=lambda: results.append(flight.do(key, synthesize, 'hello')))
+               for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert results == ['HELLO'] * 5 and executions == ['hello']
+    assert flight.do(flight_key('session-2', 'hello'), synthesize, 'hello') == 'HELLO'
+    assert flight.get_stats() == {'calls': 6, 'executed': 2, 'shared': 4, 'in_flight': 0}
+
+
+def test_errors_are_shared_and_async_calls_coalesce():
+    """A failing leader fails its followers too; coroutines coalesce the same way"""
+    flight = SingleFlight('test')
+
+    async def run():
+        calls = []
+
+        async def fetch(value):
+            calls.append(value)
+            await asyncio.sleep(0.05)
+            if value == 'bad':
+                raise ValueError(value)
+            return value * 2
+
+        shared = await asyncio.gather(*[flight.do_async('k', fetch, 'ab') for _ in range(3)])
+        failed = await asyncio.gather(*[flight.do_async('e', fetch, 'bad') for _ in range(2)],
+                                      return_exceptions=True)
+        return calls, shared, failed
+
+    calls, shared, failed = asyncio.run(run())
+    assert shared == ['abab'] * 3
+    assert calls == ['ab', 'bad']
+    assert all(isinstance(e, ValueError) for e in failed)
+
+
+if __name__ == "__main__":
+    test_concurrent_identical_calls_share_one_execution()
+    test_errors_are_shared_and_async_calls_coalesce()
+    print("All single-flight tests passed")
@@ -0,0 +1,38 @@
+import app
+from llm_gateway import LLMGateway
+
+
+def test_readyz_turns_ready_once_gemini_is_warm():
+    """/readyz answers 503 until the Gemini handles exist, then 200"""
+    saved = app.gateway
+    app.gateway = LLMGateway(models=['gemini-2.5-flash'])
+    try:
+        client = app.app.test_client()
+        cold = client.get('/readyz')
+        assert cold.status_code == 503
+        assert cold.get_json() == {'ready': False, 'checks': {'gemini_warm': False}}
+
+        app.gateway.warm()
+        warm = client.get('/readyz')
+        assert warm.status_code == 200
+        assert warm.get_json() == {'ready': True, 'checks': {'gemini_warm': True}}
+    finally:
+        app.gateway = saved
+
+
+def test_statusz_reports_scheduler_caches_and_registry():
+    """/statusz carries the turn scheduler, single-flight caches, session registry and provider pools"""
+    report = app.app.test_client().get('/statusz').get_json()
+    for key in ('ready', 'checks', 'uptime_seconds', 'gemini', 'elevenlabs', 'turns', 'single_flight',
+                'video_feed', 'sessions'):
+        assert key in report, key
+    assert {'active', 'queue_depth', 'max_active', 'max_queued', 'admitted', 'rejected'} <= set(report['turns'])
+    assert set(report['single_flight']) == {'tts', 'hint', 'analysis'}
+    assert {'created', 'evicted', 'spilled', 'restored'} <= set(report['sessions'])
+    assert report['gemini']['warm'] == app.gateway.is_warm()
+
+
+if __name__ == "__main__":
+    test_readyz_turns_ready_once_gemini_is_warm()
+    test_statusz_reports_scheduler_caches_and_registry()
+    print("All status endpoint tests passed")
@@ -0,0 +1,82 @@
+import os
+import tempfile
+import threading
+import time
+import tts_cache
+from tts_cache import TTSCache, cache_key
+
+SETTINGS = {"stability": 0.5, "similarity_boost": 0.75}
+
+
+def test_cache_key():
+    """Keys change with any voice parameter, not just the text"""
+    key = cache_key("Hello", "voice", "model", SETTINGS)
+    assert key == cache_key("Hello", "voice", "model", dict(SETTINGS))
+    assert key != cache_key("Hello", "other-voice", "model", SETTINGS)
+    assert key != cache_key("Hello", "voice", "model", {**SETTINGS, "stability": 0.9})
+
+
+def test_memory_and_disk_tiers():
+    """Hits come from memory first, then from disk after a restart"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TTSCache(cache_dir=cache_dir)
+        assert cache.get("a") is None
+        cache.put("a", b"audio-a")
+        assert cache.get("a") == b"audio-a"
+
+        # A fresh cache only has the disk tier to go on
+        restarted = TTSCache(cache_dir=cache_dir)
+        assert restarted.get("a") == b"audio-a"
+        stats = restarted.get_stats()
+        assert stats['disk_hits'] == 1 and stats['memory_entries'] == 1
+
+        assert cache.get_stats()['memory_hits'] == 1
+        assert cache.get_stats()['misses'] == 1
+
+
+def test_eviction():
+    """Both tiers stay within their byte budgets, dropping the oldest clips"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TTSCache(cache_dir=cache_dir, max_memory_bytes=10, max_disk_bytes=10)
+        cache.put("a", b"12345")
+        cache.put("b", b"12345")
+        cache.get("a")  # "b" is now least recently used
+        cache.put("c", b"12345")
+
+        stats = cache.get_stats()
+        assert stats['memory_bytes'] <= 10 and stats['disk_bytes'] <= 10
+        assert not os.path.exists(os.path.join(cache_dir, "b.mp3"))
+        assert cache.get("a") == b"12345"
+        assert cache.get("b") is None
+
+
+def test_disk_write_does_not_block_memory_hits():
+    """A slow disk write in put() leaves lookups of other clips free to proceed"""
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache = TTSCache(cache_dir=cache_dir)
+        cache.put("a", b"cached")
+
+        def slow_open(*args, **kwargs):
+            time.sleep(0.5)
+            return open(*args, **kwargs)
+
+        tts_cache.open = slow_open
+        try:
+            writer = threading.Thread(target=cache.put, args=("b", b"slow"))
+            writer.start()
+            time.sleep(0.05)
+            start = time.monotonic()
+            assert cache.get("a") == b"cached"
+            assert time.monotonic() - start < 0.25
+            writer.join()
+        finally:
+            del tts_cache.open
+        assert cache.get_stats()['disk_entries'] == 2
+
+
+if __name__ == "__main__":
+    test_cache_key()
+    test_memory_and_disk_tiers()
+    test_eviction()
+    test_disk_write_does_not_block_memory_hits()
+    print("All TTS cache tests passed")
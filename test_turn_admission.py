@@ -0,0 +1,44 @@
+from starlette.testclient import TestClient
+import app as backend
+import asgi
+from turn_scheduler import TurnScheduler
+
+PREFLIGHT = {
+    'Origin': 'http://localhost:3000',
+    'Access-Control-Request-Method': 'POST',
+    'Access-Control-Request-Headers': 'X-Session-Id',
+}
+
+
+def check_server(client):
+    """With no free slot, preflights still pass and the refused turn carries CORS headers"""
+    saved = backend.turn_scheduler
+    backend.turn_scheduler = TurnScheduler(max_active=0, max_queued=0)
+    try:
+        preflight = client.options('/process_audio', headers=PREFLIGHT)
+        assert 200 <= preflight.status_code < 300, preflight.status_code
+        assert preflight.headers.get('Access-Control-Allow-Origin')
+
+        refused = client.post('/process_audio', headers={'Origin': PREFLIGHT['Origin'], 'X-Session-Id': 's-1'})
+        assert refused.status_code == 503
+        assert refused.headers.get('Retry-After')
+        assert refused.headers.get('Access-Control-Allow-Origin')
+        assert backend.turn_scheduler.get_stats()['rejected'] == 1
+    finally:
+        backend.turn_scheduler = saved
+
+
+def test_flask_preflight_is_not_a_turn():
+    """Flask: OPTIONS /process_audio skips admission control"""
+    check_server(backend.app.test_client())
+
+
+def test_asgi_preflight_is_not_a_turn():
+    """ASGI: CORS answers preflights and decorates rejections from outside admission control"""
+    check_server(TestClient(asgi.app))
+
+
+if __name__ == "__main__":
+    test_flask_preflight_is_not_a_turn()
+    test_asgi_preflight_is_not_a_turn()
+    print("All turn admission tests passed")
@@ -0,0 +1,138 @@
+import asyncio
+import threading
+import time
+from turn_scheduler import TurnRejected, TurnScheduler, admission_key
+
+
+def rejection(scheduler, session_id):
+    try:
+        scheduler.acquire(session_id)
+    except TurnRejected as e:
+        return e
+    return None
+
+
+def test_one_turn_per_session_and_bounded_queue():
+    """A session gets one turn at a time; beyond the queue limit turns are refused with Retry-After"""
+    scheduler = TurnScheduler(max_active=1, max_queued=1, queue_timeout=5)
+    scheduler.acquire('a')
+    assert rejection(scheduler, 'a').status == 429
+
+    admitted = []
+    waiter = threading.Thread(target=lambda: (scheduler.acquire('b'), admitted.append('b')))
+    waiter.start()
+    while scheduler.get_stats()['queue_depth'] == 0:
+        time.sleep(0.01)
+
+    full = rejection(scheduler, 'c')
+    assert (full.status, full.reason) == (503, 'queue_full') and full.retry_after >= 1
+    assert rejection(scheduler, 'b').reason == 'session_busy'
+
+    scheduler.release('a')
+    waiter.join(timeout=2)
+    assert admitted == ['b']
+    assert scheduler.get_stats()['active'] == 1
+
+
+def test_queue_timeout():
+    """A turn that cannot get a slot in time is refused rather than left waiting"""
+    scheduler = TurnScheduler(max_active=1, max_queued=4, queue_timeout=0.05)
+    scheduler.acquire('a')
+    late = rejection(scheduler, 'b')
+    assert (late.status, late.reason) == (503, 'queue_timeout')
+    # The timed-out session can try again once a slot frees up
+    scheduler.release('a')
+    assert rejection(scheduler, 'b') is None
+    assert scheduler.get_stats()['rejected'] == 1
+
+
+def test_queued_turns_are_admitted_in_arrival_order():
+    """Waiting turns get slots first come, first served; a newcomer cannot take a slot ahead of them"""
+    scheduler = TurnScheduler(max_active=1, max_queued=4, queue_timeout=5)
+    scheduler.acquire('a')
+    admitted = []
+    waiters = []
+    for session_id in ('b', 'c', 'd'):
+        waiter = threading.Thread(target=lambda s=session_id: (scheduler.acquire(s), admitted.append(s)))
+        waiter.start()
+        waiters.append(waiter)
+        while scheduler.get_stats()['queue_depth'] < len(waiters):
+            time.sleep(0.01)
+
+    # Releasing hands the slot straight to the head of the queue, so a newcomer queues behind c and d
+    scheduler.release('a')
+    stats = scheduler.get_stats()
+    assert (stats['active'], stats['queue_depth']) == (1, 2)
+    late = threading.Thread(target=lambda: (scheduler.acquire('late'), admitted.append('late')))
+    late.start()
+    waiters.append(late)
+    while scheduler.get_stats()['queue_depth'] < 3:
+        time.sleep(0.01)
+
+    for holder in ('b', 'c', 'd', 'late'):
+        deadline = time.monotonic() + 2
+        while holder not in admitted and time.monotonic() < deadline:
+            time.sleep(0.01)
+        scheduler.release(holder)
+    for waiter in waiters:
+        waiter.join(timeout=2)
+    assert admitted == ['b', 'c', 'd', 'late']
+
+
+def test_async_waiters_do_not_hold_threads():
+    """Queued async turns wait on the event loop, in order, and give up their place on timeout or cancel"""
+    scheduler = TurnScheduler(max_active=1, max_queued=64, queue_timeout=5)
+
+    async def run():
+        await scheduler.acquire_async('a')
+        threads = threading.active_count()
+        admitted = []
+
+        async def turn(session_id):
+            await scheduler.acquire_async(session_id)
+            admitted.append(session_id)
+
+        tasks = [asyncio.create_task(turn(f's{i}')) for i in range(40)]
+        while scheduler.get_stats()['queue_depth'] < 40:
+            await asyncio.sleep(0.01)
+        assert threading.active_count() <= threads
+
+        # A cancelled waiter leaves the queue and never takes a slot
+        tasks[0].cancel()
+        await asyncio.gather(tasks[0], return_exceptions=True)
+        assert scheduler.get_stats()['queue_depth'] == 39
+
+        holder = 'a'
+        for _ in range(39):
+            scheduler.release(holder)
+            while len(admitted) < 1 or admitted[-1] == holder:
+                await asyncio.sleep(0.001)
+            holder = admitted[-1]
+        await asyncio.gather(*tasks, return_exceptions=True)
+        assert admitted == [f's{i}' for i in range(1, 40)]
+
+        scheduler.queue_timeout = 0.05
+        try:
+            await scheduler.acquire_async('late')
+            return None
+        except TurnRejected as e:
+            return e.reason
+
+    assert asyncio.run(run()) == 'queue_timeout'
+    assert scheduler.get_stats()['queue_depth'] == 0
+
+
+def test_anonymous_clients_get_separate_slots():
+    """Callers without a session id are told apart by address instead of sharing 'default'"""
+    assert admission_key('default', '10.0.0.1') != admission_key('default', '10.0.0.2')
+    assert admission_key('default', None) == 'default'
+    assert admission_key('s-1', '10.0.0.1') == 's-1'
+
+
+if __name__ == "__main__":
+    test_one_turn_per_session_and_bounded_queue()
+    test_queue_timeout()
+    test_queued_turns_are_admitted_in_arrival_order()
+    test_async_waiters_do_not_hold_threads()
+    test_anonymous_clients_get_separate_slots()
+    print("All turn scheduler tests passed")
@@ -0,0 +1,46 @@
+import asyncio
+import app
+import asgi
+
+
+def test_chunks_are_regrouped_into_sentences():
+    """Sentences are cut at terminators followed by a capital letter, however the text was chunked"""
+    chunks = ["Good idea. Wh", "at would the keys be? Try", " e.g. 3.5 is ok", " as input! Then", " run it"]
+    expected = ["Good idea.", "What would the keys be?", "Try e.g. 3.5 is ok as input!", "Then run it"]
+    assert list(app.iter_sentences(chunks)) == expected
+    assert list(app.iter_sentences(["e.g. 3.5 is ok"])) == ["e.g. 3.5 is ok"]
+
+    async def collect():
+        async def agen():
+            for chunk in chunks:
+                yield chunk
+        return [sentence async for sentence in asgi.aiter_sentences(agen())]
+    assert asyncio.run(collect()) == expected
+
+
+def test_cached_reply_is_spoken_sentence_by_sentence_without_gemini():
+    """A cached hint skips Gemini and is synthesized one sentence at a time"""
+    spoken = []
+    saved = app.text_to_speech_stream, app.run_gemini_stream
+
+    def fake_tts(sentence):
+        spoken.append(sentence)
+        yield f"<{sentence}>".encode()
+
+    def no_gemini(prompt):
+        raise AssertionError("Gemini must not be called for a cached reply")
+
+    app.text_to_speech_stream, app.run_gemini_stream = fake_tts, no_gemini
+    try:
+        audio = b''.join(app.stream_voice_response(
+            "prompt", cached_reply="Good idea. Use e.g. 3.5 as a test.", session_id='stream-test'))
+    finally:
+        app.text_to_speech_stream, app.run_gemini_stream = saved
+    assert spoken == ["Good idea.", "Use e.g. 3.5 as a test."]
+    assert audio == b"<Good idea.><Use e.g. 3.5 as a test.>"
+
+
+if __name__ == "__main__":
+    test_chunks_are_regrouped_into_sentences()
+    test_cached_reply_is_spoken_sentence_by_sentence_without_gemini()
+    print("All voice stream tests passed")
@@ -0,0 +1,40 @@
+import time
+from voice_turn import TurnTimeline
+
+
+def close_to(value_ms, expected_ms, tolerance_ms=60):
+    return abs(value_ms - expected_ms) <= tolerance_ms
+
+
+def test_breakdown_reports_stage_totals_and_overlap():
+    """Work started with run() while a stage() is timed shows up as overlap; sequential stages don't"""
+    timeline = TurnTimeline()
+    with timeline.stage('stt'):
+        time.sleep(0.1)
+    warmup = timeline.run('tts_warmup', time.sleep, 0.3)
+    with timeline.stage('gemini'):
+        time.sleep(0.2)
+    warmup.result()
+    with timeline.stage('tts'):
+        time.sleep(0.1)
+
+    breakdown = timeline.breakdown()
+    durations = {stage['name']: stage['duration_ms'] for stage in breakdown['stages']}
+    # tts_warmup and gemini start together, in either order
+    assert sorted(durations) == ['gemini', 'stt', 'tts', 'tts_warmup']
+    for name, expected in (('stt', 100), ('tts_warmup', 300), ('gemini', 200), ('tts', 100)):
+        assert close_to(durations[name], expected), (name, durations)
+    # Gemini ran entirely inside the warm-up: its 200 ms were in parallel
+    assert close_to(breakdown['overlap_ms'], 200), breakdown
+    assert close_to(breakdown['total_ms'], 100 + 300 + 100), breakdown
+
+    sequential = TurnTimeline()
+    for name in ('stt', 'gemini'):
+        with sequential.stage(name):
+            time.sleep(0.05)
+    assert sequential.breakdown()['overlap_ms'] == 0.0
+
+
+if __name__ == "__main__":
+    test_breakdown_reports_stage_totals_and_overlap()
+    print("All voice turn tests passed")
@@ -0,0 +1,163 @@
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+def cache_key(text: str, voice_id: str, model_id: str, voice_settings: Dict) -> str:
+    """Content address for one synthesized line: everything that changes the audio."""
+    payload = json.dumps({
+        'text': text,
+        'voice_id': voice_id,
+        'model_id': model_id,
+        'voice_settings': voice_settings
+    }, sort_keys=True)
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class TTSCache:
+    """Two-tier cache of synthesized speech keyed by cache_key().
+
+    Recent clips live in an in-memory LRU bounded by total bytes; every clip
+    is also written to an on-disk tier that is bounded by total size and
+    evicts the least recently used files first. Disk hits are promoted back
+    into memory.
+    """
+
+    def __init__(self, cache_dir: str = 'tts_cache', max_memory_bytes: int = 32 * 1024 * 1024,
+                 max_disk_bytes: int = 512 * 1024 * 1024):
+        self.cache_dir = cache_dir
+        self.max_memory_bytes = max_memory_bytes
+        self.max_disk_bytes = max_disk_bytes
+
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> audio bytes, oldest first
+        self._memory_bytes = 0
+        self._disk = OrderedDict()    # key -> file size, least recently used first
+        self._disk_bytes = 0
+
+        self.stats = {'memory_hits': 0, 'disk_hits': 0, 'misses': 0, 'stores': 0, 'evictions': 0}
+
+        os.makedirs(self.cache_dir, exist_ok=True)
+        self._load_disk_index()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.cache_dir, f"{key}.mp3")
+
+    def _load_disk_index(self):
+        """Rebuild the disk LRU from what previous runs left behind."""
+        entries = []
+        for name in os.listdir(self.cache_dir):
+            if not name.endswith('.mp3'):
+                continue
+            stat = os.stat(os.path.join(self.cache_dir, name))
+            entries.append((stat.st_mtime, name[:-4], stat.st_size))
+        for _, key, size in sorted(entries):
+            self._disk[key] = size
+            self._disk_bytes += size
+        self._evict_disk()
+
+    def _remember(self, key: str, audio: bytes):
+        """Insert into the memory tier, evicting the oldest clips to fit."""
+        if len(audio) > self.max_memory_bytes:
+            return
+        if key in self._memory:
+            self._memory.move_to_end(key)
+            return
+        self._memory[key] = audio
+        self._memory_bytes += len(audio)
+        while self._memory_bytes > self.max_memory_bytes:
+            _, evicted = self._memory.popitem(last=False)
+            self._memory_bytes -= len(evicted)
+
+    def _evict_disk(self):
+        while self._disk_bytes > self.max_disk_bytes and self._disk:
+            key, size = self._disk.popitem(last=False)
+            self._disk_bytes -= size
+            self.stats['evictions'] += 1
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return cached audio for key, or None on a miss."""
+        with self._lock:
+            audio = self._memory.get(key)
+            if audio is not None:
+                self._memory.move_to_end(key)
+                if key in self._disk:
+                    self._disk.move_to_end(key)
+                self.stats['memory_hits'] += 1
+                return audio
+            if key not in self._disk:
+                self.stats['misses'] += 1
+                return None
+
+        # Read outside the lock so memory hits on other threads never wait on disk I/O
+        try:
+            with open(self._path(key), 'rb') as f:
+                audio = f.read()
+            os.utime(self._path(key))
+        except OSError:
+            audio = None
+
+        with self._lock:
+            if audio is None:
+                # Evicted (or removed) since the index was checked
+                if key in self._disk:
+                    self._disk_bytes -= self._disk.pop(key)
+                self.stats['misses'] += 1
+                return None
+            if key in self._disk:
+                self._disk.move_to_end(key)
+            self._remember(key, audio)
+            self.stats['disk_hits'] += 1
+            return audio
+
+    def put(self, key: str, audio: bytes):
+        """Store audio in both tiers."""
+        if not audio:
+            return
+        with self._lock:
+            self._remember(key, audio)
+            if key in self._disk:
+                return
+
+        # Write atomically, and outside the lock so concurrent lookups don't wait on the file
+        tmp_path = f"{self._path(key)}.{threading.get_ident()}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(audio)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            logger.warning("Failed to write TTS cache entry: %s", e)
+            return
+
+        with self._lock:
+            # Another thread may have stored the same clip meanwhile
+            if key in self._disk:
+                return
+            self._disk[key] = len(audio)
+            self._disk_bytes += len(audio)
+            self.stats['stores'] += 1
+            self._evict_disk()
+
+    def get_stats(self) -> Dict:
+        """Hit/miss counters and current tier sizes."""
+        with self._lock:
+            hits = self.stats['memory_hits'] + self.stats['disk_hits']
+            lookups = hits + self.stats['misses']
+            return {
+                **self.stats,
+                'hit_rate': hits / lookups if lookups else 0.0,
+                'memory_entries': len(self._memory),
+                'memory_bytes': self._memory_bytes,
+                'disk_entries': len(self._disk),
+                'disk_bytes': self._disk_bytes
+            }
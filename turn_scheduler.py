@@ -0,0 +1,212 @@
+import asyncio
+import math
+import threading
+import time
+from collections import deque
+from typing import Dict, Optional
+
+from metrics import TURN_QUEUE_WAIT, TURNS_IN_FLIGHT, TURNS_QUEUED, TURNS_REJECTED
+from session_store import DEFAULT_SESSION
+
+
+def admission_key(session_id: str, client: Optional[str]) -> str:
+    """Scheduler key for a turn: its session, or the caller's address when it sent no session id.
+
+    Without this every session-less client would share the 'default' session's
+    single slot and be refused as session_busy because of someone else's turn.
+    """
+    if session_id == DEFAULT_SESSION and client:
+        return f"{DEFAULT_SESSION}@{client}"
+    return session_id
+
+
+class _Ticket:
+    """Internal: one queued turn, granted a slot by _dispatch()."""
+    __slots__ = ('session_id', 'loop', 'future', 'granted')
+
+    def __init__(self, session_id: str, loop: Optional[asyncio.AbstractEventLoop] = None):
+        self.session_id = session_id
+        self.loop = loop
+        self.future = loop.create_future() if loop is not None else None
+        self.granted = False
+
+
+def _wake(future: asyncio.Future):
+    if not future.done():
+        future.set_result(None)
+
+
+class TurnRejected(Exception):
+    """Raised when a voice turn cannot be admitted; carries the HTTP answer to give."""
+
+    def __init__(self, reason: str, status: int, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.status = status
+        self.retry_after = retry_after
+
+
+class TurnScheduler:
+    """Admission control for voice turns.
+
+    At most max_active turns run at once; up to max_queued more wait for a
+    slot, admitted strictly in arrival order (a new turn never overtakes a
+    queued one), for at most queue_timeout seconds. Each
+    session can have only one turn admitted or queued at a time. Anything
+    beyond that is refused immediately instead of piling up ffmpeg
+    processes and provider calls:
+
+        session already has a turn     -> 429
+        queue full / waited too long   -> 503
+
+    Both carry a Retry-After estimated from recent turn durations.
+    """
+
+    def __init__(self, max_active: int = 8, max_queued: int = 16, queue_timeout: float = 10.0):
+        """
+        Args:
+            max_active: Turns processed concurrently
+            max_queued: Turns allowed to wait for a slot
+            queue_timeout: Seconds a turn may wait before it is refused
+        """
+        self.max_active = max_active
+        self.max_queued = max_queued
+        self.queue_timeout = queue_timeout
+        self._cond = threading.Condition()
+        self._active = 0
+        self._queue = deque()  # one ticket per waiting turn, oldest first
+        self._sessions = set()
+        self._started: Dict[str, float] = {}
+        self._avg_turn_seconds = 2.0  # running average, refined as turns complete
+        self._stats = {'admitted': 0, 'queued': 0, 'rejected': 0}
+
+    def _retry_after(self) -> int:
+        # Roughly how long until the queue ahead of a new turn has drained
+        backlog = (len(self._queue) + 1) / max(self.max_active, 1)
+        return max(1, min(30, math.ceil(self._avg_turn_seconds * backlog)))
+
+    def _reject(self, reason: str, status: int, retry_after: int):
+        self._stats['rejected'] += 1
+        TURNS_REJECTED.inc(reason=reason)
+        raise TurnRejected(reason, status, retry_after)
+
+    def _update_gauges(self):
+        TURNS_IN_FLIGHT.set(self._active)
+        TURNS_QUEUED.set(len(self._queue))
+
+    def _admit(self, session_id: str):
+        self._sessions.add(session_id)
+        self._active += 1
+        self._started[session_id] = time.monotonic()
+        self._stats['admitted'] += 1
+        self._update_gauges()
+
+    def _enter(self, session_id: str, loop: Optional[asyncio.AbstractEventLoop] = None) -> Optional[_Ticket]:
+        """Admit the turn now (returns None) or queue it (returns its ticket). Call with the lock held."""
+        if session_id in self._sessions:
+            self._reject('session_busy', 429, 1)
+        # Queue behind anyone already waiting, even if a slot is free right now
+        if self._active < self.max_active and not self._queue:
+            self._admit(session_id)
+            return None
+        if len(self._queue) >= self.max_queued:
+            self._reject('queue_full', 503, self._retry_after())
+        # Reserve the session while queued so its duplicates are refused too
+        self._sessions.add(session_id)
+        ticket = _Ticket(session_id, loop)
+        self._queue.append(ticket)
+        self._stats['queued'] += 1
+        self._update_gauges()
+        return ticket
+
+    def _leave(self, ticket: _Ticket):
+        """Drop a ticket that gave up waiting. Call with the lock held."""
+        self._queue.remove(ticket)
+        self._sessions.discard(ticket.session_id)
+        self._update_gauges()
+
+    def _dispatch(self):
+        """Hand free slots to queued tickets in arrival order. Call with the lock held."""
+        while self._queue and self._active < self.max_active:
+            ticket = self._queue.popleft()
+            if ticket.future is not None:
+                try:
+                    ticket.loop.call_soon_threadsafe(_wake, ticket.future)
+                except RuntimeError:
+                    # The waiter's event loop is gone
+                    self._sessions.discard(ticket.session_id)
+                    continue
+            ticket.granted = True
+            self._admit(ticket.session_id)
+        self._update_gauges()
+        self._cond.notify_all()
+
+    def acquire(self, session_id: str):
+        """Wait until the session's turn may run.
+
+        Args:
+            session_id: Session the turn belongs to
+
+        Raises:
+            TurnRejected: if the session is busy, the queue is full, or the
+                wait exceeded queue_timeout
+        """
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enter(session_id)
+            if ticket is not None:
+                deadline = start + self.queue_timeout
+                while not ticket.granted:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        self._leave(ticket)
+                        self._reject('queue_timeout', 503, self._retry_after())
+                    self._cond.wait(remaining)
+        TURN_QUEUE_WAIT.observe(time.monotonic() - start)
+
+    async def acquire_async(self, session_id: str):
+        """acquire() for the event loop: a queued turn awaits a future instead of holding a thread."""
+        start = time.monotonic()
+        with self._cond:
+            ticket = self._enter(session_id, asyncio.get_running_loop())
+        if ticket is not None:
+            try:
+                await asyncio.wait_for(asyncio.shield(ticket.future), self.queue_timeout)
+            except asyncio.TimeoutError:
+                with self._cond:
+                    # A slot may have been granted just as the wait ran out
+                    if not ticket.granted:
+                        self._leave(ticket)
+                        self._reject('queue_timeout', 503, self._retry_after())
+            except asyncio.CancelledError:
+                # The client left while queued: give back a slot granted meanwhile
+                with self._cond:
+                    granted = ticket.granted
+                    if not granted:
+                        self._leave(ticket)
+                if granted:
+                    self.release(session_id)
+                raise
+        TURN_QUEUE_WAIT.observe(time.monotonic() - start)
+
+    def release(self, session_id: str):
+        """Free the session's slot (call once its response has been sent)."""
+        with self._cond:
+            if session_id not in self._started:
+                return
+            held = time.monotonic() - self._started.pop(session_id)
+            self._avg_turn_seconds = 0.8 * self._avg_turn_seconds + 0.2 * held
+            self._sessions.discard(session_id)
+            self._active -= 1
+            self._dispatch()
+
+    def get_stats(self) -> Dict:
+        with self._cond:
+            return {
+                **self._stats,
+                'active': self._active,
+                'queue_depth': len(self._queue),
+                'max_active': self.max_active,
+                'max_queued': self.max_queued,
+                'avg_turn_seconds': round(self._avg_turn_seconds, 2)
+            }
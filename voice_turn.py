@@ -0,0 +1,123 @@
+import contextvars
+import json
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from contextlib import contextmanager
+from typing import AsyncIterable, AsyncIterator, Callable, Dict, Iterable, Iterator
+
+from metrics import STAGE_SECONDS, TURN_SECONDS
+from profiling import track_thread
+
+# Side work for voice turns (code prefetch, connection warm-up) runs here
+turn_executor = ThreadPoolExecutor(max_workers=int(os.getenv("TURN_WORKERS", 16)),
+                                   thread_name_prefix='turn')
+
+# Conversation logging is moved off the critical path but kept in order
+log_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='turn-log')
+
+
+def get_executor_stats() -> Dict:
+    """Tasks waiting for a worker on the shared turn and logging executors."""
+    return {
+        'turn_queue_depth': turn_executor._work_queue.qsize(),
+        'log_queue_depth': log_executor._work_queue.qsize()
+    }
+
+
+class TurnTimeline:
+    """Per-turn record of when each stage started and finished.
+
+    Stages on the request thread are timed with stage(); independent work
+    started with run() executes on turn_executor and is timed where it
+    actually runs, so the breakdown shows how much of it overlapped.
+    """
+
+    def __init__(self):
+        self._origin = time.perf_counter()
+        self._lock = threading.Lock()
+        self._spans = []  # (name, start, end) in seconds since the turn began
+
+    def _record(self, name: str, start: float, end: float):
+        with self._lock:
+            self._spans.append((name, start - self._origin, end - self._origin))
+        STAGE_SECONDS.observe(end - start, stage=name)
+
+    def finish(self, mode: str):
+        """Record the end-to-end turn time once the response has gone out."""
+        TURN_SECONDS.observe(time.perf_counter() - self._origin, mode=mode)
+
+    def on_sent(self, mode: str) -> Callable[[], None]:
+        """Callback for the server to run once the body is written.
+
+        Records a 'send' stage from now until it is called, then finish(mode).
+        """
+        start = time.perf_counter()
+
+        def sent():
+            self._record('send', start, time.perf_counter())
+            self.finish(mode)
+        return sent
+
+    @contextmanager
+    def stage(self, name: str):
+        """Time a block that runs on the calling thread."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self._record(name, start, time.perf_counter())
+
+    def iterate(self, name: str, iterable: Iterable) -> Iterator:
+        """Pass iterable through, timing from the first item requested until it is exhausted."""
+        with self.stage(name):
+            yield from iterable
+
+    async def aiterate(self, name: str, aiterable: AsyncIterable) -> AsyncIterator:
+        """iterate() for async iterables."""
+        with self.stage(name):
+            async for item in aiterable:
+                yield item
+
+    def run(self, name: str, fn: Callable, *args, executor: ThreadPoolExecutor = None) -> Future:
+        """Start fn(*args) concurrently and time it as its own stage."""
+        def timed():
+            with track_thread(), self.stage(name):
+                return fn(*args)
+        # Carry the caller's context (request id, active profile) onto the worker thread
+        return (executor or turn_executor).submit(contextvars.copy_context().run, timed)
+
+    def breakdown(self) -> Dict:
+        """Stage timings in ms, plus how much stage time ran in parallel.
+
+        overlap_ms is the summed stage time minus the wall-clock time covered
+        by at least one stage: 0 for a fully sequential turn.
+        """
+        with self._lock:
+            spans = sorted(self._spans, key=lambda span: span[1])
+        elapsed = time.perf_counter() - self._origin
+
+        covered, cursor = 0.0, 0.0
+        for _, start, end in spans:
+            if end > cursor:
+                covered += end - max(start, cursor)
+                cursor = end
+        busy = sum(end - start for _, start, end in spans)
+
+        return {
+            'total_ms': round(elapsed * 1000, 1),
+            'overlap_ms': round((busy - covered) * 1000, 1),
+            'stages': [
+                {'name': name, 'start_ms': round(start * 1000, 1), 'duration_ms': round((end - start) * 1000, 1)}
+                for name, start, end in spans
+            ]
+        }
+
+    def header(self) -> str:
+        """Compact breakdown for the X-Turn-Timing header of buffered turns.
+
+        Streamed turns send their headers before any stage has run, so they
+        log the breakdown once the body is finished instead.
+        """
+        return json.dumps(self.breakdown(), separators=(',', ':'))